@@ -1,39 +1,131 @@
+import asyncio
+import secrets
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from time import perf_counter
+from typing import Optional, Tuple
 from jose import jwt, JWTError
 from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from database.database import SessionLocal
+from database import replicas
+from database.database import get_async_db, get_db as get_primary_db
 from database.models import User
+from database.user_cache import user_cache
+from metrics import registry as metrics_registry
 import os
 
 # Retrieve the secret key and algorithm from environment variables
 SECRET_KEY = os.getenv("AUTH_SECRET_KEY")
 ALGORITHM = os.getenv("AUTH_ALGORITHM")
 
+# When enabled, get_current_user trusts the verified token claims and does
+# not load the user row, so a deleted user keeps access until the token expires
+AUTH_STATELESS = os.getenv("AUTH_STATELESS", "false").lower() in ("1", "true", "yes")
+
+# Comma-separated usernames allowed on the /admin routes. Anyone can
+# register, so being logged in is not enough; unset means nobody is.
+ADMIN_USERNAMES = {name.strip() for name in os.getenv("ADMIN_USERNAMES", "").split(",") if name.strip()}
+
+# bcrypt cost factor; hashes made with a different cost are upgraded on login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+
+# Number of threads doing bcrypt work, and how many calls may wait for them
+BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", os.cpu_count() or 1))
+BCRYPT_MAX_PENDING = int(os.getenv("BCRYPT_MAX_PENDING", BCRYPT_WORKERS * 4))
+
 # Initialize CryptContext for password hashing
-bcrypt_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+bcrypt_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+# Dedicated pool so bcrypt never runs on the event loop or starves the
+# default executor used for sync endpoints
+bcrypt_executor = ThreadPoolExecutor(max_workers=BCRYPT_WORKERS, thread_name_prefix="bcrypt")
+
+# Calls currently running or queued on bcrypt_executor. Only touched from
+# the event loop thread, so it needs no lock.
+bcrypt_pending = 0
+
+# Hash checked when a login names an unknown user, so the attempt costs the
+# same bcrypt time as a wrong password and does not reveal which usernames
+# exist. Built on first use at the configured cost.
+dummy_hash: Optional[str] = None
 
 # Define the OAuth2 password bearer scheme for token authentication
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
-def get_db() -> Session:
+class Principal:
+    """
+    Lightweight stand-in for User, built from verified token claims.
+
+    Attributes:
+        id (int): Unique identifier for the user.
+        username (str): Username of the user.
+    """
+    __slots__ = ("id", "username")
+
+    def __init__(self, id: int, username: str):
+        self.id = id
+        self.username = username
+
+def get_token_user_id(request: Request) -> Optional[int]:
+    """
+    Read the user ID from the request's bearer token, if it has a valid one.
+
+    Used to route reads, not to authenticate: a missing or invalid token
+    simply yields None.
+
+    Args:
+        request (Request): The incoming request.
+
+    Returns:
+        Optional[int]: The token's id claim, or None.
+    """
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("id")
+    except JWTError:
+        return None
+
+def use_replica(request: Request) -> bool:
     """
-    Dependency to get a database session.
+    Decide whether a read can go to a replica.
 
-    This function is used to provide a new database session for each request. 
-    It ensures that the session is properly closed after use.
+    Args:
+        request (Request): The incoming request.
 
     Returns:
-        Session: A new SQLAlchemy database session.
+        bool: False if no replica is configured or the caller wrote within
+        the read-your-writes window.
+    """
+    return bool(replicas.replicas) and not replicas.wrote_recently(get_token_user_id(request))
+
+def get_read_db(request: Request):
+    """
+    Dependency to get a session for read-only endpoints.
+
+    Yields a replica session when one is configured and reachable, and a
+    primary session otherwise. Only one of the two is opened, so a read
+    holds a single connection.
+
+    Args:
+        request (Request): The incoming request.
+
+    Yields:
+        Session: A replica or primary session.
     """
-    db = SessionLocal()
+    replica_db = replicas.open_session() if use_replica(request) else None
+    if replica_db is None:
+        yield from get_primary_db()
+        return
     try:
-        yield db
+        yield replica_db
     finally:
-        db.close()
+        replica_db.close()
 
 def hash_password(password: str) -> str:
     """
@@ -60,6 +152,86 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     return bcrypt_context.verify(plain_password, hashed_password)
 
+async def run_in_bcrypt_pool(func, *args):
+    """
+    Run a bcrypt call on the dedicated worker pool.
+
+    Args:
+        func: The blocking function to call.
+        *args: Arguments passed to func.
+
+    Returns:
+        The return value of func.
+
+    Raises:
+        HTTPException: If BCRYPT_MAX_PENDING calls are already running or queued.
+    """
+    global bcrypt_pending
+    if bcrypt_pending >= BCRYPT_MAX_PENDING:
+        # Reject straight away rather than queueing behind seconds of work
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication service is busy, please retry",
+            headers={"Retry-After": "1"},
+        )
+    bcrypt_pending += 1
+    started = perf_counter()
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(bcrypt_executor, func, *args)
+    finally:
+        bcrypt_pending -= 1
+        metrics_registry.observe_bcrypt(perf_counter() - started)
+
+async def hash_password_async(password: str) -> str:
+    """
+    Hash a plain text password on the bcrypt worker pool.
+
+    Args:
+        password (str): The plain text password.
+
+    Returns:
+        str: The hashed password.
+    """
+    return await run_in_bcrypt_pool(hash_password, password)
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password on the bcrypt worker pool, rehashing it if needed.
+
+    Args:
+        plain_password (str): The plain text password.
+        hashed_password (str): The hashed password to compare against.
+
+    Returns:
+        Tuple[bool, Optional[str]]: Whether the password matches, and a new
+        hash to store when the old one uses outdated settings (else None).
+    """
+    return await run_in_bcrypt_pool(bcrypt_context.verify_and_update, plain_password, hashed_password)
+
+async def verify_dummy_password_async(password: str) -> None:
+    """
+    Spend one bcrypt verification on a login for an unknown user.
+
+    Args:
+        password (str): The plain text password that was submitted.
+    """
+    global dummy_hash
+    if dummy_hash is None:
+        dummy_hash = await run_in_bcrypt_pool(hash_password, secrets.token_urlsafe(16))
+    await run_in_bcrypt_pool(verify_password, password, dummy_hash)
+
+def warm_up() -> None:
+    """
+    Load the bcrypt backend and exercise the JWT signer so the first login
+    after a cold start does not pay for it. Runs on bcrypt_executor, which
+    also starts one of its threads.
+    """
+    # passlib picks and self-tests its bcrypt backend on first use
+    bcrypt_context.handler().get_backend()
+    if SECRET_KEY and ALGORITHM:
+        jwt.decode(create_access_token({"sub": "warm-up"}, timedelta(minutes=1)), SECRET_KEY, algorithms=[ALGORITHM])
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Create a JWT with the specified data and optional expiration time.
@@ -90,40 +262,168 @@ def get_user_by_username(username: str, db: Session) -> Optional[User]:
     """
     return db.query(User).filter(User.username == username).first()
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Optional[User]:
+async def get_user_by_username_async(username: str, db: AsyncSession) -> Optional[User]:
     """
-    Retrieve the current user based on the provided JWT token.
+    Retrieve a user from the database by username without blocking the event loop.
 
     Args:
-        token (str): The JWT token.
+        username (str): The username of the user to retrieve.
+        db (AsyncSession): The async database session.
+
+    Returns:
+        Optional[User]: The user object if found, otherwise None.
+    """
+    result = await db.execute(select(User).filter(User.username == username))
+    return result.scalars().first()
+
+async def get_user_by_id_cached(user_id: int, db: AsyncSession) -> Optional[User]:
+    """
+    Retrieve a user by ID, going through the in-process user cache.
+
+    Args:
+        user_id (int): The ID of the user to retrieve.
+        db (AsyncSession): The async database session.
+
+    Returns:
+        Optional[User]: The user object if found, otherwise None.
+    """
+    user = user_cache.get(user_id)
+    if user is None:
+        user = await db.get(User, user_id)
+        if user is not None:
+            # Detach the user so commits or rollbacks in this session cannot
+            # expire the copy that is shared through the cache
+            db.expunge(user)
+            user_cache.set(user)
+    return user
+
+def get_user_by_id_cached_sync(user_id: int, db: Session) -> Optional[User]:
+    """
+    Retrieve a user by ID through the user cache, on a sync session.
+
+    Args:
+        user_id (int): The ID of the user to retrieve.
         db (Session): The database session.
 
     Returns:
-        Optional[User]: The user object if the token is valid and the user is found.
-        
-    Raises:
-        HTTPException: If the token is invalid or the user is not found.
+        Optional[User]: The user object if found, otherwise None.
     """
-    credentials_exception = HTTPException(
+    user = user_cache.get(user_id)
+    if user is None:
+        user = db.get(User, user_id)
+        if user is not None:
+            db.expunge(user)
+            user_cache.set(user)
+    return user
+
+def credentials_exception() -> HTTPException:
+    """Build the 401 returned for a bad token or a token whose user is gone."""
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def decode_token(token: str) -> Tuple[str, Optional[int]]:
+    """
+    Verify a JWT token and read the claims that identify its user.
+
+    Args:
+        token (str): The JWT token.
+
+    Returns:
+        Tuple[str, Optional[int]]: The username (sub claim) and the user ID
+        (id claim; None for tokens issued before it was added).
+
+    Raises:
+        HTTPException: If the token is invalid or has no username.
+    """
     try:
-        # Decode the JWT token
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        
-        # Ensure the username is present in the payload
-        if username is None:
-            raise credentials_exception
+    except JWTError:
+        raise credentials_exception()
+    username: Optional[str] = payload.get("sub")
+    if username is None:
+        raise credentials_exception()
+    return username, payload.get("id")
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> Optional[User]:
+    """
+    Retrieve the current user based on the provided JWT token.
+
+    With AUTH_STATELESS enabled a Principal built from the token claims is
+    returned without touching the database. Otherwise the user row is
+    loaded by ID through the user cache, on the request's shared session.
+
+    Args:
+        token (str): The JWT token.
+        db (AsyncSession): The request's async session.
+
+    Returns:
+        Optional[User]: The user object (or Principal) if the token is valid and the user is found.
         
-        # Retrieve the user from the database
+    Raises:
+        HTTPException: If the token is invalid or the user is not found.
+    """
+    username, user_id = decode_token(token)
+    if user_id is None:
+        # Tokens without an id claim can only be resolved by username
+        user = await get_user_by_username_async(username, db)
+        if user is not None:
+            db.expunge(user)
+    elif AUTH_STATELESS:
+        return Principal(user_id, username)
+    else:
+        user = await get_user_by_id_cached(user_id, db)
+
+    if user is None:
+        raise credentials_exception()
+    return user
+
+def get_current_user_sync(token: str = Depends(oauth2_scheme), db: Session = Depends(get_read_db)) -> Optional[User]:
+    """
+    Retrieve the current user for a sync endpoint that reads through get_read_db.
+
+    The user is resolved on the endpoint's own read session, so the request
+    holds one connection rather than one from each engine.
+
+    Args:
+        token (str): The JWT token.
+        db (Session): The request's read session (a replica, or the primary).
+
+    Returns:
+        Optional[User]: The user object (or Principal) if the token is valid and the user is found.
+
+    Raises:
+        HTTPException: If the token is invalid or the user is not found.
+    """
+    username, user_id = decode_token(token)
+    if user_id is None:
         user = get_user_by_username(username, db)
-        if user is None:
-            raise credentials_exception
-    except JWTError:
-        # Handle token decoding errors
-        raise credentials_exception
-    
+        if user is not None:
+            db.expunge(user)
+    elif AUTH_STATELESS:
+        return Principal(user_id, username)
+    else:
+        user = get_user_by_id_cached_sync(user_id, db)
+
+    if user is None:
+        raise credentials_exception()
     return user
+
+async def get_admin_user(current_user: User = Depends(get_current_user)) -> User:
+    """
+    Retrieve the current user and require them to be listed in ADMIN_USERNAMES.
+
+    Args:
+        current_user (User): The currently authenticated user.
+
+    Returns:
+        User: The user object (or Principal).
+
+    Raises:
+        HTTPException: 403 if the user is not an admin.
+    """
+    if current_user.username not in ADMIN_USERNAMES:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    return current_user
@@ -0,0 +1,277 @@
+"""
+End-to-end API benchmark: login, refresh, list, create, update and delete.
+
+Seeds a database with a fixed number of users and posts, then drives the
+ASGI app from main.py in-process with concurrent clients, one scenario at
+a time, and reports throughput and p50/p95/p99 latency per scenario. No
+server or network is involved, so runs are reproducible on one machine.
+
+Results can be written as JSON (--output) and compared with an earlier
+run (--baseline). The script exits with status 1 when a scenario's p95
+grows, or its throughput drops, by more than --threshold, so it can gate
+changes to db_post or auth_utils in CI.
+
+Usage:
+    python benchmarks/bench_api.py [--users 50] [--posts 10000] [--clients 16]
+        [--requests 500] [--login-requests 100] [--output results.json]
+        [--baseline baseline.json] [--threshold 0.2]
+
+Runs against a throwaway SQLite database unless DATABASE_URL is set. Only
+compare results produced on the same machine with the same settings. Login
+errors with many clients are the bcrypt pool shedding load with a 503 once
+BCRYPT_MAX_PENDING calls are queued.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+# Make the application modules importable when run from the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+if not os.getenv('DATABASE_URL'):
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+os.environ.setdefault('AUTH_SECRET_KEY', 'benchmark-secret')
+os.environ.setdefault('AUTH_ALGORITHM', 'HS256')
+# All clients share one address; measure logins, not the login throttle
+os.environ.setdefault('LOGIN_IP_LIMIT', '0')
+
+import httpx  # noqa: E402
+import sqlalchemy  # noqa: E402
+from sqlalchemy import insert, select  # noqa: E402
+import main  # noqa: E402
+from auth_utils import hash_password  # noqa: E402
+from database.database import SessionLocal, engine  # noqa: E402
+from database.db_post import derived_values  # noqa: E402
+from database.models import DbPost, User  # noqa: E402
+
+PASSWORD = 'benchmark-password'
+
+# Metrics compared against the baseline, and the direction that is worse
+COMPARED = {'p95_ms': 1, 'throughput_rps': -1}
+
+
+def percentile(samples: list, pct: float) -> float:
+    """Return the pct-th percentile of samples, in milliseconds."""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index] * 1000
+
+
+def seed(users: int, posts: int, rng: random.Random) -> None:
+    """Insert users sharing one password hash and posts spread across them."""
+    hashed = hash_password(PASSWORD)
+    db = SessionLocal()
+    try:
+        db.execute(insert(User), [
+            {'username': f'bench{index}', 'hashed_password': hashed} for index in range(users)
+        ])
+        user_ids = db.scalars(select(User.id).where(User.username.like('bench%'))).all()
+        rows = []
+        for index in range(posts):
+            content = ' '.join(rng.choices(['lorem', 'ipsum', 'dolor', 'sit', 'amet'], k=40))
+            rows.append({
+                'title': f'Seeded post {index}',
+                'content': content,
+                'creator_id': rng.choice(user_ids),
+                **derived_values(content),
+            })
+            if len(rows) == 5000:
+                db.execute(insert(DbPost), rows)
+                rows = []
+        if rows:
+            db.execute(insert(DbPost), rows)
+        db.commit()
+    finally:
+        db.close()
+
+
+async def drive(name: str, clients: int, total: int, request) -> dict:
+    """
+    Run total requests through clients concurrent workers.
+
+    request(worker, index) performs one request and returns the response.
+    """
+    latencies = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker(worker_index: int):
+        nonlocal errors
+        for index in counter:
+            started = time.perf_counter()
+            response = await request(worker_index, index)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(index) for index in range(clients)))
+    elapsed = time.perf_counter() - started
+
+    result = {
+        'requests': total,
+        'errors': errors,
+        'throughput_rps': round(total / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+        'mean_ms': round(statistics.mean(latencies) * 1000, 2),
+    }
+    print(
+        f"{name:<8} n={total:<6} err={errors:<4} {result['throughput_rps']:>8.1f} req/s "
+        f"p50={result['p50_ms']:8.2f}ms p95={result['p95_ms']:8.2f}ms p99={result['p99_ms']:8.2f}ms"
+    )
+    return result
+
+
+async def run(args) -> dict:
+    # ASGITransport does not send lifespan events, so run start-up (schema, warm-up) here
+    async with main.app.router.lifespan_context(main.app):
+        return await run_scenarios(args)
+
+
+async def run_scenarios(args) -> dict:
+    rng = random.Random(args.seed)
+    seed(args.users, args.posts, rng)
+    usernames = [f'bench{index}' for index in range(args.users)]
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+        results = {}
+
+        async def login(worker, index):
+            username = usernames[index % len(usernames)]
+            return await client.post('/auth/token', data={'username': username, 'password': PASSWORD})
+
+        results['login'] = await drive('login', args.clients, args.login_requests, login)
+
+        # One token per client, each for a different user, reused by the write scenarios
+        headers = []
+        refresh_tokens = []
+        for worker in range(args.clients):
+            username = usernames[worker % len(usernames)]
+            token = (await client.post('/auth/token', data={'username': username, 'password': PASSWORD})).json()
+            headers.append({'Authorization': f"Bearer {token['access_token']}"})
+            refresh_tokens.append(token['refresh_token'])
+
+        # Each client renews its session with the refresh token from its last response
+        async def refresh(worker, index):
+            response = await client.post('/auth/refresh', json={'refresh_token': refresh_tokens[worker]})
+            if response.status_code == 200:
+                refresh_tokens[worker] = response.json()['refresh_token']
+            return response
+
+        results['refresh'] = await drive('refresh', args.clients, args.requests, refresh)
+
+        # Each client pages through the feed, starting over every few pages
+        cursors = [None] * args.clients
+
+        async def list_posts(worker, index):
+            params = {'limit': 20}
+            if cursors[worker] and index % 5:
+                params['cursor'] = cursors[worker]
+            response = await client.get('/post/all', params=params)
+            cursors[worker] = response.headers.get('X-Next-Cursor')
+            return response
+
+        results['list'] = await drive('list', args.clients, args.requests, list_posts)
+
+        # Posts created by each client, updated and then deleted with its token
+        created = []
+
+        async def create(worker, index):
+            response = await client.post(
+                '/post', data={'title': f'Bench post {index}', 'content': 'x' * 200}, headers=headers[worker]
+            )
+            if response.status_code == 200:
+                created.append((worker, response.json()['id']))
+            return response
+
+        results['create'] = await drive('create', args.clients, args.requests, create)
+
+        async def update(worker, index):
+            owner, post_id = created[index % len(created)]
+            return await client.put(
+                f'/post/{post_id}', data={'title': f'Updated {index}', 'content': 'y' * 200}, headers=headers[owner]
+            )
+
+        results['update'] = await drive('update', args.clients, args.requests, update)
+
+        async def delete(worker, index):
+            owner, post_id = created[index]
+            return await client.delete(f'/post/{post_id}', headers=headers[owner])
+
+        results['delete'] = await drive('delete', args.clients, len(created), delete)
+
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    Compare results with a baseline run.
+
+    Returns a description of every metric that regressed by more than threshold.
+    """
+    regressions = []
+    for scenario, metrics in results.items():
+        previous = baseline.get('results', {}).get(scenario)
+        if previous is None:
+            continue
+        for metric, worse in COMPARED.items():
+            if not previous.get(metric):
+                continue
+            change = (metrics[metric] - previous[metric]) / previous[metric]
+            print(f"{scenario:<8} {metric:<15} {previous[metric]:>10.2f} -> {metrics[metric]:>10.2f} ({change:+.1%})")
+            if change * worse > threshold:
+                regressions.append(f"{scenario} {metric} {change:+.1%}")
+    return regressions
+
+
+def main_cli() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=50, help='number of seeded users')
+    parser.add_argument('--posts', type=int, default=10000, help='number of seeded posts')
+    parser.add_argument('--clients', type=int, default=16, help='number of concurrent clients')
+    parser.add_argument('--requests', type=int, default=500, help='requests per refresh/list/create/update scenario')
+    parser.add_argument('--login-requests', type=int, default=100, help='requests in the login scenario (bcrypt bound)')
+    parser.add_argument('--seed', type=int, default=42, help='random seed for the seeded data')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    parser.add_argument('--baseline', help='JSON results of an earlier run to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='fail when p95 grows or throughput drops by more than this fraction')
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    report = {
+        'config': {key: value for key, value in vars(args).items() if key not in ('output', 'baseline')},
+        'environment': {
+            'python': platform.python_version(),
+            'sqlalchemy': sqlalchemy.__version__,
+            'database': engine.dialect.name,
+            'machine': platform.machine(),
+            'cpus': os.cpu_count(),
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.threshold)
+        if regressions:
+            print('Regressions beyond threshold: ' + ', '.join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main_cli())
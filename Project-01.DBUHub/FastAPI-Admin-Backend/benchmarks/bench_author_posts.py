@@ -0,0 +1,164 @@
+"""
+Author listing benchmark: one user's posts with and without the (creator_id, timestamp, id) index.
+
+Seeds a large post table spread across many authors, plus one rare author
+whose few posts are the oldest in the table, and prints the query plans
+of a page of one author's posts. With ix_post_creator_timestamp_id the
+page is a range seek that needs no sort, and selecting only id and
+timestamp (?fields=id,timestamp) is answered from the index alone. The
+same pages are then timed through db_post.get_page with the index and
+after dropping it, when the database has to walk the feed index and
+filter by author.
+
+Usage:
+    python benchmarks/bench_author_posts.py [--posts 1000000] [--authors 1000] [--repeat 50]
+
+Runs against a throwaway SQLite database unless DATABASE_URL is set. The
+index is dropped and recreated during the run, so never point this at a
+database that is in use.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Make the application modules importable when run from the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+if not os.getenv('DATABASE_URL'):
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+
+from sqlalchemy import func, insert, select, text  # noqa: E402
+from database.database import Base, SessionLocal, engine  # noqa: E402
+from database.migrations import upgrade  # noqa: E402
+from database.models import DbPost, User  # noqa: E402
+from database import db_post  # noqa: E402
+
+INDEX_NAME = 'ix_post_creator_timestamp_id'
+PAGE_SIZE = 20
+
+# Posts of the rare author; they are the oldest, so without the index the
+# whole feed is walked before the first one is found
+RARE_POSTS = 10
+
+
+def seed(db, posts: int, authors: int, rng: random.Random) -> tuple:
+    """Insert authors and posts; return (typical author id, rare author id)."""
+    db.execute(insert(User), [
+        {'username': f'author{index}', 'hashed_password': 'x'} for index in range(authors + 1)
+    ])
+    user_ids = db.scalars(select(User.id).order_by(User.id)).all()
+    rare, others = user_ids[0], user_ids[1:]
+
+    started = datetime(2020, 1, 1)
+    content = 'lorem ipsum dolor sit amet ' * 8
+    derived = db_post.derived_values(content)
+    rows = []
+    for index in range(posts):
+        rows.append({
+            'title': f'Seeded post {index}',
+            'content': content,
+            'creator_id': rare if index < RARE_POSTS else rng.choice(others),
+            'timestamp': started + timedelta(seconds=index),
+            **derived,
+        })
+        if len(rows) == 10000:
+            db.execute(insert(DbPost), rows)
+            rows = []
+    if rows:
+        db.execute(insert(DbPost), rows)
+    db.commit()
+    return others[0], rare
+
+
+def show_plans(db, creator_id: int) -> None:
+    """Print the plan of an index-only and of a full first page."""
+    for label, columns in (('id,timestamp', 'id, timestamp'), ('full', 'id, title, content, creator_id, timestamp')):
+        query = (
+            f"SELECT {columns} FROM post WHERE creator_id = {creator_id} "
+            f"ORDER BY timestamp DESC, id DESC LIMIT {PAGE_SIZE + 1}"
+        )
+        if engine.dialect.name == 'sqlite':
+            plan = [row[-1] for row in db.execute(text('EXPLAIN QUERY PLAN ' + query))]
+        else:
+            plan = [row[0] for row in db.execute(text('EXPLAIN ' + query))]
+        print(f"  {label:<13} " + '\n                '.join(plan))
+
+
+def deep_cursor(db, creator_id: int) -> str:
+    """Cursor pointing halfway into the author's posts."""
+    count = db.query(func.count(DbPost.id)).filter(DbPost.creator_id == creator_id).scalar()
+    row = (
+        db.query(*db_post.LIST_COLUMNS)
+        .filter(DbPost.creator_id == creator_id)
+        .order_by(DbPost.timestamp.desc(), DbPost.id.desc())
+        .offset(count // 2).first()
+    )
+    return db_post.encode_cursor(row, 'next')
+
+
+def time_page(db, creator_id: int, cursor, columns: tuple, repeat: int) -> float:
+    """Return the median wall time of one get_page call in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        db_post.get_page(db, PAGE_SIZE, cursor, columns, creator_id)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def run_cases(db, cases: list, repeat: int) -> dict:
+    """Time every (label, creator_id, cursor, columns) case."""
+    return {label: time_page(db, creator_id, cursor, columns, repeat) for label, creator_id, cursor, columns in cases}
+
+
+def main(posts: int, authors: int, repeat: int) -> None:
+    Base.metadata.create_all(engine)
+    upgrade(engine)
+    rng = random.Random(42)
+
+    db = SessionLocal()
+    started = time.perf_counter()
+    typical, rare = seed(db, posts, authors, rng)
+    db.execute(text('ANALYZE'))
+    db.commit()
+    print(f"Seeded {posts} posts across {authors + 1} authors in {time.perf_counter() - started:.1f}s\n")
+
+    print(f"Query plans with {INDEX_NAME}:")
+    show_plans(db, typical)
+    print()
+
+    index_only = db_post.field_columns(('id', 'timestamp'))
+    cases = [
+        ('first page, id,timestamp', typical, None, index_only),
+        ('first page, full', typical, None, db_post.LIST_COLUMNS),
+        ('deep page, full', typical, deep_cursor(db, typical), db_post.LIST_COLUMNS),
+        ('rare author, full', rare, None, db_post.LIST_COLUMNS),
+    ]
+    indexed = run_cases(db, cases, repeat)
+
+    db.execute(text(f'DROP INDEX {INDEX_NAME}'))
+    db.commit()
+    try:
+        # Without the index a page costs a walk of the feed, so time fewer runs
+        unindexed = run_cases(db, cases, max(1, repeat // 10))
+    finally:
+        db.close()
+        upgrade(engine)
+
+    print(f"{'case':<26} {'indexed ms':>11} {'no index ms':>12} {'speedup':>8}")
+    for label, *_ in cases:
+        print(f"{label:<26} {indexed[label]:>11.3f} {unindexed[label]:>12.3f} {unindexed[label] / indexed[label]:>7.0f}x")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--posts', type=int, default=1000000, help='number of seeded posts')
+    parser.add_argument('--authors', type=int, default=1000, help='number of seeded authors besides the rare one')
+    parser.add_argument('--repeat', type=int, default=50, help='timed runs per indexed query')
+    args = parser.parse_args()
+    main(args.posts, args.authors, args.repeat)
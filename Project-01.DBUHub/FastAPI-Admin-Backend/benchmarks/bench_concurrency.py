@@ -0,0 +1,97 @@
+"""
+Concurrency benchmark for the async route handlers.
+
+Drives the ASGI app in-process with a steady stream of concurrent write
+requests (POST /post) and, alongside them, probes the health check
+endpoint. If any handler blocks the event loop the probe latency climbs
+with it, so the probe p99 is the number to compare between revisions.
+
+Usage:
+    python benchmarks/bench_concurrency.py [--writers 32] [--requests 2000]
+
+Runs against a throwaway SQLite database unless DATABASE_URL is set.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# Make the application modules importable when run from the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+if not os.getenv('DATABASE_URL'):
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+os.environ.setdefault('AUTH_SECRET_KEY', 'benchmark-secret')
+os.environ.setdefault('AUTH_ALGORITHM', 'HS256')
+
+import httpx  # noqa: E402
+import main  # noqa: E402
+
+
+def percentile(samples: list, pct: float) -> float:
+    """Return the pct-th percentile of samples, in milliseconds."""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index] * 1000
+
+
+def report(name: str, samples: list) -> None:
+    """Print a one-line latency summary."""
+    print(
+        f"{name:<8} n={len(samples):<6} "
+        f"p50={percentile(samples, 50):8.2f}ms "
+        f"p99={percentile(samples, 99):8.2f}ms "
+        f"mean={statistics.mean(samples) * 1000:8.2f}ms"
+    )
+
+
+async def run(writers: int, total_requests: int) -> None:
+    transport = httpx.ASGITransport(app=main.app)
+    # ASGITransport does not send lifespan events, so run start-up (schema, warm-up) here
+    async with main.app.router.lifespan_context(main.app), \
+            httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+        await client.post('/auth/', json={'username': 'bench', 'password': 'bench'})
+        token = (await client.post('/auth/token', data={'username': 'bench', 'password': 'bench'})).json()
+        headers = {'Authorization': f"Bearer {token['access_token']}"}
+
+        write_latencies = []
+        probe_latencies = []
+        remaining = [total_requests]
+        done = asyncio.Event()
+
+        async def writer():
+            while remaining[0] > 0:
+                remaining[0] -= 1
+                started = time.perf_counter()
+                await client.post('/post', data={'title': 'bench', 'content': 'x' * 200}, headers=headers)
+                write_latencies.append(time.perf_counter() - started)
+
+        async def probe():
+            while not done.is_set():
+                started = time.perf_counter()
+                await client.get('/')
+                probe_latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(0.001)
+
+        probe_task = asyncio.create_task(probe())
+        started = time.perf_counter()
+        await asyncio.gather(*(writer() for _ in range(writers)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probe_task
+
+    print(f"{total_requests} writes with {writers} concurrent clients in {elapsed:.2f}s "
+          f"({total_requests / elapsed:.0f} req/s)")
+    report('write', write_latencies)
+    report('probe', probe_latencies)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--writers', type=int, default=32, help='number of concurrent writing clients')
+    parser.add_argument('--requests', type=int, default=2000, help='total number of write requests')
+    args = parser.parse_args()
+    asyncio.run(run(args.writers, args.requests))
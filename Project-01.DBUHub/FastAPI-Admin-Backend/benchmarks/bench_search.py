@@ -0,0 +1,98 @@
+"""
+Search benchmark: full-text index versus an unindexed ILIKE scan.
+
+Seeds a growing post table and, at each size, times the same query
+through database.search.find_matches (FTS5 / tsvector) and through
+find_matches_by_scan (ILIKE). The indexed query should stay roughly flat
+while the scan grows linearly with the table.
+
+Usage:
+    python benchmarks/bench_search.py [--sizes 10000,50000,100000] [--repeat 20]
+
+Runs against a throwaway SQLite database unless DATABASE_URL is set.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+# Make the application modules importable when run from the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+if not os.getenv('DATABASE_URL'):
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+
+from sqlalchemy import func, insert  # noqa: E402
+from database.database import Base, SessionLocal, engine  # noqa: E402
+from database.migrations import upgrade  # noqa: E402
+from database.models import DbPost, User  # noqa: E402
+from database import search  # noqa: E402
+
+# Synthetic vocabulary; 'convocation' is the rare term we search for
+WORDS = [f'word{i}' for i in range(5000)]
+RARE_TERM = 'convocation'
+
+# Number of posts mentioning RARE_TERM. They are the oldest posts, so the
+# match count is fixed and the scan has to read the whole table to find them.
+RARE_MATCHES = 50
+
+
+def seed(db, count: int, creator_id: int, rng: random.Random, with_matches: bool) -> None:
+    """Insert count synthetic posts, the first RARE_MATCHES mentioning RARE_TERM if asked."""
+    rows = []
+    for index in range(count):
+        words = rng.choices(WORDS, k=60)
+        if with_matches and index < RARE_MATCHES:
+            words[rng.randrange(len(words))] = RARE_TERM
+        rows.append({
+            'title': ' '.join(rng.choices(WORDS, k=6)),
+            'content': ' '.join(words),
+            'creator_id': creator_id,
+        })
+        if len(rows) == 5000:
+            db.execute(insert(DbPost), rows)
+            rows = []
+    if rows:
+        db.execute(insert(DbPost), rows)
+    db.commit()
+
+
+def time_query(fn, db, repeat: int) -> float:
+    """Return the median wall time of fn in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(db, RARE_TERM, 20, 0)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main(sizes: list, repeat: int) -> None:
+    Base.metadata.create_all(engine)
+    upgrade(engine)
+    rng = random.Random(42)
+
+    db = SessionLocal()
+    user = User(username='bench', hashed_password='x')
+    db.add(user)
+    db.commit()
+
+    print(f"{'posts':>8} {'fts ms':>10} {'scan ms':>10} {'speedup':>8}")
+    for size in sizes:
+        current = db.query(func.count(DbPost.id)).scalar()
+        seed(db, size - current, user.id, rng, with_matches=current == 0)
+        fts = time_query(search.find_matches, db, repeat)
+        scan = time_query(search.find_matches_by_scan, db, repeat)
+        print(f"{size:>8} {fts:>10.2f} {scan:>10.2f} {scan / fts:>7.0f}x")
+    db.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='10000,50000,100000', help='comma-separated table sizes')
+    parser.add_argument('--repeat', type=int, default=20, help='timed runs per query')
+    args = parser.parse_args()
+    main([int(size) for size in args.sizes.split(',')], args.repeat)
@@ -0,0 +1,135 @@
+"""
+List serialization benchmark: ORM objects + PostDisplay versus column
+tuples + fast_json.
+
+For each page size, measures the CPU time (time.process_time) of building
+a feed page both ways, split into query and encoding, and the CPU time of
+a whole GET /post/all request on the current code path.
+
+    orm     query DbPost with the creator joined, validate every row through
+            PostDisplay (from_attributes) and dump_json - the previous path
+    tuples  query LIST_COLUMNS as tuples, build dicts, encode with
+            fast_json.dumps (orjson when installed) - the current path
+
+Usage:
+    python benchmarks/bench_serialization.py [--sizes 100,1000,10000] [--repeat 20]
+
+Runs against a throwaway SQLite database unless DATABASE_URL is set.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import List
+
+# Make the application modules importable when run from the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+if not os.getenv('DATABASE_URL'):
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+os.environ.setdefault('AUTH_SECRET_KEY', 'benchmark-secret')
+os.environ.setdefault('AUTH_ALGORITHM', 'HS256')
+# Allow whole-feed pages and measure uncached requests
+os.environ['POST_PAGE_MAX_SIZE'] = '100000'
+os.environ['FEED_CACHE_TTL'] = '0'
+
+import httpx  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import func, insert  # noqa: E402
+import main  # noqa: E402
+from database.database import SessionLocal  # noqa: E402
+from database.db_post import LIST_COLUMNS, WITH_CREATOR, derived_values  # noqa: E402
+from database.models import DbPost, User  # noqa: E402
+from routers import fast_json  # noqa: E402
+from routers.schemas import PostDisplay  # noqa: E402
+
+NEWEST_FIRST = (DbPost.timestamp.desc(), DbPost.id.desc())
+post_list_adapter = TypeAdapter(List[PostDisplay])
+
+
+def seed(db, count: int) -> None:
+    """Top the post table up to count rows."""
+    creator = db.query(User).first()
+    if creator is None:
+        creator = User(username='bench', hashed_password='x')
+        db.add(creator)
+        db.commit()
+    missing = count - db.query(func.count(DbPost.id)).scalar()
+    if missing > 0:
+        content = 'lorem ipsum dolor sit amet ' * 20
+        db.execute(insert(DbPost), [
+            {'title': f'Benchmark post {index}', 'content': content, 'creator_id': creator.id, **derived_values(content)}
+            for index in range(missing)
+        ])
+        db.commit()
+
+
+def orm_page(db, size: int):
+    posts = db.query(DbPost).options(WITH_CREATOR).order_by(*NEWEST_FIRST).limit(size).all()
+    return posts, lambda: post_list_adapter.dump_json(post_list_adapter.validate_python(posts, from_attributes=True))
+
+
+def tuple_page(db, size: int):
+    rows = db.query(*LIST_COLUMNS).order_by(*NEWEST_FIRST).limit(size).all()
+    return rows, lambda: fast_json.dumps(fast_json.post_dicts(rows))
+
+
+def measure(fetch, size: int, repeat: int) -> tuple:
+    """Return the median (query, encode) CPU time in milliseconds."""
+    query_times, encode_times = [], []
+    for _ in range(repeat):
+        db = SessionLocal()
+        started = time.process_time()
+        _, encode = fetch(db, size)
+        fetched = time.process_time()
+        encode()
+        query_times.append(fetched - started)
+        encode_times.append(time.process_time() - fetched)
+        db.close()
+    return statistics.median(query_times) * 1000, statistics.median(encode_times) * 1000
+
+
+async def measure_requests(sizes: List[int], repeat: int) -> dict:
+    """Return the median CPU time of GET /post/all per page size, in milliseconds."""
+    results = {}
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+        for size in sizes:
+            samples = []
+            for _ in range(repeat):
+                started = time.process_time()
+                response = await client.get('/post/all', params={'limit': size})
+                samples.append(time.process_time() - started)
+                assert len(response.json()) == size
+            results[size] = statistics.median(samples) * 1000
+    return results
+
+
+async def run(sizes: List[int], repeat: int) -> None:
+    async with main.app.router.lifespan_context(main.app):
+        db = SessionLocal()
+        seed(db, max(sizes))
+        db.close()
+
+        print(f"{'posts':>6} {'orm query':>10} {'orm encode':>11} {'orm total':>10} "
+              f"{'tup query':>10} {'tup encode':>11} {'tup total':>10} {'speedup':>8} {'request':>9}")
+        requests = await measure_requests(sizes, repeat)
+        for size in sizes:
+            orm_query, orm_encode = measure(orm_page, size, repeat)
+            tuple_query, tuple_encode = measure(tuple_page, size, repeat)
+            orm_total, tuple_total = orm_query + orm_encode, tuple_query + tuple_encode
+            print(f"{size:>6} {orm_query:>10.2f} {orm_encode:>11.2f} {orm_total:>10.2f} "
+                  f"{tuple_query:>10.2f} {tuple_encode:>11.2f} {tuple_total:>10.2f} "
+                  f"{orm_total / tuple_total:>7.1f}x {requests[size]:>9.2f}")
+        print('CPU milliseconds per page (median); request = whole GET /post/all on the current path')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='100,1000,10000', help='comma-separated page sizes')
+    parser.add_argument('--repeat', type=int, default=20, help='timed runs per measurement')
+    args = parser.parse_args()
+    asyncio.run(run([int(size) for size in args.sizes.split(',')], args.repeat))
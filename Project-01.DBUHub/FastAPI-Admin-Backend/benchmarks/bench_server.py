@@ -0,0 +1,199 @@
+"""
+Server benchmark: serve.py defaults against a bare uvicorn setup, over real sockets.
+
+Seeds a database, then starts serve.py once per configuration and drives
+it with concurrent HTTP/1.1 connections for a fixed time, alternating a
+feed page (GET /post/all?limit=20&view=excerpt) and a single post
+(GET /post/{id}). Reports throughput and p50/p99 latency per
+configuration:
+
+    bare           1 worker, asyncio + h11, access log   (plain `uvicorn main:app`)
+    uvloop         1 worker, uvloop + httptools, access log
+    no-access-log  1 worker, uvloop + httptools           (serve.py with --workers 1)
+    no-keep-alive  as no-access-log, a new connection per request
+    workers        one worker per CPU core                (serve.py defaults)
+
+The load generator is a minimal asyncio client in this process, so on a
+machine with few cores it competes with the server for CPU; compare the
+configurations with each other rather than with other machines.
+
+Usage:
+    python benchmarks/bench_server.py [--connections 32] [--duration 10] [--posts 10000]
+
+Runs against a throwaway SQLite database unless DATABASE_URL is set.
+"""
+import argparse
+import asyncio
+import os
+import random
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Make the application modules importable when run from the repo root
+sys.path.insert(0, ROOT)
+
+if not os.getenv('DATABASE_URL'):
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+os.environ.setdefault('AUTH_SECRET_KEY', 'benchmark-secret')
+os.environ.setdefault('AUTH_ALGORITHM', 'HS256')
+
+from sqlalchemy import insert, select  # noqa: E402
+from database.database import SessionLocal, engine  # noqa: E402
+from database.db_post import derived_values  # noqa: E402
+from database.migrations import migrate  # noqa: E402
+from database.models import DbPost, User  # noqa: E402
+
+HOST = '127.0.0.1'
+
+# name: (serve.py arguments, extra environment, keep-alive)
+CONFIGURATIONS = {
+    'bare': (['--workers', '1', '--loop', 'asyncio', '--http', 'h11'], {'ACCESS_LOG': 'true'}, True),
+    'uvloop': (['--workers', '1'], {'ACCESS_LOG': 'true'}, True),
+    'no-access-log': (['--workers', '1'], {}, True),
+    'no-keep-alive': (['--workers', '1'], {}, False),
+    'workers': ([], {}, True),
+}
+
+
+def seed(posts: int, rng: random.Random) -> list:
+    """Insert posts by one user and return their IDs."""
+    migrate(engine)
+    db = SessionLocal()
+    try:
+        db.execute(insert(User), [{'username': 'bench', 'hashed_password': 'x'}])
+        user_id = db.scalar(select(User.id).where(User.username == 'bench'))
+        rows = []
+        for index in range(posts):
+            content = ' '.join(rng.choices(['lorem', 'ipsum', 'dolor', 'sit', 'amet'], k=80))
+            rows.append({'title': f'Seeded post {index}', 'content': content, 'creator_id': user_id, **derived_values(content)})
+            if len(rows) == 5000:
+                db.execute(insert(DbPost), rows)
+                rows = []
+        if rows:
+            db.execute(insert(DbPost), rows)
+        db.commit()
+        return db.scalars(select(DbPost.id)).all()
+    finally:
+        db.close()
+
+
+async def fetch(reader, writer, path: str, keep_alive: bool) -> int:
+    """Send one GET and read the whole response; return the status code."""
+    connection = b'keep-alive' if keep_alive else b'close'
+    writer.write(b'GET ' + path.encode() + b' HTTP/1.1\r\nHost: bench\r\nConnection: ' + connection + b'\r\n\r\n')
+    head = await reader.readuntil(b'\r\n\r\n')
+    status = int(head[9:12])
+    length = 0
+    for line in head.split(b'\r\n')[1:]:
+        name, _, value = line.partition(b':')
+        if name.lower() == b'content-length':
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def load(port: int, connections: int, duration: float, keep_alive: bool, post_ids: list) -> dict:
+    """Drive the server from connections concurrent clients for duration seconds."""
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def client(index: int):
+        nonlocal errors
+        rng = random.Random(index)
+        reader = writer = None
+        count = 0
+        while time.perf_counter() < deadline:
+            path = '/post/all?limit=20&view=excerpt' if count % 2 == 0 else f'/post/{rng.choice(post_ids)}'
+            count += 1
+            started = time.perf_counter()
+            try:
+                if writer is None:
+                    reader, writer = await asyncio.open_connection(HOST, port)
+                status = await fetch(reader, writer, path, keep_alive)
+            except (OSError, asyncio.IncompleteReadError):
+                errors += 1
+                writer = None
+                continue
+            latencies.append(time.perf_counter() - started)
+            if status >= 400:
+                errors += 1
+            if not keep_alive:
+                writer.close()
+                writer = None
+        if writer is not None:
+            writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(index) for index in range(connections)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'throughput_rps': len(latencies) / elapsed,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p99_ms': latencies[int(len(latencies) * 0.99)] * 1000,
+    }
+
+
+def start_server(port: int, arguments: list, environment: dict) -> subprocess.Popen:
+    """Start serve.py and wait until it answers."""
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, 'serve.py'), '--host', HOST, '--port', str(port), *arguments],
+        cwd=ROOT, env={**os.environ, 'POST_ARCHIVE_AFTER_DAYS': '0', **environment},
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            reader, writer = asyncio.run(asyncio.wait_for(asyncio.open_connection(HOST, port), 1))
+            writer.close()
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"serve.py {' '.join(arguments)} did not start")
+
+
+def main(connections: int, duration: float, posts: int, names: list) -> None:
+    post_ids = seed(posts, random.Random(42))
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
+    print(f"{'configuration':<15} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for offset, name in enumerate(names):
+        arguments, environment, keep_alive = CONFIGURATIONS[name]
+        port = 8100 + offset
+        process = start_server(port, arguments, environment)
+        try:
+            # Warm up the pools and caches before measuring
+            asyncio.run(load(port, connections, 1, keep_alive, post_ids))
+            result = asyncio.run(load(port, connections, duration, keep_alive, post_ids))
+        finally:
+            process.send_signal(signal.SIGTERM)
+            process.wait(30)
+        print(
+            f"{name:<15} {result['throughput_rps']:>9.1f} {result['p50_ms']:>8.2f} "
+            f"{result['p99_ms']:>8.2f} {result['errors']:>7}"
+        )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--connections', type=int, default=32, help='concurrent client connections')
+    parser.add_argument('--duration', type=float, default=10, help='seconds measured per configuration')
+    parser.add_argument('--posts', type=int, default=10000, help='number of seeded posts')
+    parser.add_argument('--configurations', default=','.join(CONFIGURATIONS),
+                        help='comma-separated configurations to run')
+    args = parser.parse_args()
+    main(args.connections, args.duration, args.posts, args.configurations.split(','))
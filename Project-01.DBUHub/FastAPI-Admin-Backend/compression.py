@@ -0,0 +1,168 @@
+from typing import Optional
+import os
+import zlib
+
+try:
+    import brotli
+except ImportError:  # Only gzip is offered without the brotli package
+    brotli = None
+
+# Set to false when a reverse proxy already compresses responses
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Complete responses smaller than this many bytes are sent as they are;
+# below roughly one packet compression saves nothing worth its CPU time
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+
+# gzip level (1-9) and brotli quality (0-11). Brotli 4 is about as fast as
+# gzip 6 and compresses JSON noticeably better.
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 4))
+
+# Media types worth compressing; images and archives are already compressed
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+# Streams of small, latency-sensitive messages, sent as they are
+UNCOMPRESSED_TYPES = ("text/event-stream",)
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Pick the content coding for a response from the Accept-Encoding header.
+
+    Args:
+        accept_encoding (str): The request's Accept-Encoding header.
+
+    Returns:
+        Optional[str]: 'br' or 'gzip', or None to send the response as is.
+    """
+    weights = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.partition(";")
+        weight = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[name.strip()] = weight
+
+    for encoding in ("br", "gzip") if brotli is not None else ("gzip",):
+        if weights.get(encoding, weights.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+class Compressor:
+    """
+    Incremental gzip or brotli encoder for one response body.
+    """
+
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+        else:
+            self._brotli = None
+            # wbits=31 writes the gzip header and trailer
+            self._zlib = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress_all(self, data: bytes) -> bytes:
+        """Compress a complete body in one go."""
+        if self._brotli is not None:
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_FINISH)
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress a chunk and flush it, so streamed rows reach the client promptly."""
+        if self._brotli is not None:
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        """Return the end of the compressed stream."""
+        if self._brotli is not None:
+            return self._brotli.finish()
+        return self._zlib.flush(zlib.Z_FINISH)
+
+class CompressionMiddleware:
+    """
+    ASGI middleware that compresses JSON, NDJSON and text responses with
+    brotli or gzip, whichever the client accepts (brotli preferred).
+
+    Complete responses below COMPRESSION_MIN_SIZE are left alone. Streamed
+    responses (exports) are compressed chunk by chunk without buffering.
+    Responses that already carry a Content-Encoding pass through.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = choose_encoding(accept_encoding)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        compressor = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                # Hold the headers until the first body chunk shows the size
+                start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is None:
+                headers = [(name, value) for name, value in start["headers"]]
+                names = {name.lower() for name, _ in headers}
+                content_type = next((value for name, value in headers if name.lower() == b"content-type"), b"")
+                media_type = content_type.decode("latin-1")
+                compressible = media_type.startswith(COMPRESSIBLE_TYPES) \
+                    and not media_type.startswith(UNCOMPRESSED_TYPES) \
+                    and b"content-encoding" not in names
+                if compressible:
+                    headers.append((b"vary", b"Accept-Encoding"))
+                if not compressible or (not more_body and len(body) < COMPRESSION_MIN_SIZE):
+                    passthrough = True
+                    await send({**start, "headers": headers})
+                    await send(message)
+                    return
+
+                compressor = Compressor(encoding)
+                headers = [
+                    # The compressed bytes differ, so a strong validator must become weak
+                    (name, b"W/" + value if name.lower() == b"etag" and not value.startswith(b"W/") else value)
+                    for name, value in headers if name.lower() != b"content-length"
+                ]
+                headers.append((b"content-encoding", encoding.encode()))
+                if not more_body:
+                    body = compressor.compress_all(body)
+                    headers.append((b"content-length", str(len(body)).encode()))
+                    await send({**start, "headers": headers})
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                await send({**start, "headers": headers})
+
+            chunk = compressor.compress(body) if body else b""
+            if not more_body:
+                chunk += compressor.finish()
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,172 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Iterator, Optional
+from sqlalchemy import delete as sql_delete, insert, select, text
+from sqlalchemy.orm import Session
+from database import feed_cache, feed_state
+from database.database import SessionLocal, engine
+from database.models import ArchivedPost, DbPost
+
+# Posts older than this many days (by DbPost.timestamp) are moved to the
+# post_archive table (0 disables archiving)
+POST_ARCHIVE_AFTER_DAYS = float(os.getenv('POST_ARCHIVE_AFTER_DAYS', 0))
+
+# Posts moved per transaction. Each batch holds its row locks only for the
+# time it takes to move this many rows.
+POST_ARCHIVE_BATCH_SIZE = int(os.getenv('POST_ARCHIVE_BATCH_SIZE', 500))
+
+# Seconds to pause between batches, so request writes are not starved
+POST_ARCHIVE_BATCH_PAUSE = float(os.getenv('POST_ARCHIVE_BATCH_PAUSE', 0.05))
+
+# Seconds between archiving runs
+POST_ARCHIVE_INTERVAL = float(os.getenv('POST_ARCHIVE_INTERVAL', 3600))
+
+# Whether this process runs the archiver. Every worker started by serve.py
+# shares one environment, so on Postgres the processes that have it on
+# take turns through an advisory lock; elsewhere turn it on for a single
+# process only (e.g. one instance, or a separate single-worker deployment).
+POST_ARCHIVE_WORKER = os.getenv('POST_ARCHIVE_WORKER', 'true').lower() in ('1', 'true', 'yes')
+
+# Postgres advisory lock key held for the length of an archiving run
+ARCHIVE_LOCK_KEY = 7301
+
+# Columns moved from the post table to the archive
+ARCHIVED_COLUMNS = ('id', 'title', 'content', 'excerpt', 'content_length', 'creator_id', 'timestamp', 'updated_at')
+
+def archive_batch(db: Session, cutoff: datetime, batch_size: int = POST_ARCHIVE_BATCH_SIZE) -> int:
+    """
+    Move up to batch_size of the oldest posts created before cutoff into
+    the archive, in one transaction.
+
+    The rows are taken with DELETE ... RETURNING, so when several workers
+    archive at once each row is moved by exactly one of them; on Postgres
+    rows locked by another worker are skipped rather than waited for.
+
+    Args:
+    - db: The database session (primary).
+    - cutoff: Posts with an older timestamp are archived.
+    - batch_size: Maximum number of posts to move.
+
+    Returns:
+    - The number of posts moved.
+    """
+    oldest = (
+        select(DbPost.id)
+        .filter(DbPost.timestamp < cutoff)
+        .order_by(DbPost.timestamp.asc(), DbPost.id.asc())
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    rows = db.execute(
+        sql_delete(DbPost)
+        .filter(DbPost.id.in_(oldest))
+        .returning(*(getattr(DbPost, name) for name in ARCHIVED_COLUMNS))
+        .execution_options(synchronize_session=False)
+    ).all()
+    if not rows:
+        db.rollback()
+        return 0
+
+    archived_at = datetime.utcnow()
+    db.execute(insert(ArchivedPost), [{**row._mapping, 'archived_at': archived_at} for row in rows])
+    feed_state.bump(db.connection())
+    db.commit()
+    feed_cache.invalidate()
+    return len(rows)
+
+# Set at shutdown to end a run between two batches
+_stopping = threading.Event()
+
+@contextmanager
+def archive_lock() -> Iterator[bool]:
+    """
+    Take the archiving lock for one run, so a single process archives at a
+    time. On Postgres this is a session-level advisory lock held on its own
+    connection, as the run's session returns its connection after every
+    batch. Other databases have no such lock and always get it.
+
+    Yields:
+    - True if this process holds the lock, False if another one does.
+    """
+    if engine.dialect.name != 'postgresql':
+        yield True
+        return
+    with engine.connect() as connection:
+        acquired = connection.execute(text('SELECT pg_try_advisory_lock(:key)'), {'key': ARCHIVE_LOCK_KEY}).scalar()
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                connection.execute(text('SELECT pg_advisory_unlock(:key)'), {'key': ARCHIVE_LOCK_KEY})
+
+def archive_old_posts(
+    max_age_days: float = POST_ARCHIVE_AFTER_DAYS,
+    batch_size: int = POST_ARCHIVE_BATCH_SIZE,
+    pause: float = POST_ARCHIVE_BATCH_PAUSE
+) -> int:
+    """
+    Archive every post older than max_age_days, one batch at a time.
+
+    Args:
+    - max_age_days: Age in days after which a post is archived.
+    - batch_size: Posts moved per transaction.
+    - pause: Seconds to sleep between batches.
+
+    Returns:
+    - The number of posts moved; 0 if another process holds the archiving lock.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=max_age_days)
+    moved = 0
+    with archive_lock() as acquired:
+        if not acquired:
+            logging.info("Another process is archiving posts, skipping this run")
+            return 0
+        with SessionLocal() as db:
+            while not _stopping.is_set():
+                count = archive_batch(db, cutoff, batch_size)
+                moved += count
+                if count < batch_size:
+                    break
+                time.sleep(pause)
+    if moved:
+        logging.info(f"Archived {moved} posts created before {cutoff.isoformat()}")
+    return moved
+
+async def run_periodically(interval: float = POST_ARCHIVE_INTERVAL) -> None:
+    """Archive old posts every interval seconds, in a worker thread, until stop() is called."""
+    while not _stopping.is_set():
+        try:
+            await asyncio.to_thread(archive_old_posts)
+        except Exception as e:
+            logging.error(f"Error in archiving posts: {e}", exc_info=True)
+        try:
+            await asyncio.wait_for(_wakeup.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
+
+# The periodic archiving task of this worker and the event that ends its wait
+_task: Optional[asyncio.Task] = None
+_wakeup: Optional[asyncio.Event] = None
+
+async def start() -> None:
+    """Start the periodic archiving task, if archiving is enabled for this process. Run at application start-up."""
+    global _task, _wakeup
+    if POST_ARCHIVE_AFTER_DAYS > 0 and POST_ARCHIVE_WORKER:
+        _stopping.clear()
+        _wakeup = asyncio.Event()
+        _task = asyncio.create_task(run_periodically())
+
+async def stop() -> None:
+    """Stop the archiving task, letting a batch in progress finish. Run at application shutdown."""
+    global _task
+    if _task is None:
+        return
+    _stopping.set()
+    _wakeup.set()
+    await _task
+    _task = None
@@ -1,7 +1,11 @@
+import asyncio
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
+from database.pool_metrics import InstrumentedAsyncQueuePool, InstrumentedQueuePool
 import os
 
 # Load environment variables from a .env file
@@ -10,12 +14,131 @@ load_dotenv()
 # Retrieve the database URL from environment variables
 DATABASE_URL = os.getenv('DATABASE_URL')
 
+# Connection pool settings, applied to the sync and the async engine
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 10))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 30))
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', -1))
+DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'false').lower() in ('1', 'true', 'yes')
+
+# Server-side statement timeout in milliseconds (Postgres only, 0 disables)
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', 0))
+
+# Connections opened in each pool at start-up, capped at DB_POOL_SIZE, so the
+# first requests after a cold start do not pay for connecting (0 disables)
+DB_POOL_PREWARM = int(os.getenv('DB_POOL_PREWARM', 1))
+
+def get_engine_options(url: str, is_async: bool = False) -> dict:
+    """
+    Build the create_engine keyword arguments for a database URL.
+
+    Args:
+        url (str): The database URL.
+        is_async (bool): Whether the options are for the async engine.
+
+    Returns:
+        dict: Pool and connection options for create_engine / create_async_engine.
+    """
+    parsed = make_url(url)
+    if parsed.get_backend_name() == 'sqlite' and parsed.database in (None, '', ':memory:'):
+        # In-memory SQLite lives in a single connection; keep the default pool
+        return {}
+
+    options = {
+        'poolclass': InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        'pool_size': DB_POOL_SIZE,
+        'max_overflow': DB_MAX_OVERFLOW,
+        'pool_timeout': DB_POOL_TIMEOUT,
+        'pool_recycle': DB_POOL_RECYCLE,
+        'pool_pre_ping': DB_POOL_PRE_PING,
+    }
+
+    if DB_STATEMENT_TIMEOUT_MS and parsed.get_backend_name() == 'postgresql':
+        if is_async:
+            options['connect_args'] = {'server_settings': {'statement_timeout': str(DB_STATEMENT_TIMEOUT_MS)}}
+        else:
+            options['connect_args'] = {'options': f'-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}'}
+
+    return options
+
 # Create the SQLAlchemy engine for connecting to the database
-engine = create_engine(DATABASE_URL)
+engine = create_engine(DATABASE_URL, **get_engine_options(DATABASE_URL))
 
 # Create a configured "Session" class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async drivers used in place of the sync ones for the same database
+ASYNC_DRIVERS = {
+    'postgresql': 'postgresql+asyncpg',
+    'sqlite': 'sqlite+aiosqlite',
+}
+
+def get_async_database_url(url: str) -> str:
+    """
+    Derive the async driver URL for a sync database URL.
+
+    Args:
+        url (str): The sync database URL, e.g. postgresql://...
+
+    Returns:
+        str: The same URL using the matching async driver.
+    """
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.get_backend_name(), parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+# The async URL can be set explicitly, otherwise it is derived from DATABASE_URL
+ASYNC_DATABASE_URL = os.getenv('ASYNC_DATABASE_URL') or get_async_database_url(DATABASE_URL)
+
+# Create the async engine used by the async route handlers
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **get_engine_options(ASYNC_DATABASE_URL, is_async=True))
+
+# Create a configured "AsyncSession" class. Objects stay loaded after commit
+# so handlers can return them without another round trip.
+AsyncSessionLocal = sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+def prewarm_pool(sync_engine, connections: int = DB_POOL_PREWARM) -> None:
+    """
+    Open connections in a sync engine's pool ahead of the first request.
+
+    Args:
+        sync_engine: The engine whose pool to fill.
+        connections (int): How many connections to open.
+    """
+    held = []
+    try:
+        for _ in range(min(connections, DB_POOL_SIZE)):
+            held.append(sync_engine.connect())
+    finally:
+        # Closing returns the connections to the pool, still open
+        for connection in held:
+            connection.close()
+
+async def prewarm_async_pool(engine, connections: int = DB_POOL_PREWARM) -> None:
+    """
+    Open connections in an async engine's pool concurrently, ahead of the
+    first request.
+
+    Args:
+        engine: The AsyncEngine whose pool to fill.
+        connections (int): How many connections to open.
+    """
+    results = await asyncio.gather(
+        *(engine.connect().start() for _ in range(min(connections, DB_POOL_SIZE))),
+        return_exceptions=True
+    )
+    for result in results:
+        if not isinstance(result, BaseException):
+            await result.close()
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
 # Create a base class for SQLAlchemy models to inherit from
 Base = declarative_base()
 
@@ -23,12 +146,27 @@ Base = declarative_base()
 def get_db():
     """
     Provides a database session for dependency injection.
+
+    The session is bound to one connection held for the whole request, so
+    a commit does not hand the connection back to the pool and the
+    statements after it do not check out another. FastAPI caches the
+    dependency per request, so every dependency asking for it gets the
+    same session.
     
     Yields:
         Session: A SQLAlchemy session.
     """
-    db = SessionLocal()
-    try:
+    with engine.connect() as connection, SessionLocal(bind=connection) as db:
+        yield db
+
+# Dependency for getting an async database session
+async def get_async_db():
+    """
+    Provides an async database session for dependency injection, bound to
+    one connection for the whole request like get_db.
+
+    Yields:
+        AsyncSession: A SQLAlchemy async session.
+    """
+    async with async_engine.connect() as connection, AsyncSessionLocal(bind=connection) as db:
         yield db
-    finally:
-        db.close()
@@ -1,117 +1,710 @@
-from sqlalchemy.orm import Session
-from sqlalchemy.exc import NoResultFound
-from database.models import DbPost
-from routers.schemas import PostBase
+import base64
+import json
+import os
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import delete as sql_delete, insert, select, tuple_, union_all, update as sql_update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
+from database import feed_cache, feed_events, feed_state, replicas, search
+from database.models import ArchivedPost, DbPost, User
+from routers.schemas import PostBase, PostUpdateItem
 from fastapi import HTTPException
 
-def create(db: Session, request: PostBase, creator_id: int) -> DbPost:
+# Page size used when the client does not ask for one
+DEFAULT_PAGE_SIZE = int(os.getenv('POST_PAGE_DEFAULT_SIZE', 20))
+
+# Hard upper bound on the number of posts returned by a single page
+MAX_PAGE_SIZE = int(os.getenv('POST_PAGE_MAX_SIZE', 100))
+
+# Load the creator in the same SELECT as the post. PostDisplay embeds the
+# creator, so without this every serialized post lazy-loads its user row.
+WITH_CREATOR = joinedload(DbPost.creator).load_only(User.id)
+ARCHIVED_WITH_CREATOR = joinedload(ArchivedPost.creator).load_only(User.id)
+
+# Columns selected by list endpoints, in the order routers.fast_json.post_dicts
+# expects. Plain tuples skip ORM identity-map and relationship bookkeeping.
+LIST_COLUMNS = (DbPost.id, DbPost.title, DbPost.content, DbPost.creator_id, DbPost.timestamp)
+
+# Columns behind each field a list request can select, in output order
+FIELD_COLUMNS = {
+    'id': DbPost.id,
+    'title': DbPost.title,
+    'content': DbPost.content,
+    'excerpt': DbPost.excerpt,
+    'content_length': DbPost.content_length,
+    'creator': DbPost.creator_id,
+    'timestamp': DbPost.timestamp,
+}
+
+# Maximum length of the excerpt stored with each post, in characters
+EXCERPT_LENGTH = int(os.getenv('POST_EXCERPT_LENGTH', 200))
+
+def make_excerpt(content: str) -> str:
+    """
+    Cut content down to EXCERPT_LENGTH characters, at a word boundary when
+    one is close, marking the cut with an ellipsis.
+    
+    Args:
+    - content: The full post content.
+    
+    Returns:
+    - The excerpt; the content itself if it is short enough.
+    """
+    if len(content) <= EXCERPT_LENGTH:
+        return content
+    excerpt = content[:EXCERPT_LENGTH]
+    space = excerpt.rfind(' ')
+    if space > EXCERPT_LENGTH // 2:
+        excerpt = excerpt[:space]
+    return excerpt.rstrip() + '\u2026'
+
+def derived_values(content: str) -> dict:
+    """
+    Compute the columns derived from a post's content. Every write that
+    sets the content must set these too.
+    
+    Args:
+    - content: The full post content.
+    
+    Returns:
+    - The excerpt and content_length values.
+    """
+    return {'excerpt': make_excerpt(content), 'content_length': len(content)}
+
+def feed_item(post) -> dict:
+    """
+    Shape a post like an item of the feed (PostDisplay), for live events.
+    
+    Args:
+    - post: A DbPost or a row with id, title, content, creator_id and timestamp.
+    
+    Returns:
+    - The item as a dict.
+    """
+    return {
+        'id': post.id,
+        'title': post.title,
+        'content': post.content,
+        'creator': {'id': post.creator_id},
+        'timestamp': post.timestamp
+    }
+
+def update_patch(post) -> dict:
+    """
+    Describe an update for live events: the fields a write can change.
+    
+    Args:
+    - post: A row or mapping with id, title, content and updated_at.
+    
+    Returns:
+    - The changed fields as a dict.
+    """
+    return {'id': post['id'], 'title': post['title'], 'content': post['content'], 'updated_at': post['updated_at']}
+
+def field_columns(fields: Optional[Tuple[str, ...]]) -> tuple:
+    """
+    Pick the columns to select for a list request.
+    
+    Args:
+    - fields: Names from FIELD_COLUMNS, or None for LIST_COLUMNS.
+    
+    Returns:
+    - The columns, always including id and timestamp, which page cursors need.
+    """
+    if fields is None:
+        return LIST_COLUMNS
+    names = set(fields) | {'id', 'timestamp'}
+    return tuple(column for name, column in FIELD_COLUMNS.items() if name in names)
+
+def encode_cursor(post, direction: str) -> str:
+    """
+    Build an opaque pagination cursor pointing at a post.
+    
+    Args:
+    - post: The post (or LIST_COLUMNS row) at the edge of the current page.
+    - direction: 'next' for older posts, 'prev' for newer posts.
+    
+    Returns:
+    - A URL-safe cursor token.
+    """
+    raw = json.dumps({'ts': post.timestamp.isoformat(), 'id': post.id, 'dir': direction})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int, str]:
+    """
+    Decode a cursor produced by encode_cursor.
+    
+    Args:
+    - cursor: The cursor token sent by the client.
+    
+    Returns:
+    - A (timestamp, id, direction) tuple.
+    
+    Raises:
+    - HTTPException: If the cursor is malformed.
     """
-    Create a new post in the database.
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        direction = data['dir']
+        if direction not in ('next', 'prev'):
+            raise ValueError(direction)
+        post_id = int(data['id'])
+        # Keep a tampered ID within the 64-bit range the database accepts
+        if not 0 <= post_id < 2 ** 63:
+            raise ValueError(post_id)
+        return datetime.fromisoformat(data['ts']), post_id, direction
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail='Invalid cursor')
+
+def get_page(
+    db: Session,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    columns: tuple = LIST_COLUMNS,
+    creator_id: Optional[int] = None
+) -> Tuple[List[tuple], Optional[str], Optional[str]]:
+    """
+    Retrieve one page of posts, newest first, using keyset pagination.
+    
+    The page is located by comparing against the (timestamp, id) of the
+    cursor post, so the cost of a page does not depend on how deep into
+    the feed it is. With creator_id the page is read from the
+    (creator_id, timestamp, id) index instead.
     
     Args:
     - db: The database session.
-    - request: The post data.
-    - creator_id: The ID of the user creating the post.
+    - limit: The requested page size, clamped to MAX_PAGE_SIZE.
+    - cursor: A cursor from a previous page, or None for the first page.
+    - columns: The columns to select, from field_columns(); must include
+      id and timestamp.
+    - creator_id: Only list the posts of this user, or None for all posts.
     
     Returns:
-    - The newly created DbPost object.
+    - A (posts, next_cursor, prev_cursor) tuple, where posts are rows of
+      columns. A cursor is None when there is nothing further in
+      that direction.
     """
-    new_post = DbPost(
-        title=request.title,
-        content=request.content,
-        creator_id=creator_id
-    )
-    db.add(new_post)
-    db.commit()
-    db.refresh(new_post)
-    return new_post
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    key = tuple_(DbPost.timestamp, DbPost.id)
+    query = db.query(*columns)
+    if creator_id is not None:
+        query = query.filter(DbPost.creator_id == creator_id)
+
+    if cursor is None:
+        direction = 'next'
+        query = query.order_by(DbPost.timestamp.desc(), DbPost.id.desc())
+    else:
+        ts, post_id, direction = decode_cursor(cursor)
+        if direction == 'next':
+            query = query.filter(key < (ts, post_id)).order_by(DbPost.timestamp.desc(), DbPost.id.desc())
+        else:
+            query = query.filter(key > (ts, post_id)).order_by(DbPost.timestamp.asc(), DbPost.id.asc())
+
+    # Fetch one extra row to find out whether another page exists
+    posts = query.limit(limit + 1).all()
+    has_more = len(posts) > limit
+    posts = posts[:limit]
+
+    if direction == 'prev':
+        posts.reverse()
+
+    if not posts:
+        return posts, None, None
+
+    if direction == 'next':
+        next_cursor = encode_cursor(posts[-1], 'next') if has_more else None
+        prev_cursor = encode_cursor(posts[0], 'prev') if cursor is not None else None
+    else:
+        next_cursor = encode_cursor(posts[-1], 'next')
+        prev_cursor = encode_cursor(posts[0], 'prev') if has_more else None
+
+    return posts, next_cursor, prev_cursor
+
+# Rows fetched per round trip by the server-side cursor of an export
+EXPORT_BATCH_SIZE = int(os.getenv('POST_EXPORT_BATCH_SIZE', 1000))
+
+# Columns written by exports, in output order
+EXPORT_COLUMNS = ('id', 'title', 'content', 'creator_id', 'timestamp', 'updated_at')
+
+def export_query(since: Optional[datetime] = None):
+    """
+    Build the export query: posts and archived posts, oldest change first.
+    
+    Each table is read through its updated_at index and the two ordered
+    halves are merged, so the database does not sort the result.
+    
+    Args:
+    - since: Only include posts created or updated at or after this naive
+      UTC time.
+    
+    Returns:
+    - The SELECT statement, with one column per EXPORT_COLUMNS entry.
+    """
+    parts = []
+    for model in (DbPost, ArchivedPost):
+        part = select(*(getattr(model, name) for name in EXPORT_COLUMNS))
+        if since is not None:
+            part = part.filter(model.updated_at >= since)
+        parts.append(part)
+    combined = union_all(*parts).subquery()
+    return select(*(combined.c[name] for name in EXPORT_COLUMNS)).order_by(combined.c.updated_at.asc(), combined.c.id.asc())
+
+def iter_export_rows(db: Session, since: Optional[datetime] = None, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[tuple]:
+    """
+    Yield every post, archived posts included, as a tuple of
+    EXPORT_COLUMNS, oldest change first.
+    
+    Rows are read through a server-side cursor in batches of batch_size,
+    so memory use does not depend on the size of the table. The session
+    must stay open until the generator is exhausted; a request's session
+    does, as FastAPI closes it once the streamed response is sent.
+    
+    Args:
+    - db: The database session.
+    - since: Only include posts created or updated at or after this naive
+      UTC time. Deleted posts are not reported.
+    - batch_size: Number of rows fetched per round trip.
+    
+    Yields:
+    - One tuple per post.
+    """
+    result = db.execute(export_query(since).execution_options(stream_results=True, yield_per=batch_size))
+    for batch in result.partitions():
+        yield from batch
+
+# Search results are paged by offset; this bounds how deep a client can go
+MAX_SEARCH_OFFSET = int(os.getenv('POST_SEARCH_MAX_OFFSET', 1000))
 
-def get_all(db: Session):
+def search_posts(db: Session, query: str, limit: int = DEFAULT_PAGE_SIZE, offset: int = 0) -> Tuple[List[Tuple[DbPost, float, str]], Optional[int]]:
     """
-    Retrieve all posts from the database.
+    Full-text search over post titles and contents.
     
     Args:
     - db: The database session.
+    - query: The user's search text.
+    - limit: Maximum number of results, clamped to MAX_PAGE_SIZE.
+    - offset: Number of results to skip, clamped to MAX_SEARCH_OFFSET.
     
     Returns:
-    - A list of all DbPost objects.
+    - A (results, next_offset) tuple. results holds (post, rank, snippet)
+      tuples, best match first; next_offset is None on the last page.
     """
-    return db.query(DbPost).all()
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    offset = max(0, min(offset, MAX_SEARCH_OFFSET))
+
+    # Fetch one extra match to find out whether another page exists
+    matches = search.find_matches(db, query, limit + 1, offset)
+    has_more = len(matches) > limit
+    matches = matches[:limit]
+    next_offset = offset + limit if has_more and offset + limit <= MAX_SEARCH_OFFSET else None
+    if not matches:
+        return [], None
+
+    posts = db.query(DbPost).options(WITH_CREATOR).filter(DbPost.id.in_([post_id for post_id, _, _ in matches])).all()
+    posts_by_id = {post.id: post for post in posts}
+    results = [(posts_by_id[post_id], rank, snippet) for post_id, rank, snippet in matches if post_id in posts_by_id]
+    return results, next_offset
 
 def get_by_id(id: int, db: Session) -> DbPost:
     """
-    Retrieve a post by its ID.
+    Retrieve a post by its ID, looking in the archive when it is not in
+    the post table.
     
     Args:
     - id: The ID of the post to retrieve.
     - db: The database session.
     
     Returns:
-    - The DbPost object with the given ID.
+    - The DbPost (or ArchivedPost) object with the given ID.
     
     Raises:
     - HTTPException: If no post is found with the given ID.
     """
-    try:
-        return db.query(DbPost).filter(DbPost.id == id).one()
-    except NoResultFound:
+    post = db.query(DbPost).options(WITH_CREATOR).filter(DbPost.id == id).one_or_none()
+    if post is None:
+        post = db.query(ArchivedPost).options(ARCHIVED_WITH_CREATOR).filter(ArchivedPost.id == id).one_or_none()
+    if post is None:
         raise HTTPException(
             status_code=404,
             detail=f'Post with id {id} not found'
         )
+    return post
 
-def update(db: Session, post_id: int, request: PostBase) -> DbPost:
+# Columns returned by conditional writes; enough to build a PostDisplay
+WRITE_COLUMNS = ('id', 'title', 'content', 'creator_id', 'timestamp', 'updated_at')
+
+def conditional_update(post_id: int, request: PostBase, creator_id: int, model=DbPost):
     """
-    Update an existing post.
+    Build an UPDATE that only matches the post if it belongs to creator_id.
     
     Args:
-    - db: The database session.
     - post_id: The ID of the post to update.
     - request: The new post data.
+    - creator_id: The ID of the user making the change.
+    - model: DbPost, or ArchivedPost to update an archived post.
     
     Returns:
-    - The updated DbPost object.
+    - The UPDATE ... RETURNING statement.
+    """
+    return (
+        sql_update(model)
+        .filter(model.id == post_id, model.creator_id == creator_id)
+        .values(title=request.title, content=request.content, updated_at=datetime.utcnow(), **derived_values(request.content))
+        .returning(*(getattr(model, name) for name in WRITE_COLUMNS))
+        .execution_options(synchronize_session=False)
+    )
+
+def conditional_delete(post_id: int, creator_id: int, model=DbPost):
+    """
+    Build a DELETE that only matches the post if it belongs to creator_id.
     
-    Raises:
-    - HTTPException: If the post is not found.
+    Args:
+    - post_id: The ID of the post to delete.
+    - creator_id: The ID of the user making the change.
+    - model: DbPost, or ArchivedPost to delete an archived post.
+    
+    Returns:
+    - The DELETE ... RETURNING statement.
     """
-    post = db.query(DbPost).filter(DbPost.id == post_id).first()
+    return (
+        sql_delete(model)
+        .filter(model.id == post_id, model.creator_id == creator_id)
+        .returning(model.id)
+        .execution_options(synchronize_session=False)
+    )
 
-    if not post:
-        raise HTTPException(status_code=404, detail="Post not found")
+def post_exists(post_id: int):
+    """
+    Build a query that returns a row if the post is in the post table or
+    in the archive.
     
-    # Update post fields
-    post.title = request.title
-    post.content = request.content
+    Args:
+    - post_id: The ID of the post.
+    
+    Returns:
+    - The SELECT statement.
+    """
+    return union_all(
+        select(DbPost.id).filter(DbPost.id == post_id),
+        select(ArchivedPost.id).filter(ArchivedPost.id == post_id)
+    )
 
-    db.commit()
-    db.refresh(post)
+def write_failure(post_id: int, exists: bool, action: str) -> HTTPException:
+    """
+    Build the error for a conditional write that matched no row.
+    
+    Args:
+    - post_id: The ID of the post.
+    - exists: Whether a post with that ID exists.
+    - action: The attempted action, e.g. 'update'.
+    
+    Returns:
+    - A 404 HTTPException if the post is missing, 403 if it belongs to someone else.
+    """
+    if not exists:
+        return HTTPException(status_code=404, detail=f'Post with id {post_id} not found')
+    return HTTPException(status_code=403, detail=f'Not authorized to {action} this post')
 
-    return post
+async def create_async(db: AsyncSession, request: PostBase, creator_id: int) -> DbPost:
+    """
+    Create a new post in the database without blocking the event loop.
+    
+    Args:
+    - db: The async database session.
+    - request: The post data.
+    - creator_id: The ID of the user creating the post.
+    
+    Returns:
+    - The newly created DbPost object, with its creator loaded.
+    """
+    new_post = DbPost(
+        title=request.title,
+        content=request.content,
+        creator_id=creator_id,
+        **derived_values(request.content)
+    )
+    db.add(new_post)
+    await db.commit()
+    feed_cache.invalidate()
+    replicas.mark_write(creator_id)
+    feed_events.publish('created', [feed_item(new_post)])
+    # Lazy loading is not available on async sessions, so load the creator now
+    return await get_by_id_async(new_post.id, db)
+
+async def get_by_id_async(id: int, db: AsyncSession) -> DbPost:
+    """
+    Retrieve a post by its ID without blocking the event loop, looking in
+    the archive when it is not in the post table.
+    
+    Args:
+    - id: The ID of the post to retrieve.
+    - db: The async database session.
+    
+    Returns:
+    - The DbPost (or ArchivedPost) object with the given ID.
+    
+    Raises:
+    - HTTPException: If no post is found with the given ID.
+    """
+    for model, with_creator in ((DbPost, WITH_CREATOR), (ArchivedPost, ARCHIVED_WITH_CREATOR)):
+        result = await db.execute(
+            select(model)
+            .options(with_creator)
+            .filter(model.id == id)
+            .execution_options(populate_existing=True)
+        )
+        post = result.scalar_one_or_none()
+        if post is not None:
+            return post
+    raise HTTPException(
+        status_code=404,
+        detail=f'Post with id {id} not found'
+    )
+
+async def update_async(db: AsyncSession, post_id: int, request: PostBase, creator_id: int):
+    """
+    Update a post owned by creator_id with one UPDATE ... RETURNING,
+    without blocking the event loop. A post that is not in the post table
+    is looked for in the archive, and stays there once updated.
+    
+    Args:
+    - db: The async database session.
+    - post_id: The ID of the post to update.
+    - request: The new post data.
+    - creator_id: The ID of the user making the change.
+    
+    Returns:
+    - The updated row (WRITE_COLUMNS).
+    
+    Raises:
+    - HTTPException: 404 if the post does not exist, 403 if it belongs to another user.
+    """
+    row = (await db.execute(conditional_update(post_id, request, creator_id))).first()
+    archived = row is None
+    if archived:
+        row = (await db.execute(conditional_update(post_id, request, creator_id, ArchivedPost))).first()
+    if row is None:
+        # Only the failure path pays for a read, to tell 404 from 403
+        exists = (await db.execute(post_exists(post_id))).first() is not None
+        raise write_failure(post_id, exists, 'update')
 
-def delete(id: int, db: Session, creator_id: int):
+    await bump_feed_version_async(db)
+    await db.commit()
+    feed_cache.invalidate()
+    replicas.mark_write(creator_id)
+    if not archived:
+        # Archived posts are not in the feed, so live subscribers are not told
+        feed_events.publish('updated', [update_patch(row._mapping)])
+    return row
+
+async def delete_async(id: int, db: AsyncSession, creator_id: int):
     """
-    Delete a post by its ID.
+    Delete a post owned by creator_id with one DELETE ... RETURNING,
+    without blocking the event loop. A post that is not in the post table
+    is looked for in the archive.
     
     Args:
     - id: The ID of the post to delete.
-    - db: The database session.
+    - db: The async database session.
     - creator_id: The ID of the user attempting to delete the post.
     
     Returns:
     - A success message.
     
     Raises:
-    - HTTPException: If the post is not found or if the user is not authorized to delete the post.
+    - HTTPException: 404 if the post does not exist, 403 if it belongs to another user.
     """
-    post = get_by_id(id, db)
+    row = (await db.execute(conditional_delete(id, creator_id))).first()
+    archived = row is None
+    if archived:
+        row = (await db.execute(conditional_delete(id, creator_id, ArchivedPost))).first()
+    if row is None:
+        exists = (await db.execute(post_exists(id))).first() is not None
+        raise write_failure(id, exists, 'delete')
+
+    await bump_feed_version_async(db)
+    await db.commit()
+    feed_cache.invalidate()
+    replicas.mark_write(creator_id)
+    if not archived:
+        feed_events.publish('deleted', [{'id': id}])
+    return {'detail': 'Post deleted successfully'}
+
+async def bump_feed_version_async(db: AsyncSession) -> None:
+    """
+    Bump the feed version inside the current transaction.
     
-    if post.creator_id != creator_id:
-        raise HTTPException(
-            status_code=403,
-            detail="Not authorized to delete this post"
-        )
+    Needed after bulk statements, which bypass the ORM flush that
+    normally bumps it.
     
-    db.delete(post)
-    db.commit()
-    return {'detail': 'Post deleted successfully'}
+    Args:
+    - db: The async database session.
+    """
+    await db.run_sync(lambda session: feed_state.bump(session.connection()))
+
+async def bulk_create_async(db: AsyncSession, requests: List[PostBase], creator_id: int) -> List[int]:
+    """
+    Insert many posts with one multi-row INSERT in a single transaction.
+    
+    Args:
+    - db: The async database session.
+    - requests: The post data, one entry per post.
+    - creator_id: The ID of the user creating the posts.
+    
+    Returns:
+    - The IDs of the new posts, in the order of requests.
+    """
+    if not requests:
+        return []
+
+    now = datetime.utcnow()
+    rows = [
+        {'title': request.title, 'content': request.content, 'creator_id': creator_id, 'timestamp': now, 'updated_at': now,
+         **derived_values(request.content)}
+        for request in requests
+    ]
+    result = await db.execute(insert(DbPost).returning(DbPost.id, sort_by_parameter_order=True), rows)
+    ids = list(result.scalars())
+    await bump_feed_version_async(db)
+    await db.commit()
+    feed_cache.invalidate()
+    replicas.mark_write(creator_id)
+    feed_events.publish('created', (
+        {'id': post_id, 'title': request.title, 'content': request.content, 'creator': {'id': creator_id}, 'timestamp': now}
+        for post_id, request in zip(ids, requests)
+    ))
+    return ids
+
+async def get_owners_async(db: AsyncSession, ids: List[int]) -> Tuple[Dict[int, int], Dict[int, int]]:
+    """
+    Look up the creators of many posts, locking the rows. The archive is
+    only queried for IDs that are not in the post table.
+    
+    Args:
+    - db: The async database session.
+    - ids: The post IDs.
+    
+    Returns:
+    - Two mappings of post ID to creator ID: posts in the post table, and
+      archived posts.
+    """
+    owners = []
+    missing = ids
+    for model in (DbPost, ArchivedPost):
+        found = {}
+        if missing:
+            result = await db.execute(
+                select(model.id, model.creator_id).filter(model.id.in_(missing)).with_for_update()
+            )
+            found = dict(result.all())
+            missing = [post_id for post_id in missing if post_id not in found]
+        owners.append(found)
+    return owners[0], owners[1]
+
+def check_ownership(ids: List[int], owners: Dict[int, int], creator_id: int) -> Dict[int, int]:
+    """
+    Work out which posts a user may change.
+    
+    Args:
+    - ids: The requested post IDs.
+    - owners: Post ID to creator ID, for posts in either table.
+    - creator_id: The ID of the user making the change.
+    
+    Returns:
+    - A mapping of post ID to status: 200 if allowed, 403 or 404 otherwise.
+    """
+    statuses = {}
+    for post_id in ids:
+        owner = owners.get(post_id)
+        if owner is None:
+            statuses[post_id] = 404
+        elif owner != creator_id:
+            statuses[post_id] = 403
+        else:
+            statuses[post_id] = 200
+    return statuses
+
+async def bulk_update_async(db: AsyncSession, requests: List[PostUpdateItem], creator_id: int) -> Dict[int, int]:
+    """
+    Update many posts owned by one user in a single transaction.
+    
+    Ownership of all posts is checked with one query (two if some are
+    archived), then the allowed posts are changed with one executemany
+    UPDATE by primary key per table.
+    
+    Args:
+    - db: The async database session.
+    - requests: The new post data; each entry carries the post ID.
+    - creator_id: The ID of the user making the change.
+    
+    Returns:
+    - A mapping of post ID to status: 200 if updated, 403 or 404 otherwise.
+    """
+    if not requests:
+        return {}
+
+    ids = [request.id for request in requests]
+    owners, archived_owners = await get_owners_async(db, ids)
+    statuses = check_ownership(ids, {**owners, **archived_owners}, creator_id)
+
+    now = datetime.utcnow()
+    rows = [
+        {'id': request.id, 'title': request.title, 'content': request.content, 'updated_at': now,
+         **derived_values(request.content)}
+        for request in requests if statuses[request.id] == 200
+    ]
+    if rows:
+        hot_rows = [row for row in rows if row['id'] in owners]
+        archived_rows = [row for row in rows if row['id'] in archived_owners]
+        for model, model_rows in ((DbPost, hot_rows), (ArchivedPost, archived_rows)):
+            if model_rows:
+                await db.execute(sql_update(model), model_rows)
+        await bump_feed_version_async(db)
+        await db.commit()
+        feed_cache.invalidate()
+        replicas.mark_write(creator_id)
+        feed_events.publish('updated', (update_patch(row) for row in hot_rows))
+    else:
+        await db.rollback()
+    return statuses
+
+async def bulk_delete_async(db: AsyncSession, ids: List[int], creator_id: int) -> Dict[int, int]:
+    """
+    Delete many posts owned by one user with a single DELETE statement
+    (one per table if some are archived).
+    
+    Args:
+    - db: The async database session.
+    - ids: The IDs of the posts to delete.
+    - creator_id: The ID of the user making the change.
+    
+    Returns:
+    - A mapping of post ID to status: 200 if deleted, 403 or 404 otherwise.
+    """
+    if not ids:
+        return {}
+
+    owners, archived_owners = await get_owners_async(db, ids)
+    statuses = check_ownership(ids, {**owners, **archived_owners}, creator_id)
+
+    allowed = [post_id for post_id, status in statuses.items() if status == 200]
+    if allowed:
+        hot_ids = [post_id for post_id in allowed if post_id in owners]
+        archived_ids = [post_id for post_id in allowed if post_id in archived_owners]
+        for model, model_ids in ((DbPost, hot_ids), (ArchivedPost, archived_ids)):
+            if model_ids:
+                await db.execute(
+                    sql_delete(model)
+                    .filter(model.id.in_(model_ids))
+                    .execution_options(synchronize_session=False)
+                )
+        await bump_feed_version_async(db)
+        await db.commit()
+        feed_cache.invalidate()
+        replicas.mark_write(creator_id)
+        feed_events.publish('deleted', ({'id': post_id} for post_id in hot_ids))
+    else:
+        await db.rollback()
+    return statuses
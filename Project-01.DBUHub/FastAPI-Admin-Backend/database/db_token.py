@@ -0,0 +1,141 @@
+import hashlib
+import os
+import secrets
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+from sqlalchemy import delete as sql_delete, select, update as sql_update
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.models import RefreshToken
+
+# Lifetime of a refresh token. Each refresh replaces the token with a new
+# one of the same lifetime, so a client active within this window stays
+# logged in without sending its password again.
+REFRESH_TOKEN_EXPIRE_DAYS = float(os.getenv('REFRESH_TOKEN_EXPIRE_DAYS', 30))
+
+def hash_token(token: str) -> str:
+    """
+    Hash a refresh token for storage and lookup.
+
+    Tokens are 256 random bits, so a single SHA-256 is enough; unlike
+    passwords they cannot be guessed and need no bcrypt.
+
+    Args:
+    - token: The token as sent by the client.
+
+    Returns:
+    - The hex digest stored in RefreshToken.token_hash.
+    """
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def _new_token(user_id: int, family_id: str, now: datetime) -> Tuple[str, RefreshToken]:
+    """Generate a token and the row that stores its hash."""
+    token = secrets.token_urlsafe(32)
+    row = RefreshToken(
+        token_hash=hash_token(token),
+        family_id=family_id,
+        user_id=user_id,
+        created_at=now,
+        expires_at=now + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    )
+    return token, row
+
+async def issue_async(db: AsyncSession, user_id: int) -> str:
+    """
+    Issue a refresh token for a login, starting a new token family.
+
+    The user's expired tokens are deleted in the same transaction, so the
+    table holds at most the tokens issued within one lifetime.
+
+    Args:
+    - db: The async database session.
+    - user_id: The ID of the user who logged in.
+
+    Returns:
+    - The token to hand to the client. Only its hash is stored.
+    """
+    now = datetime.utcnow()
+    await db.execute(
+        sql_delete(RefreshToken)
+        .where(RefreshToken.user_id == user_id, RefreshToken.expires_at < now)
+    )
+    token, row = _new_token(user_id, secrets.token_hex(16), now)
+    db.add(row)
+    await db.commit()
+    return token
+
+async def rotate_async(db: AsyncSession, token: str) -> Optional[Tuple[int, str]]:
+    """
+    Redeem a refresh token and replace it with a new one.
+
+    The old token is revoked with a conditional UPDATE, so of two
+    concurrent requests with the same token only one succeeds. Presenting
+    a token that was already redeemed or revoked means it was copied:
+    its whole family is revoked, logging out both the thief and the
+    legitimate client; that revocation is committed here.
+
+    A successful rotation is left uncommitted: the caller commits once it
+    has checked the user still exists, or rolls back so the token is not
+    spent on a failed request.
+
+    Args:
+    - db: The async database session.
+    - token: The token sent by the client.
+
+    Returns:
+    - (user_id, new token), or None if the token is unknown, expired or revoked.
+    """
+    now = datetime.utcnow()
+    token_hash = hash_token(token)
+    redeemed = (await db.execute(
+        sql_update(RefreshToken)
+        .where(
+            RefreshToken.token_hash == token_hash,
+            RefreshToken.revoked_at.is_(None),
+            RefreshToken.expires_at > now
+        )
+        .values(revoked_at=now)
+        .returning(RefreshToken.user_id, RefreshToken.family_id)
+    )).first()
+
+    if redeemed is None:
+        reused_family = (await db.execute(
+            select(RefreshToken.family_id)
+            .where(RefreshToken.token_hash == token_hash, RefreshToken.revoked_at.is_not(None))
+        )).scalar()
+        if reused_family is not None:
+            await _revoke_family(db, reused_family, now)
+        await db.commit()
+        return None
+
+    user_id, family_id = redeemed
+    new_token, row = _new_token(user_id, family_id, now)
+    db.add(row)
+    return user_id, new_token
+
+async def revoke_async(db: AsyncSession, token: str) -> bool:
+    """
+    Revoke a refresh token and every token rotated from the same login.
+
+    Args:
+    - db: The async database session.
+    - token: The token sent by the client.
+
+    Returns:
+    - True if the token was known, otherwise False.
+    """
+    family_id = (await db.execute(
+        select(RefreshToken.family_id).where(RefreshToken.token_hash == hash_token(token))
+    )).scalar()
+    if family_id is None:
+        return False
+    await _revoke_family(db, family_id, datetime.utcnow())
+    await db.commit()
+    return True
+
+async def _revoke_family(db: AsyncSession, family_id: str, now: datetime) -> None:
+    """Revoke the outstanding tokens of a family, without committing."""
+    await db.execute(
+        sql_update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now)
+    )
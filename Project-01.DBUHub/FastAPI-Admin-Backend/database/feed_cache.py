@@ -0,0 +1,142 @@
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+from typing import Optional, Tuple
+import os
+
+# How long a cached feed page stays valid, in seconds (0 disables the cache)
+FEED_CACHE_TTL = float(os.getenv('FEED_CACHE_TTL', 30))
+
+# Maximum number of feed pages kept by the in-memory backend
+FEED_CACHE_SIZE = int(os.getenv('FEED_CACHE_SIZE', 256))
+
+class CacheBackend:
+    """
+    Storage interface for the feed cache.
+
+    Implement this to share cached pages between workers (e.g. on top of
+    Redis or memcached) and install it with set_backend().
+    """
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the value stored under key, or None if missing or expired."""
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        """Store value under key for ttl seconds."""
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        """Remove every cached value."""
+        raise NotImplementedError
+
+class InMemoryCacheBackend(CacheBackend):
+    """
+    Per-process LRU cache with a TTL on every entry.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (value, monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+# Active backend and write generation. The generation is bumped on every
+# invalidation so a page read before a write is never stored after it.
+backend: CacheBackend = InMemoryCacheBackend(FEED_CACHE_SIZE)
+generation = 0
+
+def set_backend(new_backend: CacheBackend) -> None:
+    """
+    Replace the cache storage backend.
+
+    Args:
+        new_backend (CacheBackend): The backend to use from now on.
+    """
+    global backend
+    backend = new_backend
+
+def page_key(
+    limit: int,
+    cursor: Optional[str],
+    version: Optional[int] = None,
+    fields: Optional[Tuple[str, ...]] = None,
+    creator_id: Optional[int] = None
+) -> str:
+    """
+    Build the cache key of a feed page.
+
+    Including the feed version read alongside the page keeps a page read
+    from a lagging replica from being served once the replica catches up.
+
+    Args:
+        limit (int): The (clamped) page size.
+        cursor (Optional[str]): The page cursor, or None for the first page.
+        version (Optional[int]): The feed version the page was read at.
+        fields (Optional[Tuple[str, ...]]): The selected fields, or None for full posts.
+        creator_id (Optional[int]): The author whose posts are listed, or None for the whole feed.
+
+    Returns:
+        str: The cache key.
+    """
+    key = f"feed:{version}:{limit}:{cursor or ''}"
+    if creator_id is not None:
+        key = f"{key}:creator={creator_id}"
+    return key + ':' + ','.join(fields) if fields else key
+
+def get(key: str) -> Optional[bytes]:
+    """
+    Look up a cached feed page.
+
+    Args:
+        key (str): A key from page_key().
+
+    Returns:
+        Optional[bytes]: The cached page, or None on a miss.
+    """
+    if FEED_CACHE_TTL <= 0:
+        return None
+    return backend.get(key)
+
+def put(key: str, value: bytes, read_generation: int) -> None:
+    """
+    Store a feed page unless the feed was written to since it was read.
+
+    Args:
+        key (str): A key from page_key().
+        value (bytes): The serialized page.
+        read_generation (int): The value of generation before the page was queried.
+    """
+    if FEED_CACHE_TTL <= 0 or read_generation != generation:
+        return
+    backend.set(key, value, FEED_CACHE_TTL)
+
+def invalidate() -> None:
+    """
+    Drop every cached feed page. Called after each post write.
+    """
+    global generation
+    generation += 1
+    backend.clear()
@@ -0,0 +1,199 @@
+import asyncio
+import logging
+import os
+from typing import Callable, Iterable, Optional
+from routers import fast_json
+
+# Events buffered per subscriber. A subscriber that falls this far behind
+# is disconnected rather than slowing down or bloating the worker.
+LIVE_FEED_QUEUE_SIZE = int(os.getenv('LIVE_FEED_QUEUE_SIZE', 64))
+
+# Maximum number of live feed connections per worker (0 disables the feed)
+LIVE_FEED_MAX_SUBSCRIBERS = int(os.getenv('LIVE_FEED_MAX_SUBSCRIBERS', 1000))
+
+# Seconds between keep-alive messages on an idle connection, so proxies
+# do not close it and dead clients are noticed
+LIVE_FEED_HEARTBEAT = float(os.getenv('LIVE_FEED_HEARTBEAT', 15))
+
+# Worker processes serving the app, as set by serve.py (0 or unset: one).
+# With several, the live feed needs a backend that reaches every worker.
+WEB_CONCURRENCY = int(os.getenv('WEB_CONCURRENCY', 0))
+
+class Subscriber:
+    """
+    One live feed connection.
+
+    Attributes:
+        queue (asyncio.Queue): Encoded events waiting to be sent; None
+            means the subscriber was evicted and must disconnect.
+        evicted (bool): True once the hub has dropped the subscriber.
+    """
+    __slots__ = ('queue', 'evicted')
+
+    def __init__(self, queue_size: int):
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.evicted = False
+
+class Hub:
+    """
+    In-process fan-out of feed events to the live connections of this
+    worker. Only touched from the event loop thread.
+    """
+
+    def __init__(self, queue_size: int, max_subscribers: int):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self.subscribers = set()
+        self.evictions = 0
+
+    def subscribe(self) -> Optional[Subscriber]:
+        """Register a connection, or return None if the worker is at its limit."""
+        if len(self.subscribers) >= self.max_subscribers:
+            return None
+        subscriber = Subscriber(self.queue_size)
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        """Forget a connection that has closed."""
+        self.subscribers.discard(subscriber)
+
+    def deliver(self, payload: bytes) -> None:
+        """Queue an encoded event for every subscriber, evicting those whose queue is full."""
+        for subscriber in list(self.subscribers):
+            try:
+                subscriber.queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                self.evict(subscriber)
+
+    def evict(self, subscriber: Subscriber) -> None:
+        """Drop a slow subscriber; its pending events are discarded and its connection told to close."""
+        self.subscribers.discard(subscriber)
+        subscriber.evicted = True
+        self.evictions += 1
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait(None)
+        logging.warning("Evicted a slow live feed subscriber")
+
+class EventBackend:
+    """
+    Transport of feed events between workers.
+
+    Every worker publishes the events of its own writes and receives the
+    events of all workers. Implement this on top of a broker (e.g. Redis
+    pub/sub or Postgres LISTEN/NOTIFY) to run the live feed with several
+    workers and install it with set_backend() before start-up.
+
+    Attributes:
+        cross_worker (bool): True if events reach the subscribers of
+            every worker, not only those of the publishing one.
+    """
+    cross_worker = True
+
+    def wants_events(self) -> bool:
+        """Return False to skip building events nobody will receive."""
+        return True
+
+    def publish(self, payload: bytes) -> None:
+        """
+        Send an encoded event to every worker, this one included. Called
+        from the event loop and from threadpool threads; must not block.
+        """
+        raise NotImplementedError
+
+    async def start(self, deliver: Callable[[bytes], None]) -> None:
+        """Begin passing received events to deliver, on the event loop thread."""
+        raise NotImplementedError
+
+    async def stop(self) -> None:
+        """Stop receiving events."""
+        raise NotImplementedError
+
+class LocalEventBackend(EventBackend):
+    """
+    Delivers events only within this process. Enough for a single worker,
+    and a stand-in for a broker in tests.
+    """
+    cross_worker = False
+
+    def __init__(self, hub: Hub):
+        self.hub = hub
+        self.loop = None
+        self.deliver = None
+
+    def wants_events(self) -> bool:
+        return self.deliver is not None and bool(self.hub.subscribers)
+
+    def publish(self, payload: bytes) -> None:
+        if self.deliver is None:
+            return
+        try:
+            on_loop = asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            self.deliver(payload)
+        else:
+            self.loop.call_soon_threadsafe(self.deliver, payload)
+
+    async def start(self, deliver: Callable[[bytes], None]) -> None:
+        self.loop = asyncio.get_running_loop()
+        self.deliver = deliver
+
+    async def stop(self) -> None:
+        self.deliver = None
+
+# The hub of this worker and the active backend
+hub = Hub(LIVE_FEED_QUEUE_SIZE, LIVE_FEED_MAX_SUBSCRIBERS)
+backend: EventBackend = LocalEventBackend(hub)
+
+def set_backend(new_backend: EventBackend) -> None:
+    """
+    Replace the event transport. Call before the application starts.
+
+    Args:
+        new_backend (EventBackend): The backend to use from now on.
+    """
+    global backend
+    backend = new_backend
+
+def available() -> bool:
+    """
+    Check whether live subscribers of this worker would see every write.
+
+    Returns:
+        bool: False when several workers share the in-process backend, as
+        each subscriber would only get the writes of its own worker.
+    """
+    return backend.cross_worker or WEB_CONCURRENCY <= 1
+
+async def start() -> None:
+    """Connect the backend to this worker's hub. Run at application start-up."""
+    if not available():
+        logging.warning(
+            f"Live feed disabled: {WEB_CONCURRENCY} workers share no event backend, so /post/live "
+            "would miss the writes of other workers. Install one with feed_events.set_backend() or run one worker."
+        )
+    await backend.start(hub.deliver)
+
+async def stop() -> None:
+    """Disconnect the backend. Run at application shutdown."""
+    await backend.stop()
+
+def publish(event_type: str, posts: Iterable[dict]) -> None:
+    """
+    Broadcast a committed post write to live feed subscribers.
+
+    Args:
+        event_type (str): 'created', 'updated' or 'deleted'.
+        posts (Iterable[dict]): The posts written, shaped like feed items
+            (PostDisplay); only {'id'} for deletions. Only consumed when
+            someone is listening, so a generator costs nothing otherwise.
+    """
+    if not backend.wants_events():
+        return
+    posts = list(posts)
+    if not posts:
+        return
+    backend.publish(fast_json.dumps({'type': event_type, 'posts': posts}))
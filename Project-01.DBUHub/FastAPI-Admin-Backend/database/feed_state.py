@@ -0,0 +1,46 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session
+from database.models import DbPost, FeedState
+
+# Primary key of the single FeedState row
+FEED_STATE_ID = 1
+
+def bump(connection) -> None:
+    """
+    Increment the feed version. Must run in the transaction of the write.
+
+    Call this directly after post writes that bypass the ORM unit of work
+    (bulk insert/update/delete statements); ORM flushes are covered by
+    the listener below.
+
+    Args:
+    - connection: The connection of the writing transaction.
+    """
+    connection.execute(
+        update(FeedState)
+        .where(FeedState.id == FEED_STATE_ID)
+        .values(version=FeedState.version + 1, updated_at=datetime.utcnow())
+    )
+
+def get_state(db: Session) -> Optional[FeedState]:
+    """
+    Read the current feed version.
+    
+    Args:
+    - db: The database session.
+    
+    Returns:
+    - The FeedState row, or None if the database has not been migrated.
+    """
+    return db.get(FeedState, FEED_STATE_ID, populate_existing=True)
+
+@event.listens_for(Session, 'after_flush')
+def bump_on_post_flush(session, flush_context):
+    """Bump the feed version whenever a flush inserts, changes or deletes a post."""
+    changed = any(isinstance(obj, DbPost) for obj in session.new) \
+        or any(isinstance(obj, DbPost) for obj in session.deleted) \
+        or any(isinstance(obj, DbPost) and session.is_modified(obj) for obj in session.dirty)
+    if changed:
+        bump(session.connection())
@@ -0,0 +1,168 @@
+from datetime import datetime
+from sqlalchemy import case, func, inspect, insert, select, text, update
+from database.database import Base
+from database.models import ArchivedPost, DbPost, FeedState
+from database.feed_state import FEED_STATE_ID
+from database import search
+from database.db_post import EXCERPT_LENGTH
+import os
+
+# Create missing tables and run upgrade() at start-up. Turn off in production
+# once the schema is managed out of band, so boots skip reflecting every table.
+DB_AUTO_MIGRATE = os.getenv('DB_AUTO_MIGRATE', 'true').lower() in ('1', 'true', 'yes')
+
+# Values for columns added to existing tables, keyed by (table, column).
+# They run once every missing column of the table exists. Backfills of
+# post keep updated_at, whose onupdate would otherwise stamp every post
+# as just edited.
+BACKFILLS = {
+    ('post', 'updated_at'): lambda: update(DbPost).values(updated_at=DbPost.timestamp),
+    # Existing posts are cut at exactly EXCERPT_LENGTH characters; the next
+    # edit of a post stores an excerpt ending at a word boundary
+    ('post', 'excerpt'): lambda: update(DbPost).values(excerpt=case(
+        (func.length(DbPost.content) > EXCERPT_LENGTH, func.substr(DbPost.content, 1, EXCERPT_LENGTH) + '\u2026'),
+        else_=DbPost.content
+    ), updated_at=DbPost.updated_at),
+    ('post', 'content_length'): lambda: update(DbPost).values(content_length=func.length(DbPost.content), updated_at=DbPost.updated_at),
+}
+
+# Values for the NULLs of columns that have since become NOT NULL, keyed by
+# (table, column). They run before the constraint is added.
+NULL_FILLS = {
+    # Posts saved without a creation time are dated by their last edit
+    ('post', 'timestamp'): lambda: update(DbPost).where(DbPost.timestamp.is_(None)).values(
+        timestamp=func.coalesce(DbPost.updated_at, datetime.utcnow()), updated_at=DbPost.updated_at
+    ),
+}
+
+# Indexes no longer declared by the models, dropped if they exist
+DROPPED_INDEXES = (
+    # Covered by ix_post_timestamp_id, which leads with timestamp
+    'ix_post_timestamp',
+)
+
+def tightened_columns(table, existing_columns: dict) -> list:
+    """
+    Find the columns of a table that the model declares NOT NULL but the
+    database still allows NULL in.
+
+    Args:
+        table: The model's Table.
+        existing_columns (dict): The database's columns by name, as
+            returned by Inspector.get_columns.
+
+    Returns:
+        list: The Column objects to tighten.
+    """
+    return [
+        column for column in table.columns
+        if not column.nullable and not column.primary_key
+        and existing_columns.get(column.name, {}).get('nullable') is True
+    ]
+
+def rebuild_with_autoincrement(connection, table) -> None:
+    """
+    Recreate a SQLite table declared with sqlite_autoincrement if it was
+    created without AUTOINCREMENT, or if it lacks a NOT NULL constraint of
+    the model; SQLite can add neither in place.
+
+    The table is renamed, created again from the model with its indexes,
+    and the rows are copied over with their IDs. Triggers on the table are
+    dropped with it; search.setup creates them again.
+
+    Args:
+        connection: A connection inside a transaction.
+        table: The Table to rebuild.
+    """
+    created_with = connection.execute(
+        text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': table.name}
+    ).scalar()
+    if created_with is None:
+        return
+    existing_columns = {column['name']: column for column in inspect(connection).get_columns(table.name)}
+    if 'AUTOINCREMENT' in created_with.upper() and not tightened_columns(table, existing_columns):
+        return
+
+    for index in inspect(connection).get_indexes(table.name):
+        connection.execute(text(f'DROP INDEX {index["name"]}'))
+    connection.execute(text(f'ALTER TABLE {table.name} RENAME TO {table.name}_rebuild'))
+    table.create(connection)
+    columns = ', '.join(column.name for column in table.columns)
+    connection.execute(text(f'INSERT INTO {table.name} ({columns}) SELECT {columns} FROM {table.name}_rebuild'))
+    connection.execute(text(f'DROP TABLE {table.name}_rebuild'))
+
+def upgrade(engine) -> None:
+    """
+    Bring an existing database up to date with the models.
+
+    create_all only creates missing tables, so this adds columns and
+    indexes that were declared after a table was first created, backfills
+    the new columns, seeds required rows and sets up the full-text index.
+    Every step is idempotent.
+
+    Args:
+        engine: The SQLAlchemy engine of the database to upgrade.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+
+            existing_columns = {column['name']: column for column in inspector.get_columns(table.name)}
+            added_columns = [column for column in table.columns if column.name not in existing_columns]
+            for column in added_columns:
+                column_type = column.type.compile(dialect=engine.dialect)
+                connection.execute(text(
+                    f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'
+                ))
+            # SQLite gets the constraints by the rebuild below
+            for column in tightened_columns(table, existing_columns):
+                fill = NULL_FILLS.get((table.name, column.name))
+                if fill is not None:
+                    connection.execute(fill())
+                if engine.dialect.name == 'postgresql':
+                    connection.execute(text(f'ALTER TABLE {table.name} ALTER COLUMN {column.name} SET NOT NULL'))
+            for column in added_columns:
+                backfill = BACKFILLS.get((table.name, column.name))
+                if backfill is not None:
+                    connection.execute(backfill())
+
+            existing_indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+            for name in DROPPED_INDEXES:
+                if name in existing_indexes:
+                    connection.execute(text(f'DROP INDEX {name}'))
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(connection)
+
+        if engine.dialect.name == 'sqlite':
+            rebuild_with_autoincrement(connection, DbPost.__table__)
+            # A rebuilt table only knows the IDs left in it, so start new
+            # post IDs above the archived ones as well
+            archived_max = connection.execute(select(func.max(ArchivedPost.id))).scalar()
+            if archived_max is not None:
+                connection.execute(
+                    text("UPDATE sqlite_sequence SET seq = MAX(seq, :seq) WHERE name = 'post'"), {'seq': archived_max}
+                )
+                connection.execute(
+                    text("INSERT INTO sqlite_sequence (name, seq) SELECT 'post', :seq WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = 'post')"),
+                    {'seq': archived_max}
+                )
+
+        # The feed version row must exist for the feed validators to work
+        if connection.execute(select(FeedState.id).where(FeedState.id == FEED_STATE_ID)).first() is None:
+            connection.execute(insert(FeedState).values(id=FEED_STATE_ID, version=0))
+
+        # Full-text index used by GET /post/search
+        search.setup(connection)
+
+def migrate(engine) -> None:
+    """
+    Create missing tables, then upgrade existing ones.
+
+    Args:
+        engine: The SQLAlchemy engine of the database to migrate.
+    """
+    Base.metadata.create_all(engine)
+    upgrade(engine)
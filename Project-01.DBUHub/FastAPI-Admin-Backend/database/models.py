@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, desc
 from sqlalchemy.orm import relationship
 from database.database import Base
 from datetime import datetime
@@ -18,15 +18,83 @@ class DbPost(Base):
     # Content of the post
     content = Column(String, nullable=False)
 
+    # Start of the content, kept for preview listings that skip the content
+    excerpt = Column(String, nullable=True)
+
+    # Length of the content in characters
+    content_length = Column(Integer, nullable=True)
+
     # Foreign key linking to the User table
     creator_id = Column(Integer, ForeignKey('users.id'), nullable=False)
 
-    # Timestamp for when the post was created
-    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
+    # Timestamp for when the post was created; page cursors need one on
+    # every post. Indexed through ix_post_timestamp_id below.
+    timestamp = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    # Timestamp of the last change to the post, used as its HTTP validator
+    # and by incremental exports
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
     # Relationship to the User model
     creator = relationship("User", back_populates="posts")
 
+    # Composite indexes backing keyset pagination of the feed and of one
+    # author's posts (newest first); the second also serves creator_id lookups.
+    # AUTOINCREMENT stops SQLite from handing out the ID of a deleted or
+    # archived post again once it was the highest.
+    __table_args__ = (
+        Index('ix_post_timestamp_id', 'timestamp', 'id'),
+        Index('ix_post_creator_timestamp_id', 'creator_id', desc('timestamp'), desc('id')),
+        {'sqlite_autoincrement': True},
+    )
+
+class ArchivedPost(Base):
+    """
+    A post moved out of the post table by database.archive once it grew
+    old. Keeps the post's ID and columns; archived posts are only reachable
+    by ID (their owner can still update or delete them), so the hot table
+    and its indexes stay small.
+    """
+    __tablename__ = "post_archive"  # Table name in the database
+
+    # ID the post had in the post table
+    id = Column(Integer, primary_key=True, autoincrement=False)
+
+    # Columns copied from the post table
+    title = Column(String(255), nullable=False)
+    content = Column(String, nullable=False)
+    excerpt = Column(String, nullable=True)
+    content_length = Column(Integer, nullable=True)
+    creator_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    timestamp = Column(DateTime, nullable=False)
+    # Indexed like the post table's, so the export merges the two tables
+    # in updated_at order without sorting them
+    updated_at = Column(DateTime, nullable=True, index=True)
+
+    # Timestamp for when the post was archived
+    archived_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    # Relationship to the User model
+    creator = relationship("User")
+
+class FeedState(Base):
+    """
+    Single-row table holding a version counter for the post feed.
+
+    The version is bumped in the same transaction as every post write, so
+    a cached copy of the feed can be validated with one primary-key lookup.
+    """
+    __tablename__ = "post_feed_state"  # Table name in the database
+
+    # Always 1; the table holds a single row
+    id = Column(Integer, primary_key=True)
+
+    # Incremented on every post insert, update or delete
+    version = Column(Integer, nullable=False, default=0)
+
+    # Time of the last post write
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
 class User(Base):
     """
     Represents a user in the database.
@@ -44,3 +112,32 @@ class User(Base):
 
     # Relationship to the DbPost model
     posts = relationship("DbPost", back_populates="creator")
+
+class RefreshToken(Base):
+    """
+    A refresh token issued at login. Only a SHA-256 hash of the token is
+    stored. Each token is redeemed once and replaced by a new one in the
+    same family; a family is every token descended from one login.
+    """
+    __tablename__ = "refresh_tokens"  # Table name in the database
+
+    # Unique identifier for the token
+    id = Column(Integer, primary_key=True)
+
+    # Hex SHA-256 of the token handed to the client
+    token_hash = Column(String(64), unique=True, index=True, nullable=False)
+
+    # Identifier shared by all tokens rotated from the same login
+    family_id = Column(String(32), index=True, nullable=False)
+
+    # Foreign key linking to the User table
+    user_id = Column(Integer, ForeignKey('users.id'), index=True, nullable=False)
+
+    # Timestamp for when the token was issued
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    # The token is refused after this time
+    expires_at = Column(DateTime, nullable=False)
+
+    # Set when the token is redeemed or revoked; it is refused from then on
+    revoked_at = Column(DateTime, nullable=True)
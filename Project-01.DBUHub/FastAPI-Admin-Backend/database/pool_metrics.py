@@ -0,0 +1,95 @@
+from bisect import bisect_left
+from time import perf_counter
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Upper bounds (in milliseconds) of the checkout latency histogram buckets
+CHECKOUT_BUCKETS_MS = (0.1, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+class PoolStats:
+    """
+    Checkout counters and latency histogram for one connection pool.
+
+    Updates are plain integer increments; under the GIL a lost update can
+    at worst undercount by one, which is acceptable for monitoring.
+    """
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        # One slot per bucket plus a final +Inf slot
+        self.bucket_counts = [0] * (len(CHECKOUT_BUCKETS_MS) + 1)
+
+    def observe(self, seconds: float) -> None:
+        """Record how long one checkout waited for a connection."""
+        self.checkouts += 1
+        self.wait_seconds_total += seconds
+        if seconds > self.wait_seconds_max:
+            self.wait_seconds_max = seconds
+        self.bucket_counts[bisect_left(CHECKOUT_BUCKETS_MS, seconds * 1000)] += 1
+
+    def histogram(self) -> dict:
+        """Return cumulative bucket counts keyed by their upper bound in ms."""
+        cumulative = {}
+        running = 0
+        for bound, count in zip(CHECKOUT_BUCKETS_MS + ('+Inf',), self.bucket_counts):
+            running += count
+            cumulative[str(bound)] = running
+        return cumulative
+
+class InstrumentedPoolMixin:
+    """
+    Times every checkout from the underlying queue, including the time
+    spent waiting for a free connection when the pool is exhausted.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        started = perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.timeouts += 1
+            raise
+        self.stats.observe(perf_counter() - started)
+        return connection
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    """QueuePool that records checkout statistics."""
+
+class InstrumentedAsyncQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records checkout statistics."""
+
+def pool_status(pool) -> dict:
+    """
+    Build a snapshot of a pool's live state and checkout statistics.
+
+    Args:
+        pool: The engine's connection pool.
+
+    Returns:
+        dict: Pool size, connections in use, overflow and checkout latency.
+    """
+    status = {'pool_class': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            'size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'checked_in': pool.checkedin(),
+            'overflow': pool.overflow(),
+        })
+    stats = getattr(pool, 'stats', None)
+    if stats is not None:
+        status.update({
+            'checkouts': stats.checkouts,
+            'timeouts': stats.timeouts,
+            'wait_ms_avg': round(stats.wait_seconds_total / stats.checkouts * 1000, 3) if stats.checkouts else 0.0,
+            'wait_ms_max': round(stats.wait_seconds_max * 1000, 3),
+            'wait_ms_histogram': stats.histogram(),
+        })
+    return status
@@ -0,0 +1,122 @@
+from itertools import count
+from time import monotonic
+from typing import List, Optional
+from sqlalchemy import create_engine
+from sqlalchemy.exc import DBAPIError, InvalidRequestError
+from sqlalchemy.orm import Session, sessionmaker
+from database.database import get_engine_options
+import logging
+import os
+
+# Comma-separated URLs of read replicas. Unset means every read goes to the primary.
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv('DATABASE_REPLICA_URL', '').split(',') if url.strip()]
+
+# After a user writes, their reads go to the primary for this many seconds
+# so they see their own change despite replication lag
+READ_YOUR_WRITES_SECONDS = float(os.getenv('READ_YOUR_WRITES_SECONDS', 5))
+
+# How long a replica that failed to connect is skipped before being retried
+REPLICA_RETRY_SECONDS = float(os.getenv('REPLICA_RETRY_SECONDS', 30))
+
+# Number of tracked writers above which expired entries are purged
+RECENT_WRITERS_PURGE_SIZE = 10000
+
+class ReadOnlySession(Session):
+    """
+    Session used for replica reads. Refuses to flush pending changes so a
+    handler cannot write to a replica by mistake.
+    """
+
+    def flush(self, objects=None):
+        if self.new or self.dirty or self.deleted:
+            raise InvalidRequestError("Cannot write through a read-only replica session")
+        super().flush(objects)
+
+class Replica:
+    """
+    One read replica with its engine. Replicas serve the sync read
+    endpoints only, so there is no async engine to keep warm.
+
+    Attributes:
+        url (str): The replica's database URL.
+        down_until (float): monotonic() time before which the replica is skipped.
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+        self.engine = create_engine(url, **get_engine_options(url))
+        self.session_factory = sessionmaker(bind=self.engine, class_=ReadOnlySession, autoflush=False)
+        self.down_until = 0.0
+
+    def mark_down(self, error: Exception) -> None:
+        """Skip this replica for REPLICA_RETRY_SECONDS."""
+        self.down_until = monotonic() + REPLICA_RETRY_SECONDS
+        logging.warning(f"Read replica {self.engine.url!r} unavailable, using others for {REPLICA_RETRY_SECONDS}s: {error}")
+
+replicas: List[Replica] = [Replica(url) for url in DATABASE_REPLICA_URLS]
+
+# Round-robin position; next() on itertools.count is atomic under the GIL
+_next_replica = count()
+
+# User ID -> monotonic() time until which that user's reads use the primary.
+# Kept per process, so with several workers a user's next read may land on
+# a worker that has not seen the write; use sticky routing if that matters.
+recent_writers = {}
+
+def mark_write(user_id: Optional[int]) -> None:
+    """
+    Send the user's reads to the primary for READ_YOUR_WRITES_SECONDS.
+
+    Args:
+        user_id (Optional[int]): The user who just wrote.
+    """
+    if not replicas or user_id is None:
+        return
+    now = monotonic()
+    if len(recent_writers) >= RECENT_WRITERS_PURGE_SIZE:
+        for writer, until in list(recent_writers.items()):
+            if until < now:
+                recent_writers.pop(writer, None)
+    recent_writers[user_id] = now + READ_YOUR_WRITES_SECONDS
+
+def wrote_recently(user_id: Optional[int]) -> bool:
+    """
+    Check whether the user is inside their read-your-writes window.
+
+    Args:
+        user_id (Optional[int]): The user making the read, if known.
+
+    Returns:
+        bool: True if the user's reads should go to the primary.
+    """
+    return user_id is not None and recent_writers.get(user_id, 0.0) > monotonic()
+
+def _candidates() -> List[Replica]:
+    """Replicas that are not marked down, starting at the round-robin position."""
+    if not replicas:
+        return []
+    start = next(_next_replica) % len(replicas)
+    now = monotonic()
+    ordered = replicas[start:] + replicas[:start]
+    return [replica for replica in ordered if replica.down_until <= now]
+
+def open_session() -> Optional[Session]:
+    """
+    Open a read-only session on the next healthy replica.
+
+    The connection is checked out up front so an unreachable replica is
+    detected here and the next one is tried.
+
+    Returns:
+        Optional[Session]: A session with a live connection, or None if no
+        replica is configured or reachable.
+    """
+    for replica in _candidates():
+        db = replica.session_factory()
+        try:
+            db.connection()
+            return db
+        except (DBAPIError, OSError) as e:
+            db.close()
+            replica.mark_down(e)
+    return None
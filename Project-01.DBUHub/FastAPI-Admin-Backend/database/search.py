@@ -0,0 +1,198 @@
+import html
+from typing import List, Tuple
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from database.models import DbPost
+import os
+
+# Text search configuration used for the Postgres index and queries
+SEARCH_LANGUAGE = os.getenv('SEARCH_LANGUAGE', 'english')
+
+# Markers wrapped around matched terms in snippets
+SNIPPET_START = '<mark>'
+SNIPPET_STOP = '</mark>'
+
+# Private-use characters the database wraps matches in. Snippets are
+# HTML-escaped before these are swapped for the markers above, so post
+# content cannot inject markup into a snippet.
+MATCH_START = '\ue000'
+MATCH_STOP = '\ue001'
+
+# Postgres keeps a weighted tsvector in a generated column with a GIN index.
+# Each statement is paired with a catalog query and only run when the query
+# finds nothing: ALTER TABLE and CREATE INDEX take their lock on post before
+# IF NOT EXISTS is checked, so running them on every start-up would queue an
+# exclusive lock behind long readers and stall the feed behind it.
+POSTGRES_SETUP = [
+    (
+        """
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = 'post' AND column_name = 'search_vector'
+        """,
+        f"""
+        ALTER TABLE post ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('{SEARCH_LANGUAGE}', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('{SEARCH_LANGUAGE}', coalesce(content, '')), 'B')
+        ) STORED
+        """,
+    ),
+    (
+        """
+        SELECT 1 FROM pg_indexes
+        WHERE schemaname = current_schema() AND tablename = 'post' AND indexname = 'ix_post_search_vector'
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_post_search_vector ON post USING GIN (search_vector)",
+    ),
+]
+
+# SQLite keeps an external-content FTS5 table in sync with triggers
+SQLITE_SETUP = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS post_fts
+    USING fts5(title, content, content='post', content_rowid='id')
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS post_fts_insert AFTER INSERT ON post BEGIN
+        INSERT INTO post_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS post_fts_delete AFTER DELETE ON post BEGIN
+        INSERT INTO post_fts(post_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS post_fts_update AFTER UPDATE OF title, content ON post BEGIN
+        INSERT INTO post_fts(post_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO post_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    """,
+]
+
+def setup(connection) -> None:
+    """
+    Create the full-text index for the connected database, if supported.
+
+    Safe to run on every start-up. When the SQLite FTS table is created
+    for the first time it is filled from the existing posts.
+
+    Args:
+        connection: A connection inside a transaction.
+    """
+    backend = connection.dialect.name
+    if backend == 'sqlite':
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'post_fts'")
+        ).first()
+        for statement in SQLITE_SETUP:
+            connection.execute(text(statement))
+        if exists is None:
+            connection.execute(text("INSERT INTO post_fts(post_fts) VALUES ('rebuild')"))
+    elif backend == 'postgresql':
+        for check, statement in POSTGRES_SETUP:
+            if connection.execute(text(check)).first() is None:
+                connection.execute(text(statement))
+
+def to_fts5_query(query: str) -> str:
+    """
+    Turn free text into an FTS5 query that matches all of its words.
+
+    Each word is quoted so FTS5 operators in user input are taken literally.
+
+    Args:
+        query (str): The user's search text.
+
+    Returns:
+        str: The FTS5 MATCH expression.
+    """
+    return ' '.join('"' + word.replace('"', '""') + '"' for word in query.split())
+
+def find_matches(db: Session, query: str, limit: int, offset: int) -> List[Tuple[int, float, str]]:
+    """
+    Run a ranked full-text query.
+
+    Args:
+    - db: The database session.
+    - query: The user's search text.
+    - limit: Maximum number of matches to return.
+    - offset: Number of matches to skip.
+
+    Returns:
+    - A list of (post_id, rank, snippet) tuples, best match first. Higher
+      rank is better.
+    """
+    backend = db.get_bind().dialect.name
+    params = {'q': query, 'limit': limit, 'offset': offset}
+
+    if backend == 'postgresql':
+        # Rank and paginate first, then build headlines for the page only
+        statement = text(f"""
+            SELECT page.id, page.rank,
+                   ts_headline('{SEARCH_LANGUAGE}', post.content, page.query,
+                               'StartSel={MATCH_START}, StopSel={MATCH_STOP}, MaxFragments=2, MaxWords=24, MinWords=8')
+            FROM (
+                SELECT post.id, ts_rank(post.search_vector, q.query) AS rank, q.query
+                FROM post, websearch_to_tsquery('{SEARCH_LANGUAGE}', :q) AS q(query)
+                WHERE post.search_vector @@ q.query
+                ORDER BY rank DESC, post.id DESC
+                LIMIT :limit OFFSET :offset
+            ) AS page
+            JOIN post ON post.id = page.id
+            ORDER BY page.rank DESC, page.id DESC
+        """)
+    elif backend == 'sqlite':
+        params['q'] = to_fts5_query(query)
+        # bm25() is lower-is-better; negate it so higher is better everywhere.
+        # Title matches weigh ten times as much as content matches.
+        statement = text(f"""
+            SELECT rowid, -bm25(post_fts, 10.0, 1.0) AS rank,
+                   snippet(post_fts, 1, '{MATCH_START}', '{MATCH_STOP}', '...', 16)
+            FROM post_fts
+            WHERE post_fts MATCH :q
+            ORDER BY rank DESC, rowid DESC
+            LIMIT :limit OFFSET :offset
+        """)
+    else:
+        return find_matches_by_scan(db, query, limit, offset)
+
+    return [(row[0], float(row[1]), render_snippet(row[2])) for row in db.execute(statement, params)]
+
+def render_snippet(raw: str) -> str:
+    """
+    Turn a snippet from the database into safe HTML.
+
+    Args:
+        raw (str): Post text with matches wrapped in MATCH_START/MATCH_STOP.
+
+    Returns:
+        str: The text HTML-escaped, with matches wrapped in <mark> tags.
+    """
+    return html.escape(raw).replace(MATCH_START, SNIPPET_START).replace(MATCH_STOP, SNIPPET_STOP)
+
+def find_matches_by_scan(db: Session, query: str, limit: int, offset: int) -> List[Tuple[int, float, str]]:
+    """
+    Unindexed fallback: case-insensitive substring match on title and content.
+
+    Scans the whole table, so it is only used for databases without a
+    full-text index (and as the baseline in benchmarks/bench_search.py).
+
+    Args:
+    - db: The database session.
+    - query: The user's search text.
+    - limit: Maximum number of matches to return.
+    - offset: Number of matches to skip.
+
+    Returns:
+    - A list of (post_id, rank, snippet) tuples, newest first, with rank 0.
+    """
+    pattern = f'%{query}%'
+    rows = (
+        db.query(DbPost.id, DbPost.content)
+        .filter(DbPost.title.ilike(pattern) | DbPost.content.ilike(pattern))
+        .order_by(DbPost.id.desc())
+        .limit(limit)
+        .offset(offset)
+        .all()
+    )
+    return [(post_id, 0.0, html.escape(content[:200])) for post_id, content in rows]
@@ -0,0 +1,92 @@
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+from typing import Optional
+from sqlalchemy import event
+from database.models import User
+import os
+
+# How long a cached user stays valid, in seconds (0 disables the cache)
+USER_CACHE_TTL = float(os.getenv('USER_CACHE_TTL', 60))
+
+# Maximum number of users kept in the cache
+USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', 1024))
+
+class UserCache:
+    """
+    In-process TTL + LRU cache of User rows keyed by id.
+
+    The cache is per worker process. Writes through the ORM invalidate the
+    entry in this process; other workers see the change once their copy
+    expires, so keep the TTL short.
+    """
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_size > 0
+
+    def get(self, user_id: int) -> Optional[User]:
+        """
+        Return the cached user, or None if missing or expired.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            Optional[User]: The cached (detached) user object.
+        """
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            user, expires_at = entry
+            if expires_at < monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return user
+
+    def set(self, user: User) -> None:
+        """
+        Cache a user, evicting the least recently used entry when full.
+
+        Args:
+            user (User): The user to cache.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[user.id] = (user, monotonic() + self.ttl)
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        """
+        Drop a user from the cache.
+
+        Args:
+            user_id (int): The ID of the user.
+        """
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        """Drop every cached user."""
+        with self._lock:
+            self._entries.clear()
+
+# Shared cache instance used by auth_utils.get_current_user
+user_cache = UserCache(USER_CACHE_TTL, USER_CACHE_SIZE)
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def invalidate_on_write(mapper, connection, target):
+    """Invalidate the cached copy whenever a user row is changed through the ORM."""
+    user_cache.invalidate(target.id)
@@ -0,0 +1,145 @@
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+import os
+
+# Login attempts allowed per client IP within LOGIN_IP_WINDOW seconds (0 disables)
+LOGIN_IP_LIMIT = int(os.getenv("LOGIN_IP_LIMIT", 20))
+LOGIN_IP_WINDOW = float(os.getenv("LOGIN_IP_WINDOW", 60))
+
+# Login attempts allowed per username from one client IP within
+# LOGIN_USER_WINDOW seconds; a successful login refills the allowance (0 disables).
+# Keyed on the IP too, so guesses from elsewhere cannot lock the user out.
+LOGIN_USER_LIMIT = int(os.getenv("LOGIN_USER_LIMIT", 5))
+LOGIN_USER_WINDOW = float(os.getenv("LOGIN_USER_WINDOW", 300))
+
+# Failed logins allowed per username from all IPs together within
+# LOGIN_USER_WINDOW seconds, against guessing from many addresses (0 disables)
+LOGIN_USER_GLOBAL_LIMIT = int(os.getenv("LOGIN_USER_GLOBAL_LIMIT", 100))
+
+# Maximum number of keys tracked by the in-memory backend
+LOGIN_THROTTLE_MAX_KEYS = int(os.getenv("LOGIN_THROTTLE_MAX_KEYS", 100000))
+
+class ThrottleBackend:
+    """
+    Storage interface for login throttling, as token buckets that hold up
+    to limit tokens and refill at limit tokens per window seconds.
+
+    Implement this to share limits between workers (e.g. with a Redis Lua
+    script) and install it with set_backend().
+    """
+
+    def take(self, key: str, limit: int, window: float) -> float:
+        """Spend a token and return 0 if key has one left, otherwise return seconds until it has one."""
+        raise NotImplementedError
+
+    def peek(self, key: str, limit: int, window: float) -> float:
+        """Like take, without spending the token."""
+        raise NotImplementedError
+
+    def reset(self, key: str) -> None:
+        """Refill key's bucket."""
+        raise NotImplementedError
+
+class InMemoryThrottleBackend(ThrottleBackend):
+    """
+    Per-process token buckets. The least recently used keys are dropped
+    beyond max_keys; a dropped key simply starts with a full bucket again.
+    """
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> (tokens, updated_at)
+        self._lock = Lock()
+
+    def _refill(self, key: str, limit: int, window: float) -> float:
+        now = monotonic()
+        tokens, updated_at = self._buckets.get(key, (float(limit), now))
+        tokens = min(float(limit), tokens + (now - updated_at) * limit / window)
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return tokens
+
+    def take(self, key: str, limit: int, window: float) -> float:
+        with self._lock:
+            tokens = self._refill(key, limit, window)
+            if tokens < 1:
+                return (1 - tokens) * window / limit
+            self._buckets[key] = (tokens - 1, self._buckets[key][1])
+            return 0.0
+
+    def peek(self, key: str, limit: int, window: float) -> float:
+        with self._lock:
+            tokens = self._refill(key, limit, window)
+            return 0.0 if tokens >= 1 else (1 - tokens) * window / limit
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._buckets.pop(key, None)
+
+# Active backend
+backend: ThrottleBackend = InMemoryThrottleBackend(LOGIN_THROTTLE_MAX_KEYS)
+
+def set_backend(new_backend: ThrottleBackend) -> None:
+    """
+    Replace the throttle storage backend.
+
+    Args:
+        new_backend (ThrottleBackend): The backend to use from now on.
+    """
+    global backend
+    backend = new_backend
+
+def check(client_ip: str, username: str) -> float:
+    """
+    Admit or reject a login attempt before any password work is done.
+
+    Every attempt spends a token from the client IP's bucket and one from
+    the bucket of the username at that IP up front, so concurrent guesses
+    from one address cannot all pass before the first of them fails. A
+    successful login gives the latter back (record_success). The
+    username's bucket across all IPs is only checked here; failures are
+    charged to it by record_failure, so a user's own logins never use it up.
+
+    Args:
+        client_ip (str): The address the attempt came from.
+        username (str): The username being logged in to.
+
+    Returns:
+        float: 0 if the attempt may proceed, otherwise seconds to wait.
+    """
+    if LOGIN_IP_LIMIT > 0:
+        retry_after = backend.take(f"login:ip:{client_ip}", LOGIN_IP_LIMIT, LOGIN_IP_WINDOW)
+        if retry_after:
+            return retry_after
+    if LOGIN_USER_GLOBAL_LIMIT > 0:
+        retry_after = backend.peek(f"login:user:{username}", LOGIN_USER_GLOBAL_LIMIT, LOGIN_USER_WINDOW)
+        if retry_after:
+            return retry_after
+    if LOGIN_USER_LIMIT > 0:
+        return backend.take(f"login:user:{username}:ip:{client_ip}", LOGIN_USER_LIMIT, LOGIN_USER_WINDOW)
+    return 0.0
+
+def record_failure(username: str) -> None:
+    """
+    Charge a failed login to the username's bucket across all IPs.
+
+    Args:
+        username (str): The username whose password was wrong.
+    """
+    if LOGIN_USER_GLOBAL_LIMIT > 0:
+        backend.take(f"login:user:{username}", LOGIN_USER_GLOBAL_LIMIT, LOGIN_USER_WINDOW)
+
+def record_success(client_ip: str, username: str) -> None:
+    """
+    Refill the bucket of the username at this IP after a successful login,
+    refunding the attempt and any earlier failures from there.
+
+    Args:
+        client_ip (str): The address the login came from.
+        username (str): The username that logged in.
+    """
+    if LOGIN_USER_LIMIT > 0:
+        backend.reset(f"login:user:{username}:ip:{client_ip}")
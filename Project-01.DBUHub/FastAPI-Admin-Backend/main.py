@@ -1,14 +1,84 @@
+from time import perf_counter
+
+# Measured before the heavy imports below so start-up logging can report them
+IMPORT_STARTED = perf_counter()
+
+# Load .env before any application module reads its settings at import
+from dotenv import load_dotenv
+load_dotenv()
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from database import models
-from database.database import engine
-from routers import post, auth
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.orm import configure_mappers
+from database import archive, feed_events
+from database.database import engine, async_engine, prewarm_async_pool, prewarm_pool
+from database.migrations import DB_AUTO_MIGRATE, migrate
+from database.replicas import replicas
+from routers import post, auth, admin, users
+import auth_utils
+import compression
+import metrics
+
+IMPORT_SECONDS = perf_counter() - IMPORT_STARTED
+
+async def timed(timings: dict, name: str, awaitable) -> None:
+    """Await a start-up step and record how long it took, in milliseconds."""
+    started = perf_counter()
+    await awaitable
+    timings[name] = round((perf_counter() - started) * 1000, 1)
+
+async def prewarm_replicas() -> None:
+    """Fill the replica pools; a replica that cannot be reached is marked down instead of failing start-up."""
+    for replica in replicas:
+        try:
+            await asyncio.to_thread(prewarm_pool, replica.engine)
+        except Exception as e:
+            replica.mark_down(e)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Prepare the worker before it accepts requests, and release its
+    connections on shutdown.
 
-# Initialize the FastAPI application
-app = FastAPI()
+    Runs the schema migration (unless DB_AUTO_MIGRATE is off), then, in
+    parallel, fills the connection pools, configures the ORM mappers,
+    warms up bcrypt and JWT and connects the live feed, and logs how long
+    each step took. Starts the post archiving job when it is enabled.
+    """
+    started = perf_counter()
+    timings = {'imports': round(IMPORT_SECONDS * 1000, 1)}
+    loop = asyncio.get_running_loop()
 
-# Create database tables
-models.Base.metadata.create_all(engine)
+    if DB_AUTO_MIGRATE:
+        await timed(timings, 'schema', asyncio.to_thread(migrate, engine))
+    await asyncio.gather(
+        timed(timings, 'sync_pool', asyncio.to_thread(prewarm_pool, engine)),
+        timed(timings, 'async_pool', prewarm_async_pool(async_engine)),
+        timed(timings, 'replica_pools', prewarm_replicas()),
+        timed(timings, 'orm', asyncio.to_thread(configure_mappers)),
+        timed(timings, 'auth', loop.run_in_executor(auth_utils.bcrypt_executor, auth_utils.warm_up)),
+        timed(timings, 'live_feed', feed_events.start()),
+    )
+    await archive.start()
+
+    breakdown = ', '.join(f'{name} {ms} ms' for name, ms in timings.items())
+    logging.info(f"Startup finished in {(perf_counter() - started) * 1000:.1f} ms ({breakdown})")
+    yield
+
+    await archive.stop()
+    await feed_events.stop()
+    await async_engine.dispose()
+    engine.dispose()
+    for replica in replicas:
+        replica.engine.dispose()
+
+# Initialize the FastAPI application; start-up work runs in lifespan, not at import
+app = FastAPI(lifespan=lifespan)
 
 # Define allowed origins for CORS
 origins = [
@@ -22,15 +92,40 @@ app.add_middleware(
     allow_origins=origins,  # Origins that are allowed to make requests
     allow_credentials=True,  # Allow cookies and other credentials
     allow_methods=['*'],  # Allow all HTTP methods
-    allow_headers=['*']  # Allow all headers
+    allow_headers=['*'],  # Allow all headers
+    expose_headers=['X-Next-Cursor', 'X-Prev-Cursor', 'X-Next-Offset', 'ETag']  # Pagination cursors and validators readable by browsers
 )
 
+# Compress JSON and text responses for clients that accept brotli or gzip
+if compression.COMPRESSION_ENABLED:
+    app.add_middleware(compression.CompressionMiddleware)
+
+# Record per-route request metrics and per-request SQL work, served on /metrics.
+# Added last so it is the outermost middleware and times the whole request.
+if metrics.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+    metrics.instrument_engine(engine)
+    metrics.instrument_engine(async_engine.sync_engine)
+    for replica in replicas:
+        metrics.instrument_engine(replica.engine)
+
 # Define a health check endpoint
 @app.get("/")
 def is_working():
     """Health check endpoint to verify the API is running."""
     return {"message": "It works well"}
 
+# Expose metrics for Prometheus to scrape
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """Metrics for this worker in the Prometheus text format."""
+    pools = {'sync': engine.pool, 'async': async_engine.sync_engine.pool}
+    for index, replica in enumerate(replicas):
+        pools[f'replica{index}'] = replica.engine.pool
+    return PlainTextResponse(metrics.render(pools), media_type=metrics.CONTENT_TYPE)
+
 # Include routers for different API endpoints
 app.include_router(auth.router)  # Authentication routes
 app.include_router(post.router)  # Post-related routes
+app.include_router(users.router)  # Per-user routes
+app.include_router(admin.router)  # Operational/admin routes
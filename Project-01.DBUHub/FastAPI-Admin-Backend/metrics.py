@@ -0,0 +1,276 @@
+from bisect import bisect_left
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Optional
+from sqlalchemy import event
+from database.pool_metrics import CHECKOUT_BUCKETS_MS, pool_status
+import os
+
+# Set to false to skip the request middleware and the SQL event hooks
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Content type of the Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Route label for requests that did not match any route, so unknown paths
+# cannot blow up the number of series
+UNMATCHED_ROUTE = "<unmatched>"
+
+# Histogram bucket upper bounds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (128, 512, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+SQL_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+CHECKOUT_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10)
+BCRYPT_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+class Histogram:
+    """
+    Fixed-bucket histogram. The count list is allocated once; observe()
+    is a bisect and two increments.
+    """
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: tuple):
+        self.bounds = bounds
+        # One slot per bucket plus a final +Inf slot
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+class RouteStats:
+    """
+    Counters and histograms for one (method, route) pair.
+    """
+    __slots__ = ("responses", "latency", "size", "sql_statements", "db_seconds", "db_checkouts", "bcrypt_seconds")
+
+    def __init__(self):
+        self.responses = {}  # status code -> count
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.size = Histogram(SIZE_BUCKETS)
+        self.sql_statements = Histogram(SQL_COUNT_BUCKETS)
+        self.db_seconds = Histogram(LATENCY_BUCKETS)
+        self.db_checkouts = Histogram(CHECKOUT_COUNT_BUCKETS)
+        self.bcrypt_seconds = 0.0
+
+class RequestMetrics:
+    """
+    Work done on behalf of the request currently being served.
+    """
+    __slots__ = ("sql_statements", "db_seconds", "db_checkouts", "bcrypt_seconds")
+
+    def __init__(self):
+        self.sql_statements = 0
+        self.db_seconds = 0.0
+        self.db_checkouts = 0
+        self.bcrypt_seconds = 0.0
+
+# Metrics of the request being served, shared with the threads running sync
+# endpoints because Starlette copies the context into them
+current_request: ContextVar[Optional[RequestMetrics]] = ContextVar("current_request", default=None)
+
+class Registry:
+    """
+    Process-wide metric storage.
+
+    Request metrics are only updated from the event loop thread. SQL totals
+    are also updated from threadpool threads; like pool_metrics.PoolStats,
+    they rely on the GIL and may undercount by one under contention rather
+    than take a lock on every statement.
+    """
+
+    def __init__(self):
+        self.routes = {}  # (method, route) -> RouteStats
+        self.in_flight = 0
+        self.sql_statements_total = 0
+        self.db_seconds_total = 0.0
+        self.bcrypt = Histogram(BCRYPT_BUCKETS)
+
+    def observe_request(self, method: str, route: str, status_code: int, seconds: float,
+                        size: int, request: RequestMetrics) -> None:
+        """Record one finished request."""
+        stats = self.routes.get((method, route))
+        if stats is None:
+            stats = self.routes[(method, route)] = RouteStats()
+        stats.responses[status_code] = stats.responses.get(status_code, 0) + 1
+        stats.latency.observe(seconds)
+        stats.size.observe(size)
+        stats.sql_statements.observe(request.sql_statements)
+        stats.db_seconds.observe(request.db_seconds)
+        stats.db_checkouts.observe(request.db_checkouts)
+        stats.bcrypt_seconds += request.bcrypt_seconds
+
+    def observe_sql(self, seconds: float) -> None:
+        """Record one SQL statement, against the current request if there is one."""
+        self.sql_statements_total += 1
+        self.db_seconds_total += seconds
+        request = current_request.get()
+        if request is not None:
+            request.sql_statements += 1
+            request.db_seconds += seconds
+
+    def observe_checkout(self) -> None:
+        """Record one connection checkout from a pool against the current request."""
+        request = current_request.get()
+        if request is not None:
+            request.db_checkouts += 1
+
+    def observe_bcrypt(self, seconds: float) -> None:
+        """Record one bcrypt hash or verification, including its queueing time."""
+        self.bcrypt.observe(seconds)
+        request = current_request.get()
+        if request is not None:
+            request.bcrypt_seconds += seconds
+
+registry = Registry()
+
+class MetricsMiddleware:
+    """
+    ASGI middleware that records per-route request count, latency, response
+    size, in-flight requests, and the SQL and bcrypt work of each request.
+
+    Written as plain ASGI rather than BaseHTTPMiddleware so it adds no extra
+    task per request and does not buffer streaming responses.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = RequestMetrics()
+        token = current_request.set(request)
+        started = perf_counter()
+        status_code = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        registry.in_flight += 1
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            registry.in_flight -= 1
+            current_request.reset(token)
+            # The router stores the matched route in the scope; use its
+            # template (/post/{id}) rather than the raw path
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            registry.observe_request(scope["method"], route, status_code, perf_counter() - started, size, request)
+
+def instrument_engine(engine) -> None:
+    """
+    Count and time every statement executed through an engine, and count
+    the connections checked out of its pool.
+
+    Args:
+        engine: A sync Engine, or the sync_engine of an AsyncEngine.
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info["metrics_started"] = perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        registry.observe_sql(perf_counter() - conn.info.pop("metrics_started", perf_counter()))
+
+    @event.listens_for(engine, "checkout")
+    def checkout(dbapi_connection, connection_record, connection_proxy):
+        registry.observe_checkout()
+
+def _labels(**labels) -> str:
+    """Format a Prometheus label set, escaping the values."""
+    if not labels:
+        return ""
+    escaped = (
+        f'{name}="' + str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for name, value in labels.items()
+    )
+    return "{" + ",".join(escaped) + "}"
+
+def _header(lines: list, name: str, kind: str, help_text: str) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+
+def _histogram(lines: list, name: str, histogram: Histogram, **labels) -> None:
+    running = 0
+    for bound, count in zip(histogram.bounds + ("+Inf",), histogram.counts):
+        running += count
+        lines.append(f"{name}_bucket{_labels(**labels, le=bound)} {running}")
+    lines.append(f"{name}_sum{_labels(**labels)} {histogram.sum}")
+    lines.append(f"{name}_count{_labels(**labels)} {running}")
+
+def render(pools: dict) -> str:
+    """
+    Render every metric in the Prometheus text exposition format.
+
+    Args:
+        pools (dict): Connection pools to report, keyed by engine label.
+
+    Returns:
+        str: The exposition text.
+    """
+    lines = []
+    routes = sorted(registry.routes.items())
+
+    _header(lines, "http_requests_total", "counter", "Requests handled, by method, route and status code.")
+    for (method, route), stats in routes:
+        for status_code, count in sorted(stats.responses.items()):
+            lines.append(f"http_requests_total{_labels(method=method, route=route, status=status_code)} {count}")
+
+    _header(lines, "http_requests_in_flight", "gauge", "Requests currently being served.")
+    lines.append(f"http_requests_in_flight {registry.in_flight}")
+
+    histograms = (
+        ("http_request_duration_seconds", "latency", "Request latency, until the last body byte is sent."),
+        ("http_response_size_bytes", "size", "Response body size."),
+        ("http_request_sql_statements", "sql_statements", "SQL statements executed per request."),
+        ("http_request_db_duration_seconds", "db_seconds", "Time spent executing SQL per request."),
+        ("http_request_db_checkouts", "db_checkouts", "Pool connections checked out per request."),
+    )
+    for name, attribute, help_text in histograms:
+        _header(lines, name, "histogram", help_text)
+        for (method, route), stats in routes:
+            _histogram(lines, name, getattr(stats, attribute), method=method, route=route)
+
+    _header(lines, "http_request_bcrypt_seconds_total", "counter", "Time spent waiting for bcrypt, by route.")
+    for (method, route), stats in routes:
+        lines.append(f"http_request_bcrypt_seconds_total{_labels(method=method, route=route)} {stats.bcrypt_seconds}")
+
+    _header(lines, "db_statements_total", "counter", "SQL statements executed, including outside requests.")
+    lines.append(f"db_statements_total {registry.sql_statements_total}")
+    _header(lines, "db_duration_seconds_total", "counter", "Time spent executing SQL, including outside requests.")
+    lines.append(f"db_duration_seconds_total {registry.db_seconds_total}")
+
+    _header(lines, "bcrypt_duration_seconds", "histogram", "bcrypt hash and verify time, including queueing.")
+    _histogram(lines, "bcrypt_duration_seconds", registry.bcrypt)
+
+    statuses = {name: pool_status(pool) for name, pool in pools.items()}
+    _header(lines, "db_pool_checked_out", "gauge", "Connections currently checked out of the pool.")
+    for name, status in statuses.items():
+        if "checked_out" in status:
+            lines.append(f"db_pool_checked_out{_labels(engine=name)} {status['checked_out']}")
+    _header(lines, "db_pool_timeouts_total", "counter", "Checkouts that timed out waiting for a connection.")
+    for name, status in statuses.items():
+        if "timeouts" in status:
+            lines.append(f"db_pool_timeouts_total{_labels(engine=name)} {status['timeouts']}")
+    _header(lines, "db_pool_checkout_wait_seconds", "histogram", "Time spent waiting for a pool connection.")
+    for name, pool in pools.items():
+        stats = getattr(pool, "stats", None)
+        if stats is not None:
+            histogram = Histogram(tuple(bound / 1000 for bound in CHECKOUT_BUCKETS_MS))
+            histogram.counts = stats.bucket_counts
+            histogram.sum = stats.wait_seconds_total
+            _histogram(lines, "db_pool_checkout_wait_seconds", histogram, engine=name)
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,42 @@
+from time import monotonic
+from fastapi import APIRouter, Depends
+from database.database import engine, async_engine
+from database.models import User
+from database.pool_metrics import pool_status
+from database.replicas import replicas
+from auth_utils import get_admin_user
+
+# Create an APIRouter instance for operational/admin endpoints
+router = APIRouter(
+    prefix='/admin',  # Prefix for all routes in this router
+    tags=['admin']    # Tag for grouping endpoints in the OpenAPI documentation
+)
+
+@router.get('/pool')
+def get_pool_stats(current_user: User = Depends(get_admin_user)):
+    """
+    Endpoint to report live connection pool statistics for this worker.
+    Only users listed in ADMIN_USERNAMES may read it.
+
+    Args:
+        current_user (User): The currently authenticated admin.
+
+    Returns:
+        dict: Pool size, checked-out connections, overflow, and checkout
+        wait times for the sync and the async engine, and for each read
+        replica.
+
+    Raises:
+        HTTPException: 403 if the user is not an admin.
+    """
+    return {
+        'sync': pool_status(engine.pool),
+        'async': pool_status(async_engine.sync_engine.pool),
+        'replicas': [
+            {
+                'pool': pool_status(replica.engine.pool),
+                'available': replica.down_until <= monotonic(),
+            }
+            for replica in replicas
+        ],
+    }
@@ -1,17 +1,17 @@
 from datetime import timedelta, datetime, timezone
-from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Annotated, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from pydantic import BaseModel
 from fastapi.security import OAuth2PasswordRequestForm
 from jose import jwt
-from dotenv import load_dotenv
+import math
 import os
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import db_token, replicas
+from database.database import get_async_db
 from database.models import User
-from auth_utils import get_db, hash_password, verify_password, create_access_token, get_user_by_username, oauth2_scheme
-
-# Load environment variables from .env file
-load_dotenv()
+from auth_utils import hash_password_async, verify_and_update_password_async, verify_dummy_password_async, get_user_by_username_async, get_user_by_id_cached
+import login_throttle
 
 # Create an APIRouter instance for authentication-related endpoints
 router = APIRouter(
@@ -23,6 +23,10 @@ router = APIRouter(
 SECRET_KEY = os.getenv("AUTH_SECRET_KEY")
 ALGORITHM = os.getenv("AUTH_ALGORITHM")
 
+# Lifetime of access tokens. Clients renew them through /auth/refresh,
+# which costs no bcrypt work, so this can stay short.
+ACCESS_TOKEN_EXPIRE_MINUTES = float(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 20))
+
 class UserCreateRequest(BaseModel):
     """
     Schema for user creation request.
@@ -36,22 +40,43 @@ class Token(BaseModel):
     """
     access_token: str
     token_type: str
+    expires_in: Optional[int] = None
+    refresh_token: Optional[str] = None
+
+class RefreshRequest(BaseModel):
+    """
+    Schema for refresh and logout requests.
+    """
+    refresh_token: str
 
-def authenticate_user(username: str, password: str, db: Session):
+async def authenticate_user(username: str, password: str, db: AsyncSession):
     """
     Authenticate user by verifying username and password.
 
+    If the stored hash was made with outdated settings (e.g. a lower
+    BCRYPT_ROUNDS), it is replaced with a fresh hash.
+
     Args:
         username (str): The username of the user.
         password (str): The password of the user.
-        db (Session): The database session.
+        db (AsyncSession): The async database session.
 
     Returns:
         User: The authenticated user, or None if authentication fails.
     """
-    user = get_user_by_username(username, db)
-    if not user or not verify_password(password, user.hashed_password):
+    user = await get_user_by_username_async(username, db)
+    if not user:
+        # Same bcrypt cost as a wrong password, so unknown usernames cannot be told apart
+        await verify_dummy_password_async(password)
+        return None
+
+    verified, new_hash = await verify_and_update_password_async(password, user.hashed_password)
+    if not verified:
         return None
+
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
     return user
 
 def create_access_token(username: str, user_id: int, expires_delta: timedelta):
@@ -73,14 +98,33 @@ def create_access_token(username: str, user_id: int, expires_delta: timedelta):
     }
     return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
 
+def token_response(user: User, refresh_token: str) -> dict:
+    """
+    Build the token response for a user.
+
+    Args:
+        user (User): The user the tokens are for.
+        refresh_token (str): The refresh token to hand out with the access token.
+
+    Returns:
+        dict: The fields of the Token schema.
+    """
+    expires_delta = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    return {
+        'access_token': create_access_token(user.username, user.id, expires_delta),
+        'token_type': 'bearer',
+        'expires_in': int(expires_delta.total_seconds()),
+        'refresh_token': refresh_token
+    }
+
 @router.post("/", status_code=status.HTTP_201_CREATED)
-async def create_user(create_user_request: UserCreateRequest, db: Session = Depends(get_db)):
+async def create_user(create_user_request: UserCreateRequest, db: AsyncSession = Depends(get_async_db)):
     """
     Create a new user in the system.
 
     Args:
         create_user_request (UserCreateRequest): The request body containing the username and password.
-        db (Session): The database session.
+        db (AsyncSession): The async database session.
 
     Returns:
         User: The created user.
@@ -88,42 +132,101 @@ async def create_user(create_user_request: UserCreateRequest, db: Session = Depe
     Raises:
         HTTPException: If the username is already registered.
     """
-    existing_user = get_user_by_username(create_user_request.username, db)
+    existing_user = await get_user_by_username_async(create_user_request.username, db)
     if existing_user:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Username already registered")
     
     # Create and save the new user
     create_user_model = User(
         username=create_user_request.username,
-        hashed_password=hash_password(create_user_request.password)
+        hashed_password=await hash_password_async(create_user_request.password)
     )
     db.add(create_user_model)
-    db.commit()
-    db.refresh(create_user_model)
+    await db.commit()
+    await db.refresh(create_user_model)
+    # The new user's first requests must find the row even on a lagging replica
+    replicas.mark_write(create_user_model.id)
     return create_user_model
 
 @router.post('/token', response_model=Token)
 async def login_for_access_token(
+    request: Request,
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Log in a user and return an access token.
+    Log in a user and return an access token and a refresh token.
+
+    Attempts are throttled per client IP, per username at that IP and per
+    username overall before any bcrypt work is done. A successful login
+    refunds the attempts made at its IP; only failures count towards the
+    overall username limit.
 
     Args:
+        request (Request): The incoming request, used for the client address.
         form_data (OAuth2PasswordRequestForm): The form data containing the username and password.
-        db (Session): The database session.
+        db (AsyncSession): The async database session.
 
     Returns:
-        Token: The access token and token type.
+        Token: The access token, its lifetime in seconds and a refresh token.
 
     Raises:
-        HTTPException: If the credentials are invalid.
+        HTTPException: If the credentials are invalid, or 429 if the client
+        or the username has made too many attempts.
     """
-    user = authenticate_user(form_data.username, form_data.password, db)
+    client_ip = request.client.host if request.client else 'unknown'
+    retry_after = login_throttle.check(client_ip, form_data.username)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts, please retry later",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+    user = await authenticate_user(form_data.username, form_data.password, db)
     if not user:
+        login_throttle.record_failure(form_data.username)
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
-    
-    # Create an access token for the authenticated user
-    access_token = create_access_token(user.username, user.id, timedelta(minutes=20))
-    return {'access_token': access_token, 'token_type': 'bearer'}
+    login_throttle.record_success(client_ip, form_data.username)
+
+    return token_response(user, await db_token.issue_async(db, user.id))
+
+@router.post('/refresh', response_model=Token)
+async def refresh_access_token(refresh_request: RefreshRequest, db: AsyncSession = Depends(get_async_db)):
+    """
+    Exchange a refresh token for a new access token and refresh token.
+
+    The refresh token is single use: it is revoked here and replaced by the
+    one in the response. No password is checked, so this does no bcrypt work.
+
+    Args:
+        refresh_request (RefreshRequest): The request body containing the refresh token.
+        db (AsyncSession): The async database session.
+
+    Returns:
+        Token: A new access token, its lifetime in seconds and a new refresh token.
+
+    Raises:
+        HTTPException: If the refresh token is unknown, expired or revoked.
+    """
+    rotated = await db_token.rotate_async(db, refresh_request.refresh_token)
+    user = await get_user_by_id_cached(rotated[0], db) if rotated else None
+    if user is None:
+        # Do not spend the token on a refresh that fails
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
+    await db.commit()
+    return token_response(user, rotated[1])
+
+@router.post('/logout', status_code=status.HTTP_204_NO_CONTENT)
+async def logout(refresh_request: RefreshRequest, db: AsyncSession = Depends(get_async_db)):
+    """
+    Revoke a refresh token and every token rotated from the same login.
+
+    Access tokens already issued stay valid until they expire.
+
+    Args:
+        refresh_request (RefreshRequest): The request body containing the refresh token.
+        db (AsyncSession): The async database session.
+    """
+    await db_token.revoke_async(db, refresh_request.refresh_token)
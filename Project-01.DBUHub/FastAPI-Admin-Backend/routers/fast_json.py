@@ -0,0 +1,69 @@
+from datetime import datetime
+from typing import Iterable, List, Sequence
+import json
+
+try:
+    import orjson
+except ImportError:  # Fall back to the standard library; same output, slower
+    orjson = None
+
+def _default(value):
+    """Encode the non-JSON types found in rows the way pydantic does."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(value) -> bytes:
+    """
+    Encode a value as compact UTF-8 JSON.
+
+    Uses orjson when it is installed. The output matches pydantic's
+    dump_json for the types used in responses (naive datetimes as ISO 8601,
+    non-ASCII text unescaped), so responses do not change with the encoder.
+
+    Args:
+        value: Dicts, lists, strings, numbers, None and datetimes.
+
+    Returns:
+        bytes: The JSON document.
+    """
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False, default=_default).encode()
+
+def post_dicts(rows: Iterable[tuple]) -> List[dict]:
+    """
+    Shape post rows like PostDisplay without building pydantic models.
+
+    Args:
+        rows: Tuples in the order of db_post.LIST_COLUMNS
+            (id, title, content, creator_id, timestamp).
+
+    Returns:
+        List[dict]: One PostDisplay-shaped dict per row.
+    """
+    return [
+        {'id': id, 'title': title, 'content': content, 'creator': {'id': creator_id}, 'timestamp': timestamp}
+        for id, title, content, creator_id, timestamp in rows
+    ]
+
+def field_dicts(rows: Iterable, fields: Sequence[str]) -> List[dict]:
+    """
+    Shape post rows as dicts holding only the selected fields.
+
+    Args:
+        rows: Rows selected with db_post.field_columns(fields).
+        fields: Names from db_post.FIELD_COLUMNS, in output order.
+
+    Returns:
+        List[dict]: One dict per row; 'creator' is {'id': creator_id} as in PostDisplay.
+    """
+    keys = ['creator_id' if field == 'creator' else field for field in fields]
+    dicts = []
+    for row in rows:
+        mapping = row._mapping
+        item = {}
+        for field, key in zip(fields, keys):
+            item[field] = {'id': mapping[key]} if field == 'creator' else mapping[key]
+        dicts.append(item)
+    return dicts
@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from hashlib import blake2b
+from typing import Optional
+from fastapi import Request, Response, status
+
+def make_etag(*parts) -> str:
+    """
+    Build a weak ETag from the values that identify a representation.
+
+    Args:
+        *parts: Values such as a version counter and the query parameters.
+
+    Returns:
+        str: A quoted weak ETag.
+    """
+    digest = blake2b('|'.join(str(part) for part in parts).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+def to_http_date(value: datetime) -> str:
+    """
+    Format a naive UTC datetime for the Last-Modified header.
+
+    Args:
+        value (datetime): The naive UTC datetime.
+
+    Returns:
+        str: The IMF-fixdate representation.
+    """
+    return format_datetime(value.replace(tzinfo=timezone.utc, microsecond=0), usegmt=True)
+
+def last_modified_second(last_modified: datetime) -> Optional[datetime]:
+    """
+    Pick the whole second sent as Last-Modified for a modification time.
+
+    HTTP dates have no fractions, so the second after the change is sent:
+    it is later than the change itself, and a later write lands at or
+    after it as long as it is only sent once that second has begun. Until
+    then there is no safe value and None is returned.
+
+    Args:
+        last_modified (datetime): The naive UTC modification time.
+
+    Returns:
+        Optional[datetime]: The naive UTC second to send, or None.
+    """
+    second = last_modified.replace(microsecond=0) + timedelta(seconds=1)
+    return second if second <= datetime.utcnow() else None
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """
+    Evaluate the client's conditional headers against the current validators.
+
+    If-None-Match takes precedence; If-Modified-Since is only used when the
+    client sent no If-None-Match, as required by RFC 9110.
+
+    Args:
+        request (Request): The incoming request.
+        etag (str): The current ETag.
+        last_modified (Optional[datetime]): The current naive UTC modification time.
+
+    Returns:
+        bool: True if the client's copy is still current.
+    """
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is not None:
+        if if_none_match.strip() == '*':
+            return True
+        # Weak comparison: ignore the W/ prefix on both sides
+        candidates = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+        return etag.removeprefix('W/') in candidates
+
+    if_modified_since = request.headers.get('if-modified-since')
+    if if_modified_since is not None and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        # Exact comparison: a change within the second of since counts as
+        # a modification, since the client's copy may predate it
+        return last_modified.replace(tzinfo=timezone.utc) < since
+
+    return False
+
+def set_validators(response: Response, etag: str, last_modified: Optional[datetime]) -> None:
+    """
+    Attach ETag and Last-Modified headers to a response.
+
+    Args:
+        response (Response): The outgoing response.
+        etag (str): The current ETag.
+        last_modified (Optional[datetime]): The current naive UTC modification time.
+    """
+    response.headers['ETag'] = etag
+    second = last_modified_second(last_modified) if last_modified is not None else None
+    if second is not None:
+        response.headers['Last-Modified'] = to_http_date(second)
+
+def not_modified(etag: str, last_modified: Optional[datetime]) -> Response:
+    """
+    Build an empty 304 Not Modified response carrying the validators.
+
+    Args:
+        etag (str): The current ETag.
+        last_modified (Optional[datetime]): The current naive UTC modification time.
+
+    Returns:
+        Response: The 304 response.
+    """
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_validators(response, etag, last_modified)
+    return response
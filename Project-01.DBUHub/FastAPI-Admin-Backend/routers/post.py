@@ -1,10 +1,20 @@
+import asyncio
+import csv
+import io
+import json
 import os
-from fastapi import APIRouter, Depends, Form, HTTPException
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from fastapi import APIRouter, Depends, Form, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from .schemas import PostBase, PostDisplay
-from database.database import get_db
-from database import db_post
-from auth_utils import get_current_user
+from .schemas import BulkItemResult, BulkResult, PostBase, PostDeleteItem, PostDisplay, PostSearchResult, PostUpdateItem
+from . import fast_json, http_cache
+from database.database import get_db, get_async_db
+from database import db_post, feed_cache, feed_events, feed_state
+from auth_utils import get_current_user, get_current_user_sync, get_read_db
 from database.models import User
 import logging
 
@@ -17,11 +27,184 @@ router = APIRouter(
     tags=['post']    # Tag for grouping endpoints in the OpenAPI documentation
 )
 
+# Maximum number of items accepted by one bulk request
+BULK_MAX_ITEMS = int(os.getenv('POST_BULK_MAX_ITEMS', 5000))
+
+# Content types treated as newline-delimited JSON in bulk requests
+NDJSON_CONTENT_TYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl')
+
+# Fields returned by each ?view= of the feed; None is the full PostDisplay
+FEED_VIEWS = {
+    'full': None,
+    'excerpt': ('id', 'title', 'excerpt', 'content_length', 'creator', 'timestamp'),
+}
+
+# Fields of PostDisplay, in output order
+FULL_FIELDS = ('id', 'title', 'content', 'creator', 'timestamp')
+
+def parse_fields(fields: Optional[str], view: str) -> Optional[Tuple[str, ...]]:
+    """
+    Work out which post fields a list request asked for.
+
+    Args:
+        fields (Optional[str]): Comma-separated names from db_post.FIELD_COLUMNS; overrides view.
+        view (str): A key of FEED_VIEWS.
+
+    Returns:
+        Optional[Tuple[str, ...]]: The fields in canonical order, or None for full posts.
+
+    Raises:
+        HTTPException: If a field name is unknown.
+    """
+    if not fields:
+        return FEED_VIEWS[view]
+    requested = {field.strip() for field in fields.split(',') if field.strip()}
+    unknown = requested - db_post.FIELD_COLUMNS.keys()
+    if unknown or not requested:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown field(s) {fields!r}; choose from {', '.join(db_post.FIELD_COLUMNS)}"
+        )
+    # Canonical order so equivalent requests share cache entries and ETags
+    selected = tuple(field for field in db_post.FIELD_COLUMNS if field in requested)
+    return None if selected == FULL_FIELDS else selected
+
+def post_display(post) -> PostDisplay:
+    """
+    Build a PostDisplay from a post or a row with the same columns,
+    using creator_id so the creator never has to be loaded.
+
+    Args:
+        post: A DbPost or a row with id, title, content, creator_id and timestamp.
+
+    Returns:
+        PostDisplay: The post as returned by the API.
+    """
+    return PostDisplay(
+        id=post.id,
+        title=post.title,
+        content=post.content,
+        creator={'id': post.creator_id},
+        timestamp=post.timestamp
+    )
+
+def serialize_page(
+    posts: List[tuple],
+    next_cursor: Optional[str],
+    prev_cursor: Optional[str],
+    fields: Optional[Tuple[str, ...]] = None
+) -> bytes:
+    """
+    Serialize a feed page into the form stored in the feed cache.
+
+    The first line holds the cursors as JSON, the rest is the response body.
+    The rows are encoded straight to JSON without pydantic validation; the
+    route's response_model still documents the PostDisplay shape.
+
+    Args:
+        posts (List[tuple]): The rows on the page, selected with db_post.field_columns(fields).
+        next_cursor (Optional[str]): Cursor of the next (older) page.
+        prev_cursor (Optional[str]): Cursor of the previous (newer) page.
+        fields (Optional[Tuple[str, ...]]): The fields to include, or None for full posts.
+
+    Returns:
+        bytes: The serialized page.
+    """
+    cursors = json.dumps({'next': next_cursor, 'prev': prev_cursor}).encode()
+    items = fast_json.post_dicts(posts) if fields is None else fast_json.field_dicts(posts, fields)
+    body = fast_json.dumps(items)
+    return cursors + b'\n' + body
+
+def page_response(page: bytes) -> Response:
+    """
+    Build the HTTP response for a page produced by serialize_page.
+
+    Args:
+        page (bytes): The serialized page.
+
+    Returns:
+        Response: A JSON response with the cursor headers set.
+    """
+    cursors, _, body = page.partition(b'\n')
+    cursors = json.loads(cursors)
+    response = Response(content=body, media_type='application/json')
+    if cursors['next']:
+        response.headers['X-Next-Cursor'] = cursors['next']
+    if cursors['prev']:
+        response.headers['X-Prev-Cursor'] = cursors['prev']
+    return response
+
+def feed_page(
+    request: Request,
+    db: Session,
+    limit: int,
+    cursor: Optional[str],
+    selected: Optional[Tuple[str, ...]],
+    creator_id: Optional[int] = None
+) -> Response:
+    """
+    Build the response for one page of the feed, or of one author's posts.
+
+    The ETag is derived from the feed version, which every post write bumps,
+    so a client revalidating with If-None-Match or If-Modified-Since gets a
+    304 Not Modified without the page being queried or serialized. Other
+    pages are served from the feed cache when possible.
+
+    Args:
+        request (Request): The incoming request, used for conditional headers.
+        db (Session): The read session.
+        limit (int): The requested page size.
+        cursor (Optional[str]): The cursor of the page to fetch.
+        selected (Optional[Tuple[str, ...]]): Fields from parse_fields(), or None for full posts.
+        creator_id (Optional[int]): Only list this user's posts.
+
+    Returns:
+        Response: The page as JSON, with cursor and validator headers.
+
+    Raises:
+        HTTPException: 404 if the page of creator_id is empty because no
+        such user exists.
+    """
+    limit = min(limit, db_post.MAX_PAGE_SIZE)
+
+    # Validate the client's copy against the feed version before any real work
+    state = feed_state.get_state(db)
+    version = state.version if state else None
+    key = feed_cache.page_key(limit, cursor, version, selected, creator_id)
+    scope = 'feed' if creator_id is None else f'posts-of-{creator_id}'
+    etag = http_cache.make_etag(scope, version, limit, cursor, *(selected or ()))
+    last_modified = state.updated_at if state else None
+    if state is not None and http_cache.is_not_modified(request, etag, last_modified):
+        return http_cache.not_modified(etag, last_modified)
+
+    page = feed_cache.get(key)
+    if page is not None:
+        logging.info(f"Serving posts page from cache (limit={limit}, cursor={cursor}, creator_id={creator_id})")
+        response = page_response(page)
+        http_cache.set_validators(response, etag, last_modified)
+        return response
+
+    logging.info(f"Fetching posts page (limit={limit}, cursor={cursor}, creator_id={creator_id})")
+    read_generation = feed_cache.generation
+    # Fetch a single page using the database utility function
+    posts, next_cursor, prev_cursor = db_post.get_page(db, limit, cursor, db_post.field_columns(selected), creator_id)
+    logging.info(f"Number of posts retrieved: {len(posts)}")
+    # Only an empty page needs to tell a user without posts from one that
+    # does not exist
+    if not posts and creator_id is not None and db.get(User, creator_id) is None:
+        raise HTTPException(status_code=404, detail=f"User with ID {creator_id} not found")
+
+    page = serialize_page(posts, next_cursor, prev_cursor, selected)
+    feed_cache.put(key, page, read_generation)
+    response = page_response(page)
+    http_cache.set_validators(response, etag, last_modified)
+    return response
+
 @router.post('', response_model=PostDisplay)
 async def create_post(
     title: str = Form(...),  # Form field for the post title
     content: str = Form(...),  # Form field for the post content
-    db: Session = Depends(get_db),  # Dependency to get the database session
+    db: AsyncSession = Depends(get_async_db),  # Dependency to get the async database session
     current_user: User = Depends(get_current_user)  # Dependency to get the current authenticated user
 ):
     """
@@ -30,7 +213,7 @@ async def create_post(
     Args:
         title (str): The title of the post.
         content (str): The content of the post.
-        db (Session): The database session.
+        db (AsyncSession): The async database session.
         current_user (User): The currently authenticated user.
 
     Returns:
@@ -43,7 +226,7 @@ async def create_post(
         logging.info(f"Creating post for user ID: {current_user.id}")
 
         # Create a new post using the database utility function
-        post = db_post.create(
+        post = await db_post.create_async(
             db,
             PostBase(title=title, content=content),
             current_user.id
@@ -54,36 +237,609 @@ async def create_post(
         logging.error(f"Error in creating post: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+async def read_bulk_items(request: Request) -> list:
+    """
+    Read the items of a bulk request body.
+
+    The body is either a JSON array or, with an NDJSON content type, one
+    JSON value per line, which is parsed as it streams in.
+
+    Args:
+        request (Request): The incoming request.
+
+    Returns:
+        list: The decoded items, unvalidated.
+
+    Raises:
+        HTTPException: If the body is malformed or has more than BULK_MAX_ITEMS items.
+    """
+    too_many = HTTPException(status_code=413, detail=f"A bulk request may contain at most {BULK_MAX_ITEMS} items")
+    content_type = request.headers.get('content-type', '').split(';')[0].strip().lower()
+
+    if content_type in NDJSON_CONTENT_TYPES:
+        items = []
+        buffer = b''
+        line_number = 0
+
+        def parse(line: bytes):
+            if line.strip():
+                try:
+                    items.append(json.loads(line))
+                except ValueError:
+                    raise HTTPException(status_code=400, detail=f"Invalid JSON on line {line_number}")
+                if len(items) > BULK_MAX_ITEMS:
+                    raise too_many
+
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b'\n')
+            for line in lines:
+                line_number += 1
+                parse(line)
+        line_number += 1
+        parse(buffer)
+        return items
+
+    try:
+        items = json.loads(await request.body())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Request body must be a JSON array or NDJSON")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="Request body must be a JSON array or NDJSON")
+    if len(items) > BULK_MAX_ITEMS:
+        raise too_many
+    return items
+
+def validate_bulk_items(items: list, model: type, results: Dict[int, BulkItemResult]) -> list:
+    """
+    Validate bulk items against a schema, recording failures in results.
+
+    Args:
+        items (list): The decoded request items.
+        model (type): The pydantic model each item must match.
+        results (Dict[int, BulkItemResult]): Per-index results, filled in for invalid items.
+
+    Returns:
+        list: (index, model instance) pairs for the valid items.
+    """
+    valid = []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, model.model_validate(item)))
+        except ValidationError as e:
+            detail = '; '.join(f"{'.'.join(str(part) for part in error['loc']) or 'item'}: {error['msg']}" for error in e.errors())
+            results[index] = BulkItemResult(index=index, status=422, detail=detail)
+    return valid
+
+def reject_duplicate_ids(valid: list, results: Dict[int, BulkItemResult]) -> list:
+    """
+    Reject every item after the first that refers to the same post ID.
+
+    Args:
+        valid (list): (index, item) pairs whose items carry an id.
+        results (Dict[int, BulkItemResult]): Per-index results, filled in for duplicates.
+
+    Returns:
+        list: The (index, item) pairs with unique IDs.
+    """
+    seen = set()
+    unique = []
+    for index, item in valid:
+        if item.id in seen:
+            results[index] = BulkItemResult(index=index, id=item.id, status=409, detail="Duplicate post ID in request")
+        else:
+            seen.add(item.id)
+            unique.append((index, item))
+    return unique
+
+def bulk_result(results: Dict[int, BulkItemResult]) -> BulkResult:
+    """
+    Assemble the bulk response from per-index results.
+
+    Args:
+        results (Dict[int, BulkItemResult]): The result of every item.
+
+    Returns:
+        BulkResult: The results in request order with success/failure counts.
+    """
+    ordered = [results[index] for index in sorted(results)]
+    succeeded = sum(1 for result in ordered if result.status < 300)
+    return BulkResult(succeeded=succeeded, failed=len(ordered) - succeeded, results=ordered)
+
+BULK_STATUS_DETAILS = {
+    403: "Not authorized to change this post",
+    404: "Post not found",
+}
+
+@router.post('/bulk', response_model=BulkResult)
+async def bulk_create_posts(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),  # Dependency to get the async database session
+    current_user: User = Depends(get_current_user)  # Dependency to get the current authenticated user
+):
+    """
+    Endpoint to create many posts in one transaction.
+
+    The body is a JSON array (or NDJSON stream) of {"title", "content"}
+    objects. Valid items are inserted with a single multi-row INSERT;
+    invalid items are reported without affecting the others.
+
+    Args:
+        request (Request): The incoming request carrying the items.
+        db (AsyncSession): The async database session.
+        current_user (User): The currently authenticated user.
+
+    Returns:
+        BulkResult: Per-item outcomes, with the new post IDs.
+
+    Raises:
+        HTTPException: If the body is malformed or the insert fails.
+    """
+    items = await read_bulk_items(request)
+    try:
+        logging.info(f"Bulk creating {len(items)} posts for user ID: {current_user.id}")
+        results = {}
+        valid = validate_bulk_items(items, PostBase, results)
+
+        ids = await db_post.bulk_create_async(db, [item for _, item in valid], current_user.id)
+        for (index, _), post_id in zip(valid, ids):
+            results[index] = BulkItemResult(index=index, id=post_id, status=201)
+        return bulk_result(results)
+    except Exception as e:
+        logging.error(f"Error in bulk creating posts: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.put('/bulk', response_model=BulkResult)
+async def bulk_update_posts(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),  # Dependency to get the async database session
+    current_user: User = Depends(get_current_user)  # Dependency to get the current authenticated user
+):
+    """
+    Endpoint to update many posts in one transaction.
+
+    The body is a JSON array (or NDJSON stream) of {"id", "title",
+    "content"} objects. Ownership of every post is checked with one query
+    and the allowed posts are updated together.
+
+    Args:
+        request (Request): The incoming request carrying the items.
+        db (AsyncSession): The async database session.
+        current_user (User): The currently authenticated user.
+
+    Returns:
+        BulkResult: Per-item outcomes.
+
+    Raises:
+        HTTPException: If the body is malformed or the update fails.
+    """
+    items = await read_bulk_items(request)
+    try:
+        logging.info(f"Bulk updating {len(items)} posts for user ID: {current_user.id}")
+        results = {}
+        valid = reject_duplicate_ids(validate_bulk_items(items, PostUpdateItem, results), results)
+
+        statuses = await db_post.bulk_update_async(db, [item for _, item in valid], current_user.id)
+        for index, item in valid:
+            status = statuses[item.id]
+            results[index] = BulkItemResult(index=index, id=item.id, status=status, detail=BULK_STATUS_DETAILS.get(status))
+        return bulk_result(results)
+    except Exception as e:
+        logging.error(f"Error in bulk updating posts: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.delete('/bulk', response_model=BulkResult)
+async def bulk_delete_posts(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),  # Dependency to get the async database session
+    current_user: User = Depends(get_current_user)  # Dependency to get the current authenticated user
+):
+    """
+    Endpoint to delete many posts in one transaction.
+
+    The body is a JSON array (or NDJSON stream) of post IDs or {"id"}
+    objects. Ownership of every post is checked with one query and the
+    allowed posts are removed with a single DELETE.
+
+    Args:
+        request (Request): The incoming request carrying the items.
+        db (AsyncSession): The async database session.
+        current_user (User): The currently authenticated user.
+
+    Returns:
+        BulkResult: Per-item outcomes.
+
+    Raises:
+        HTTPException: If the body is malformed or the delete fails.
+    """
+    items = await read_bulk_items(request)
+    try:
+        logging.info(f"Bulk deleting {len(items)} posts for user ID: {current_user.id}")
+        results = {}
+        # Bare IDs are accepted as shorthand for {"id": ...}; bool is an int
+        # subclass, so true and false are left for validation to reject
+        items = [{'id': item} if isinstance(item, int) and not isinstance(item, bool) else item for item in items]
+        valid = reject_duplicate_ids(validate_bulk_items(items, PostDeleteItem, results), results)
+
+        statuses = await db_post.bulk_delete_async(db, [item.id for _, item in valid], current_user.id)
+        for index, item in valid:
+            status = statuses[item.id]
+            results[index] = BulkItemResult(index=index, id=item.id, status=status, detail=BULK_STATUS_DETAILS.get(status))
+        return bulk_result(results)
+    except Exception as e:
+        logging.error(f"Error in bulk deleting posts: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get('/all', response_model=list[PostDisplay])
-def get_all_posts(db: Session = Depends(get_db)):
+def get_all_posts(
+    request: Request,
+    limit: int = Query(db_post.DEFAULT_PAGE_SIZE, ge=1),  # Page size, clamped to the server maximum
+    cursor: Optional[str] = None,  # Opaque cursor from X-Next-Cursor / X-Prev-Cursor
+    view: str = Query('full', pattern='^(full|excerpt)$'),  # 'excerpt' swaps content for excerpt and content_length
+    fields: Optional[str] = None,  # Comma-separated fields to return, e.g. id,title,excerpt
+    db: Session = Depends(get_read_db)  # Replica session when one is configured
+):
     """
-    Endpoint to fetch all posts.
+    Endpoint to fetch one page of posts, newest first.
+
+    By default every post is a full PostDisplay. view=excerpt returns the
+    stored excerpt and content length instead of the content, and fields=
+    picks any subset of id, title, content, excerpt, content_length,
+    creator and timestamp. Only the selected columns are read.
+
+    The cursors for the neighbouring pages are returned in the
+    X-Next-Cursor and X-Prev-Cursor response headers. Serialized pages are
+    kept in the feed cache until they expire or a post is written, and
+    revalidation with the ETag is answered without a query (see feed_page).
 
     Args:
-        db (Session): The database session.
+        request (Request): The incoming request, used for conditional headers.
+        limit (int): The number of posts to return.
+        cursor (Optional[str]): The cursor of the page to fetch.
+        view (str): 'full' or 'excerpt'.
+        fields (Optional[str]): The fields to return; overrides view.
+        db (Session): The read session (a replica, or the primary).
 
     Returns:
-        List[PostDisplay]: A list of all posts.
+        List[PostDisplay]: A page of posts, restricted to the selected fields.
 
     Raises:
-        HTTPException: If there is an error fetching the posts.
+        HTTPException: If the cursor or a field name is invalid or there is an error fetching the posts.
     """
     try:
-        logging.info("Fetching all posts")
-        # Fetch all posts using the database utility function
-        posts = db_post.get_all(db)
-        logging.info(f"Number of posts retrieved: {len(posts)}")
-        return posts
+        return feed_page(request, db, limit, cursor, parse_fields(fields, view))
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Error in fetching posts: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get('/search', response_model=list[PostSearchResult])
+def search_posts(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),  # Search text
+    limit: int = Query(db_post.DEFAULT_PAGE_SIZE, ge=1),  # Page size, clamped to the server maximum
+    offset: int = Query(0, ge=0),  # Number of results to skip
+    db: Session = Depends(get_db)
+):
+    """
+    Endpoint to search posts by title and content.
+
+    Results are ranked by relevance (title matches weigh more) and carry a
+    snippet with the matched terms highlighted. When more results exist,
+    the offset of the next page is returned in the X-Next-Offset header.
+
+    Args:
+        response (Response): The outgoing response, used to set X-Next-Offset.
+        q (str): The search text.
+        limit (int): The number of results to return.
+        offset (int): The number of results to skip.
+        db (Session): The database session.
+
+    Returns:
+        List[PostSearchResult]: The matching posts, best match first.
+
+    Raises:
+        HTTPException: If the query is blank or there is an error searching.
+    """
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Search query must not be blank")
+    try:
+        logging.info(f"Searching posts (q={q!r}, limit={limit}, offset={offset})")
+        results, next_offset = db_post.search_posts(db, q, limit, offset)
+        if next_offset is not None:
+            response.headers['X-Next-Offset'] = str(next_offset)
+
+        return [
+            PostSearchResult(**post_display(post).model_dump(), rank=rank, snippet=snippet)
+            for post, rank, snippet in results
+        ]
+    except Exception as e:
+        logging.error(f"Error in searching posts: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+def export_values(row: tuple) -> list:
+    """
+    Convert an export row to plain values, with datetimes in ISO 8601.
+
+    Args:
+        row (tuple): A row in db_post.EXPORT_COLUMNS order.
+
+    Returns:
+        list: The row's values.
+    """
+    return [value.isoformat() if isinstance(value, datetime) else value for value in row]
+
+def export_ndjson(rows, batch_size: int = db_post.EXPORT_BATCH_SIZE):
+    """
+    Encode export rows as NDJSON, one post per line.
+
+    Args:
+        rows: Tuples in db_post.EXPORT_COLUMNS order.
+        batch_size (int): Number of rows encoded per yielded chunk.
+
+    Yields:
+        bytes: Chunks of NDJSON text.
+    """
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(dict(zip(db_post.EXPORT_COLUMNS, export_values(row)))))
+        if len(lines) == batch_size:
+            yield ('\n'.join(lines) + '\n').encode()
+            lines = []
+    if lines:
+        yield ('\n'.join(lines) + '\n').encode()
+
+def export_csv(rows, batch_size: int = db_post.EXPORT_BATCH_SIZE):
+    """
+    Encode export rows as CSV with a header line.
+
+    Args:
+        rows: Tuples in db_post.EXPORT_COLUMNS order.
+        batch_size (int): Number of rows encoded per yielded chunk.
+
+    Yields:
+        bytes: Chunks of CSV text.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(db_post.EXPORT_COLUMNS)
+    for count, row in enumerate(rows, start=1):
+        writer.writerow(export_values(row))
+        if count % batch_size == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+EXPORT_FORMATS = {
+    'ndjson': (export_ndjson, 'application/x-ndjson'),
+    'csv': (export_csv, 'text/csv'),
+}
+
+@router.get('/export')
+def export_posts(
+    format: str = Query('ndjson', pattern='^(ndjson|csv)$'),  # Output format
+    since: Optional[datetime] = None,  # Only posts created or updated since this time
+    db: Session = Depends(get_read_db),  # Stays open until the stream ends
+    current_user: User = Depends(get_current_user_sync)  # Resolved on db, so the request holds one connection
+):
+    """
+    Endpoint to stream every post as NDJSON or CSV.
+
+    Rows are read with a server-side cursor and written out as they
+    arrive, so memory use stays flat whatever the table size. Rows are
+    ordered by last change, so the updated_at of the last row can be used
+    as the next since= for an incremental export (the boundary row is
+    repeated; deduplicate by id).
+
+    Args:
+        format (str): 'ndjson' or 'csv'.
+        since (Optional[datetime]): Lower bound on the post's last change.
+        db (Session): The read session (a replica, or the primary).
+        current_user (User): The currently authenticated user.
+
+    Returns:
+        StreamingResponse: The export, sent as an attachment.
+    """
+    logging.info(f"Exporting posts as {format} since {since} for user ID: {current_user.id}")
+    if since is not None and since.tzinfo is not None:
+        # Timestamps are stored as naive UTC
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+
+    encode, media_type = EXPORT_FORMATS[format]
+    filename = f"posts-{datetime.utcnow():%Y%m%dT%H%M%S}.{format}"
+    return StreamingResponse(
+        encode(db_post.iter_export_rows(db, since)),
+        media_type=media_type,
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
+
+@router.get('/mine', response_model=list[PostDisplay])
+def get_my_posts(
+    request: Request,
+    limit: int = Query(db_post.DEFAULT_PAGE_SIZE, ge=1),  # Page size, clamped to the server maximum
+    cursor: Optional[str] = None,  # Opaque cursor from X-Next-Cursor / X-Prev-Cursor
+    view: str = Query('full', pattern='^(full|excerpt)$'),  # 'excerpt' swaps content for excerpt and content_length
+    fields: Optional[str] = None,  # Comma-separated fields to return, e.g. id,title,excerpt
+    db: Session = Depends(get_read_db),  # Replica session unless the user wrote just now
+    current_user: User = Depends(get_current_user_sync)  # Resolved on db, so the request holds one connection
+):
+    """
+    Endpoint to fetch one page of the current user's posts, newest first.
+
+    Takes the same parameters as GET /post/all and is served from the
+    (creator_id, timestamp, id) index.
+
+    Args:
+        request (Request): The incoming request, used for conditional headers.
+        limit (int): The number of posts to return.
+        cursor (Optional[str]): The cursor of the page to fetch.
+        view (str): 'full' or 'excerpt'.
+        fields (Optional[str]): The fields to return; overrides view.
+        db (Session): The read session (a replica, or the primary).
+        current_user (User): The currently authenticated user.
+
+    Returns:
+        List[PostDisplay]: A page of the user's posts.
+
+    Raises:
+        HTTPException: If the cursor or a field name is invalid or there is an error fetching the posts.
+    """
+    try:
+        return feed_page(request, db, limit, cursor, parse_fields(fields, view), current_user.id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Error in fetching posts of user ID {current_user.id}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Sent when a live subscriber was dropped for falling behind: its copy of
+# the feed may be missing events, so it should refetch the first page
+LIVE_RESET = b'{"type":"reset"}'
+
+async def next_live_event(subscriber: feed_events.Subscriber) -> Optional[bytes]:
+    """
+    Wait for the subscriber's next event.
+
+    Args:
+        subscriber (feed_events.Subscriber): The live connection.
+
+    Returns:
+        Optional[bytes]: The encoded event, b'' when LIVE_FEED_HEARTBEAT
+        passed without one, or None if the subscriber was evicted.
+    """
+    try:
+        return await asyncio.wait_for(subscriber.queue.get(), feed_events.LIVE_FEED_HEARTBEAT)
+    except asyncio.TimeoutError:
+        return b''
+
+async def sse_stream(subscriber: feed_events.Subscriber):
+    """
+    Encode a subscriber's events as Server-Sent Events.
+
+    Args:
+        subscriber (feed_events.Subscriber): The live connection.
+
+    Yields:
+        bytes: One SSE message per event, or a keep-alive comment.
+    """
+    try:
+        while True:
+            payload = await next_live_event(subscriber)
+            if payload is None:
+                yield b'data: ' + LIVE_RESET + b'\n\n'
+                return
+            yield b'data: ' + payload + b'\n\n' if payload else b': keep-alive\n\n'
+    finally:
+        feed_events.hub.unsubscribe(subscriber)
+
+@router.get('/live')
+async def live_feed():
+    """
+    Endpoint streaming post changes as Server-Sent Events.
+
+    Each message is JSON: {"type": "created", "posts": [...]} with feed
+    items shaped like PostDisplay, {"type": "updated", "posts": [...]} with
+    id, title, content and updated_at, or {"type": "deleted", "posts":
+    [{"id": ...}]}. Fetch the first page of /post/all after connecting and
+    apply the events to it. A {"type": "reset"} message means events were
+    dropped because the client fell behind; the stream then ends, and the
+    client should reconnect and refetch.
+
+    Returns:
+        StreamingResponse: The event stream.
+
+    Raises:
+        HTTPException: 503 if this worker has no room for another subscriber,
+        or if it runs next to other workers without a shared event backend.
+    """
+    if not feed_events.available():
+        raise HTTPException(status_code=503, detail="Live feed is not available with several workers and no shared event backend")
+    subscriber = feed_events.hub.subscribe()
+    if subscriber is None:
+        raise HTTPException(status_code=503, detail="Too many live feed subscribers, please retry later")
+    return StreamingResponse(
+        sse_stream(subscriber),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@router.websocket('/live')
+async def live_feed_socket(websocket: WebSocket):
+    """
+    WebSocket endpoint sending the same messages as GET /post/live, one
+    per text frame. Idle connections get a {"type": "ping"} message every
+    LIVE_FEED_HEARTBEAT seconds.
+
+    Args:
+        websocket (WebSocket): The client connection.
+    """
+    subscriber = feed_events.hub.subscribe() if feed_events.available() else None
+    if subscriber is None:
+        # 1013: try again later
+        await websocket.close(code=1013)
+        return
+    try:
+        await websocket.accept()
+        while True:
+            payload = await next_live_event(subscriber)
+            if payload is None:
+                await websocket.send_text(LIVE_RESET.decode())
+                await websocket.close(code=1013)
+                return
+            await websocket.send_text(payload.decode() if payload else '{"type":"ping"}')
+    except WebSocketDisconnect:
+        pass
+    finally:
+        feed_events.hub.unsubscribe(subscriber)
+
+@router.get('/{id}', response_model=PostDisplay)
+def get_post(
+    id: int,  # Path parameter for the post ID
+    request: Request,
+    db: Session = Depends(get_read_db)  # Replica session when one is configured
+):
+    """
+    Endpoint to fetch a single post.
+
+    Responds with 304 Not Modified when the client's If-None-Match or
+    If-Modified-Since still matches the post's last update.
+
+    Args:
+        id (int): The ID of the post.
+        request (Request): The incoming request, used for conditional headers.
+        db (Session): The read session (a replica, or the primary).
+
+    Returns:
+        PostDisplay: The post.
+
+    Raises:
+        HTTPException: If the post is not found or there is an error fetching it.
+    """
+    try:
+        post = db_post.get_by_id(id, db)
+        last_modified = post.updated_at or post.timestamp
+        etag = http_cache.make_etag('post', post.id, last_modified.isoformat())
+        if http_cache.is_not_modified(request, etag, last_modified):
+            return http_cache.not_modified(etag, last_modified)
+
+        body = PostDisplay.model_validate(post, from_attributes=True).model_dump_json()
+        response = Response(content=body, media_type='application/json')
+        http_cache.set_validators(response, etag, last_modified)
+        return response
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Error in fetching post: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.put('/{id}', response_model=PostDisplay)
 async def update_post(
     id: int,  # Path parameter for the post ID
     title: str = Form(...),  # Form field for the new post title
     content: str = Form(...),  # Form field for the new post content
-    db: Session = Depends(get_db),  # Dependency to get the database session
+    db: AsyncSession = Depends(get_async_db),  # Dependency to get the async database session
     current_user: User = Depends(get_current_user)  # Dependency to get the current authenticated user
 ):
     """
@@ -93,7 +849,7 @@ async def update_post(
         id (int): The ID of the post to be updated.
         title (str): The new title of the post.
         content (str): The new content of the post.
-        db (Session): The database session.
+        db (AsyncSession): The async database session.
         current_user (User): The currently authenticated user.
 
     Returns:
@@ -105,24 +861,19 @@ async def update_post(
     try:
         logging.info(f"Updating post with ID: {id} for user ID: {current_user.id}")
 
-        # Get the post by ID
-        post = db_post.get_by_id(id, db)
-        if not post:
-            raise HTTPException(status_code=404, detail=f"Post with ID {id} not found")
-        
-        # Check if the current user is the creator of the post
-        if post.creator_id != current_user.id:
-            logging.warning(f"Unauthorized access attempt by user ID: {current_user.id} on post ID: {id}")
-            raise HTTPException(status_code=403, detail="Not authorized to update this post")
-        
-        # Update the post using the database utility function
-        updated_post = db_post.update(
+        # Update the post in one statement that also checks ownership
+        updated_post = await db_post.update_async(
             db,
             id,
-            PostBase(title=title, content=content)
+            PostBase(title=title, content=content),
+            current_user.id
         )
 
-        return updated_post
+        return post_display(updated_post)
+    except HTTPException as e:
+        if e.status_code == 403:
+            logging.warning(f"Unauthorized access attempt by user ID: {current_user.id} on post ID: {id}")
+        raise
     except Exception as e:
         logging.error(f"Error in updating post: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -130,7 +881,7 @@ async def update_post(
 @router.delete('/{id}')
 async def delete(
     id: int,  # Path parameter for the post ID
-    db: Session = Depends(get_db),  # Dependency to get the database session
+    db: AsyncSession = Depends(get_async_db),  # Dependency to get the async database session
     current_user: User = Depends(get_current_user)  # Dependency to get the current authenticated user
 ):
     """
@@ -138,7 +889,7 @@ async def delete(
 
     Args:
         id (int): The ID of the post to be deleted.
-        db (Session): The database session.
+        db (AsyncSession): The async database session.
         current_user (User): The currently authenticated user.
 
     Returns:
@@ -150,19 +901,12 @@ async def delete(
     try:
         logging.info(f"Attempting to delete post with ID: {id} for user ID: {current_user.id}")
 
-        # Get the post by ID
-        post = db_post.get_by_id(id, db)
-        if not post:
-            raise HTTPException(status_code=404, detail=f"Post with ID {id} not found")
-        
-        # Check if the current user is the creator of the post
-        if post.creator_id != current_user.id:
+        # Delete the post in one statement that also checks ownership
+        return await db_post.delete_async(id, db, current_user.id)
+    except HTTPException as e:
+        if e.status_code == 403:
             logging.warning(f"Unauthorized access attempt by user ID: {current_user.id} on post ID: {id}")
-            raise HTTPException(status_code=403, detail="Not authorized to delete this post")
-        
-        # Delete the post using the database utility function
-        db_post.delete(id, db, current_user.id)
-        return {"detail": "Post deleted successfully"}
+        raise
     except Exception as e:
         logging.error(f"Error in deleting post: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
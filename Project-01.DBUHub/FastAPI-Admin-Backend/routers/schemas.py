@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, StrictInt
+from typing import List, Optional
 from datetime import datetime
 
 class UserBase(BaseModel):
@@ -44,3 +44,60 @@ class PostDisplay(BaseModel):
 
     class Config:
         orm_mode = True
+
+class PostSearchResult(PostDisplay):
+    """
+    Model for a post returned by full-text search.
+
+    Attributes:
+        rank (float): Relevance of the post to the query; higher is better.
+        snippet (str): HTML-escaped excerpt of the content with matches wrapped in <mark> tags.
+    """
+    rank: float
+    snippet: str
+
+class PostUpdateItem(PostBase):
+    """
+    Model for one post in a bulk update request.
+
+    Attributes:
+        id (int): Unique identifier of the post to update.
+    """
+    id: StrictInt  # Strict, so a JSON true is not taken as post 1
+
+class PostDeleteItem(BaseModel):
+    """
+    Model for one post in a bulk delete request.
+
+    Attributes:
+        id (int): Unique identifier of the post to delete.
+    """
+    id: StrictInt  # Strict, so a JSON true is not taken as post 1
+
+class BulkItemResult(BaseModel):
+    """
+    Outcome of one item of a bulk request.
+
+    Attributes:
+        index (int): Position of the item in the request.
+        id (Optional[int]): The post ID, when known.
+        status (int): HTTP-style status of the item (201, 200, 403, 404, 409 or 422).
+        detail (Optional[str]): Why the item failed, if it did.
+    """
+    index: int
+    id: Optional[int] = None
+    status: int
+    detail: Optional[str] = None
+
+class BulkResult(BaseModel):
+    """
+    Model for the response of a bulk request.
+
+    Attributes:
+        succeeded (int): Number of items applied.
+        failed (int): Number of items rejected.
+        results (List[BulkItemResult]): Per-item outcomes, in request order.
+    """
+    succeeded: int
+    failed: int
+    results: List[BulkItemResult]
@@ -0,0 +1,55 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.orm import Session
+from .post import feed_page, parse_fields
+from .schemas import PostDisplay
+from database import db_post
+from auth_utils import get_read_db
+import logging
+
+# Create an APIRouter instance for the user-related endpoints
+router = APIRouter(
+    prefix='/users',  # Prefix for all routes in this router
+    tags=['users']    # Tag for grouping endpoints in the OpenAPI documentation
+)
+
+@router.get('/{id}/posts', response_model=list[PostDisplay])
+def get_user_posts(
+    id: int,
+    request: Request,
+    limit: int = Query(db_post.DEFAULT_PAGE_SIZE, ge=1),  # Page size, clamped to the server maximum
+    cursor: Optional[str] = None,  # Opaque cursor from X-Next-Cursor / X-Prev-Cursor
+    view: str = Query('full', pattern='^(full|excerpt)$'),  # 'excerpt' swaps content for excerpt and content_length
+    fields: Optional[str] = None,  # Comma-separated fields to return, e.g. id,title,excerpt
+    db: Session = Depends(get_read_db)  # Replica session unless the caller wrote just now
+):
+    """
+    Endpoint to fetch one page of a user's posts, newest first.
+
+    Takes the same parameters as GET /post/all and is served from the
+    (creator_id, timestamp, id) index, so a page costs the same however
+    many posts the user or the whole table holds.
+
+    Args:
+        id (int): The ID of the user whose posts are listed.
+        request (Request): The incoming request, used for conditional headers.
+        limit (int): The number of posts to return.
+        cursor (Optional[str]): The cursor of the page to fetch.
+        view (str): 'full' or 'excerpt'.
+        fields (Optional[str]): The fields to return; overrides view.
+        db (Session): The read session (a replica, or the primary).
+
+    Returns:
+        List[PostDisplay]: A page of the user's posts.
+
+    Raises:
+        HTTPException: If the user does not exist, the cursor or a field name is invalid,
+        or there is an error fetching the posts.
+    """
+    try:
+        return feed_page(request, db, limit, cursor, parse_fields(fields, view), id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Error in fetching posts of user ID {id}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
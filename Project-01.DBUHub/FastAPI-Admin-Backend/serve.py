@@ -0,0 +1,169 @@
+"""
+Production entry point: runs main:app under uvicorn with tuned defaults.
+
+Usage:
+    python serve.py [--host 0.0.0.0] [--port 8000] [--workers N]
+
+Every setting can also come from the environment (see README). Database
+and auth settings are derived here and passed to the workers through the
+environment, so this module must not import the application.
+"""
+import argparse
+import importlib.util
+import logging
+import os
+import sys
+from typing import Optional, Tuple
+import uvicorn
+from dotenv import load_dotenv
+
+# Load environment variables from a .env file before reading the settings
+load_dotenv()
+
+# Address and port to listen on
+HOST = os.getenv('HOST', '0.0.0.0')
+PORT = int(os.getenv('PORT', 8000))
+
+# Worker processes (0 = one per available CPU core)
+WEB_CONCURRENCY = int(os.getenv('WEB_CONCURRENCY', 0))
+
+# Seconds an idle keep-alive connection is held open. Keep this above the
+# idle timeout of the proxy or load balancer in front (60 s for nginx and
+# most cloud load balancers), or it may reuse a connection just as the
+# worker closes it and answer the client with a 502.
+KEEPALIVE_TIMEOUT = int(os.getenv('KEEPALIVE_TIMEOUT', 75))
+
+# Pending connections the kernel queues while all workers are busy
+BACKLOG = int(os.getenv('BACKLOG', 2048))
+
+# Seconds to wait for open requests and live feed connections on shutdown
+# before closing them; below the usual 30 s before orchestrators SIGKILL
+GRACEFUL_SHUTDOWN_TIMEOUT = int(os.getenv('GRACEFUL_SHUTDOWN_TIMEOUT', 20))
+
+# Comma-separated addresses of the proxies / load balancers in front whose
+# X-Forwarded-For and X-Forwarded-Proto are trusted ('*' trusts any peer;
+# only use it when the workers are unreachable except through the proxy).
+# Without it every request appears to come from the proxy, and the login
+# throttle puts all clients in one per-IP bucket.
+FORWARDED_ALLOW_IPS = os.getenv('FORWARDED_ALLOW_IPS', '127.0.0.1')
+
+# Log every request. Costs throughput; counts and latency per route are
+# on /metrics either way.
+ACCESS_LOG = os.getenv('ACCESS_LOG', 'false').lower() in ('1', 'true', 'yes')
+
+# Total connections this deployment may open to each database, across all
+# workers and both engines (0 keeps DB_POOL_SIZE / DB_MAX_OVERFLOW as set).
+# Leave headroom below the server's max_connections for other clients.
+DB_MAX_CONNECTIONS = int(os.getenv('DB_MAX_CONNECTIONS', 0))
+
+def available_cpus() -> int:
+    """
+    Count the CPU cores this process may run on.
+
+    Returns:
+        int: The cores in the process's affinity mask where supported, otherwise all cores.
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+def pool_settings(max_connections: int, workers: int) -> Tuple[int, int]:
+    """
+    Split a connection budget into per-engine pool settings.
+
+    Each worker has a sync and an async engine, each opening up to
+    pool_size + max_overflow connections. Two thirds of an engine's share
+    are kept open; the rest is overflow, opened only under bursts.
+
+    Args:
+        max_connections (int): Connections allowed across all workers.
+        workers (int): The number of worker processes.
+
+    Returns:
+        Tuple[int, int]: (pool_size, max_overflow) for each engine.
+
+    Raises:
+        ValueError: If the budget leaves an engine without a connection.
+    """
+    per_engine = max_connections // (workers * 2)
+    if per_engine < 1:
+        raise ValueError(
+            f"DB_MAX_CONNECTIONS={max_connections} is too small for {workers} workers "
+            f"with two engines each; allow at least {workers * 2} or run fewer workers"
+        )
+    pool_size = max(1, (per_engine * 2 + 2) // 3)
+    return pool_size, per_engine - pool_size
+
+def pick_implementation(preferred: str, fallback: str) -> str:
+    """Return preferred if its module is installed, otherwise fallback."""
+    return preferred if importlib.util.find_spec(preferred) is not None else fallback
+
+def configure_workers(workers: int, cpus: int) -> None:
+    """
+    Set the environment the workers read their settings from. An explicit
+    BCRYPT_WORKERS is kept; DB_POOL_SIZE and DB_MAX_OVERFLOW are replaced
+    when DB_MAX_CONNECTIONS is set.
+
+    Args:
+        workers (int): The number of worker processes.
+        cpus (int): The available CPU cores.
+    """
+    # Each worker runs its own bcrypt pool; share the cores instead of
+    # starting cpus threads in every worker
+    os.environ.setdefault('BCRYPT_WORKERS', str(max(1, cpus // workers)))
+
+    # Tells the workers how many of them there are (read by feed_events)
+    os.environ['WEB_CONCURRENCY'] = str(workers)
+
+    if DB_MAX_CONNECTIONS > 0:
+        pool_size, max_overflow = pool_settings(DB_MAX_CONNECTIONS, workers)
+        os.environ['DB_POOL_SIZE'] = str(pool_size)
+        os.environ['DB_MAX_OVERFLOW'] = str(max_overflow)
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default=HOST, help='address to bind')
+    parser.add_argument('--port', type=int, default=PORT, help='port to bind')
+    parser.add_argument('--workers', type=int, default=WEB_CONCURRENCY,
+                        help='worker processes (0 = one per CPU core)')
+    parser.add_argument('--loop', choices=('auto', 'uvloop', 'asyncio'), default='auto',
+                        help='event loop (auto = uvloop when installed)')
+    parser.add_argument('--http', choices=('auto', 'httptools', 'h11'), default='auto',
+                        help='HTTP parser (auto = httptools when installed)')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    cpus = available_cpus()
+    workers = args.workers if args.workers > 0 else cpus
+    try:
+        configure_workers(workers, cpus)
+    except ValueError as e:
+        logging.error(str(e))
+        return 2
+
+    loop = pick_implementation('uvloop', 'asyncio') if args.loop == 'auto' else args.loop
+    http = pick_implementation('httptools', 'h11') if args.http == 'auto' else args.http
+    logging.info(
+        f"Serving on {args.host}:{args.port} with {workers} worker(s) on {cpus} CPU(s), "
+        f"loop={loop}, http={http}, keep-alive={KEEPALIVE_TIMEOUT}s, "
+        f"DB pool={os.getenv('DB_POOL_SIZE', 'default')}+{os.getenv('DB_MAX_OVERFLOW', 'default')} per engine"
+    )
+
+    uvicorn.run(
+        'main:app',
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        loop=loop,
+        http=http,
+        timeout_keep_alive=KEEPALIVE_TIMEOUT,
+        backlog=BACKLOG,
+        timeout_graceful_shutdown=GRACEFUL_SHUTDOWN_TIMEOUT,
+        access_log=ACCESS_LOG,
+        proxy_headers=True,
+        forwarded_allow_ips=FORWARDED_ALLOW_IPS,
+    )
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,99 @@
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+from itertools import count
+
+# Make the application modules importable when pytest runs from the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The engines are created at import, so the environment must be set first
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'test.db')
+os.environ.setdefault('AUTH_SECRET_KEY', 'test-secret')
+os.environ.setdefault('AUTH_ALGORITHM', 'HS256')
+os.environ.setdefault('BCRYPT_ROUNDS', '4')
+# Every test client shares one address and logs in repeatedly
+os.environ.setdefault('LOGIN_IP_LIMIT', '0')
+# Measure the queries behind a page, not the feed cache in front of them
+os.environ.setdefault('FEED_CACHE_TTL', '0')
+# Lets one request list the 1,000 posts of the statement-count test
+os.environ.setdefault('POST_PAGE_MAX_SIZE', '1000')
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from jose import jwt  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+import main  # noqa: E402
+from auth_utils import ALGORITHM, SECRET_KEY  # noqa: E402
+from database.database import async_engine, engine  # noqa: E402
+
+PASSWORD = 'test-password'
+
+_usernames = count()
+
+
+@pytest.fixture(scope='session')
+def client():
+    """A client for the app, with start-up and shutdown run once for the session."""
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def make_user(client):
+    """Register a new user and return (user id, Authorization headers)."""
+    def make():
+        username = f'user{next(_usernames)}'
+        assert client.post('/auth/', json={'username': username, 'password': PASSWORD}).status_code == 201
+        token = client.post('/auth/token', data={'username': username, 'password': PASSWORD}).json()
+        claims = jwt.decode(token['access_token'], SECRET_KEY, algorithms=[ALGORITHM])
+        return claims['id'], {'Authorization': f"Bearer {token['access_token']}"}
+    return make
+
+
+def username_of(headers: dict) -> str:
+    """The username behind Authorization headers."""
+    return jwt.decode(headers['Authorization'].split()[1], SECRET_KEY, algorithms=[ALGORITHM])['sub']
+
+
+def login(client, headers: dict) -> dict:
+    """Log in again as the user behind headers and return the token response."""
+    response = client.post('/auth/token', data={'username': username_of(headers), 'password': PASSWORD})
+    assert response.status_code == 200
+    return response.json()
+
+
+@contextmanager
+def recorded_statements():
+    """Collect the SQL statements sent on the sync and the async engine."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    targets = (engine, async_engine.sync_engine)
+    for target in targets:
+        event.listen(target, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        for target in targets:
+            event.remove(target, 'before_cursor_execute', record)
+
+
+@contextmanager
+def recorded_checkouts():
+    """Collect the pool checkouts made on the sync and the async engine."""
+    checkouts = []
+
+    def record(dbapi_connection, connection_record, connection_proxy):
+        checkouts.append(connection_record)
+
+    pools = (engine.pool, async_engine.sync_engine.pool)
+    for pool in pools:
+        event.listen(pool, 'checkout', record)
+    try:
+        yield checkouts
+    finally:
+        for pool in pools:
+            event.remove(pool, 'checkout', record)
@@ -0,0 +1,23 @@
+import auth_utils
+from conftest import username_of
+
+
+def test_pool_stats_need_an_admin(client, make_user, monkeypatch):
+    _, headers = make_user()
+    _, admin = make_user()
+    monkeypatch.setattr(auth_utils, 'ADMIN_USERNAMES', {username_of(admin)})
+
+    assert client.get('/admin/pool').status_code == 401
+    response = client.get('/admin/pool', headers=headers)
+    assert response.status_code == 403
+    assert response.json() == {'detail': 'Admin access required'}
+
+    response = client.get('/admin/pool', headers=admin)
+    assert response.status_code == 200
+    assert response.json()['sync']['pool_class']
+
+
+def test_nobody_is_admin_by_default(client, make_user):
+    _, headers = make_user()
+    assert auth_utils.ADMIN_USERNAMES == set()
+    assert client.get('/admin/pool', headers=headers).status_code == 403
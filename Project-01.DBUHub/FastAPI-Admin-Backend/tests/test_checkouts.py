@@ -0,0 +1,43 @@
+import pytest
+import auth_utils
+from conftest import login, recorded_checkouts, username_of
+
+EDIT = {'title': 'Edited', 'content': 'Edited'}
+
+# (name, request); each request gets the client, the user's headers and
+# IDs and a refresh token for a freshly created user and post of theirs
+REQUESTS = [
+    ('create', lambda client, ctx: client.post('/post', data=EDIT, headers=ctx['headers'])),
+    ('update', lambda client, ctx: client.put(f"/post/{ctx['post_id']}", data=EDIT, headers=ctx['headers'])),
+    ('delete', lambda client, ctx: client.delete(f"/post/{ctx['post_id']}", headers=ctx['headers'])),
+    ('bulk create', lambda client, ctx: client.post('/post/bulk', json=[EDIT, EDIT], headers=ctx['headers'])),
+    ('bulk update', lambda client, ctx: client.put('/post/bulk', json=[{'id': ctx['post_id'], **EDIT}], headers=ctx['headers'])),
+    ('bulk delete', lambda client, ctx: client.request('DELETE', '/post/bulk', json=[ctx['post_id']], headers=ctx['headers'])),
+    ('list', lambda client, ctx: client.get('/post/all')),
+    ('get', lambda client, ctx: client.get(f"/post/{ctx['post_id']}")),
+    ('search', lambda client, ctx: client.get('/post/search', params={'q': 'Original'})),
+    ('mine', lambda client, ctx: client.get('/post/mine', headers=ctx['headers'])),
+    ('user posts', lambda client, ctx: client.get(f"/users/{ctx['user_id']}/posts")),
+    ('export', lambda client, ctx: client.get('/post/export', headers=ctx['headers'])),
+    ('pool stats', lambda client, ctx: client.get('/admin/pool', headers=ctx['headers'])),
+    ('refresh', lambda client, ctx: client.post('/auth/refresh', json={'refresh_token': ctx['refresh_token']})),
+    ('logout', lambda client, ctx: client.post('/auth/logout', json={'refresh_token': ctx['refresh_token']})),
+]
+
+
+@pytest.mark.parametrize('send', [send for _, send in REQUESTS], ids=[name for name, _ in REQUESTS])
+def test_request_checks_out_one_connection(client, make_user, monkeypatch, send):
+    user_id, headers = make_user()
+    monkeypatch.setattr(auth_utils, 'ADMIN_USERNAMES', {username_of(headers)})
+    ctx = {
+        'user_id': user_id,
+        'headers': headers,
+        'post_id': client.post('/post', data={'title': 'Original', 'content': 'Original'}, headers=headers).json()['id'],
+        'refresh_token': login(client, headers)['refresh_token'],
+    }
+
+    with recorded_checkouts() as checkouts:
+        response = send(client, ctx)
+    assert response.status_code < 300, response.text
+    # The user is resolved on the endpoint's session, not on a second one
+    assert len(checkouts) == 1
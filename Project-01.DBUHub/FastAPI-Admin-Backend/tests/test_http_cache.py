@@ -0,0 +1,51 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from sqlalchemy import update
+from database.database import SessionLocal
+from database.models import DbPost
+
+
+def test_feed_answers_304_until_a_write(client, make_user):
+    _, headers = make_user()
+    client.post('/post', data={'title': 'Cached', 'content': 'Text'}, headers=headers)
+    etag = client.get('/post/all').headers['ETag']
+
+    assert client.get('/post/all', headers={'If-None-Match': etag}).status_code == 304
+    client.post('/post', data={'title': 'Newer', 'content': 'Text'}, headers=headers)
+    assert client.get('/post/all', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_feed_etag_depends_on_the_fields(client):
+    full = client.get('/post/all').headers['ETag']
+    trimmed = client.get('/post/all', params={'fields': 'id,title'})
+    assert trimmed.headers['ETag'] != full
+    assert client.get('/post/all', params={'fields': 'id,title'}, headers={'If-None-Match': full}).status_code == 200
+    assert client.get('/post/all', params={'fields': 'id,title'}, headers={'If-None-Match': trimmed.headers['ETag']}).status_code == 304
+
+
+def test_post_answers_304_to_its_etag_and_date(client, make_user):
+    _, headers = make_user()
+    post_id = client.post('/post', data={'title': 'Old', 'content': 'Text'}, headers=headers).json()['id']
+    with SessionLocal() as db:
+        db.execute(update(DbPost).where(DbPost.id == post_id).values(updated_at=datetime(2020, 1, 1, 0, 0, 0, 500000)))
+        db.commit()
+
+    response = client.get(f'/post/{post_id}')
+    assert response.headers['Last-Modified'] == 'Wed, 01 Jan 2020 00:00:01 GMT'
+    assert client.get(f'/post/{post_id}', headers={'If-None-Match': response.headers['ETag']}).status_code == 304
+    assert client.get(f'/post/{post_id}', headers={'If-Modified-Since': response.headers['Last-Modified']}).status_code == 304
+
+
+def test_write_in_the_same_second_is_not_answered_304(client, make_user):
+    _, headers = make_user()
+    post_id = client.post('/post', data={'title': 'Fresh', 'content': 'Text'}, headers=headers).json()['id']
+    cached = client.get(f'/post/{post_id}')
+    # Without Last-Modified (the change is in the current second) a client
+    # may fall back to the response's Date, which the server adds
+    date = format_datetime(datetime.now(timezone.utc).replace(microsecond=0), usegmt=True)
+    since = cached.headers.get('Last-Modified', date)
+    client.put(f'/post/{post_id}', data={'title': 'Edited', 'content': 'Text'}, headers=headers)
+
+    response = client.get(f'/post/{post_id}', headers={'If-Modified-Since': since})
+    assert response.status_code == 200
+    assert response.json()['title'] == 'Edited'
@@ -0,0 +1,128 @@
+import asyncio
+import json
+import time
+import pytest
+from fastapi import WebSocketDisconnect
+from database import feed_events
+from routers.post import sse_stream
+
+
+def wait_for(condition, timeout: float = 2.0) -> bool:
+    """Poll condition until it holds or timeout seconds pass."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def write_post(client, headers: dict) -> int:
+    """Create, update and delete a post; return its id."""
+    post_id = client.post('/post', data={'title': 'Live', 'content': 'Live'}, headers=headers).json()['id']
+    assert client.put(f'/post/{post_id}', data={'title': 'Edited', 'content': 'Edited'}, headers=headers).status_code == 200
+    assert client.delete(f'/post/{post_id}', headers=headers).status_code == 200
+    return post_id
+
+
+def check_events(events: list, post_id: int) -> None:
+    assert [event['type'] for event in events] == ['created', 'updated', 'deleted']
+    assert events[0]['posts'][0]['id'] == post_id
+    assert events[1]['posts'][0]['id'] == post_id
+    assert events[1]['posts'][0]['title'] == 'Edited'
+    assert events[2]['posts'] == [{'id': post_id}]
+
+
+def test_websocket_delivers_writes(client, make_user):
+    _, headers = make_user()
+    with client.websocket_connect('/post/live') as websocket:
+        post_id = write_post(client, headers)
+        events = [websocket.receive_json() for _ in range(3)]
+    check_events(events, post_id)
+
+
+def test_sse_delivers_writes(client, make_user):
+    _, headers = make_user()
+    subscriber = feed_events.hub.subscribe()
+    stream = sse_stream(subscriber)
+    try:
+        post_id = write_post(client, headers)
+        messages = [client.portal.call(stream.__anext__) for _ in range(3)]
+    finally:
+        client.portal.call(stream.aclose)
+    assert all(message.startswith(b'data: ') and message.endswith(b'\n\n') for message in messages)
+    check_events([json.loads(message[len(b'data: '):]) for message in messages], post_id)
+
+
+def test_overflow_sends_reset_and_closes(client):
+    with client.websocket_connect('/post/live') as websocket:
+        assert wait_for(lambda: feed_events.hub.subscribers)
+
+        def flood():
+            for _ in range(feed_events.hub.queue_size + 1):
+                feed_events.hub.deliver(b'{"type":"created","posts":[]}')
+
+        # Delivered in one go on the event loop, so the connection cannot drain in between
+        client.portal.call(flood)
+        assert websocket.receive_json() == {'type': 'reset'}
+        with pytest.raises(WebSocketDisconnect) as closed:
+            websocket.receive_json()
+    assert closed.value.code == 1013
+    assert not feed_events.hub.subscribers
+
+
+def test_sse_overflow_sends_reset():
+    hub = feed_events.Hub(queue_size=2, max_subscribers=10)
+    subscriber = hub.subscribe()
+    for _ in range(3):
+        hub.deliver(b'{}')
+    assert subscriber.evicted and not hub.subscribers
+
+    async def read_all():
+        return [message async for message in sse_stream(subscriber)]
+
+    assert asyncio.run(read_all()) == [b'data: {"type":"reset"}\n\n']
+
+
+def test_subscriber_limit(client, monkeypatch):
+    monkeypatch.setattr(feed_events.hub, 'max_subscribers', 0)
+    assert client.get('/post/live').status_code == 503
+    with pytest.raises(WebSocketDisconnect) as closed:
+        with client.websocket_connect('/post/live'):
+            pass
+    assert closed.value.code == 1013
+
+
+def test_websocket_unsubscribes_on_disconnect(client, monkeypatch):
+    # The server notices a closed socket on its next send
+    monkeypatch.setattr(feed_events, 'LIVE_FEED_HEARTBEAT', 0.05)
+    with client.websocket_connect('/post/live') as websocket:
+        assert websocket.receive_json() == {'type': 'ping'}
+        assert len(feed_events.hub.subscribers) == 1
+    assert wait_for(lambda: not feed_events.hub.subscribers)
+
+
+def test_sse_unsubscribes_on_disconnect(client):
+    subscriber = feed_events.hub.subscribe()
+    stream = sse_stream(subscriber)
+    client.portal.call(feed_events.hub.deliver, b'{}')
+    assert client.portal.call(stream.__anext__) == b'data: {}\n\n'
+    # What the server does when the client goes away mid-stream
+    client.portal.call(stream.aclose)
+    assert subscriber not in feed_events.hub.subscribers
+
+
+def test_refused_with_several_workers_and_local_backend(client, monkeypatch):
+    monkeypatch.setattr(feed_events, 'WEB_CONCURRENCY', 2)
+    assert not feed_events.available()
+    assert client.get('/post/live').status_code == 503
+    with pytest.raises(WebSocketDisconnect) as closed:
+        with client.websocket_connect('/post/live'):
+            pass
+    assert closed.value.code == 1013
+
+    class SharedBackend(feed_events.LocalEventBackend):
+        cross_worker = True
+
+    monkeypatch.setattr(feed_events, 'backend', SharedBackend(feed_events.hub))
+    assert feed_events.available()
@@ -0,0 +1,53 @@
+import login_throttle
+from conftest import PASSWORD
+from login_throttle import LOGIN_USER_GLOBAL_LIMIT, LOGIN_USER_LIMIT
+
+
+def test_username_tokens_are_taken_before_the_password_is_checked():
+    # Attempts that are all admitted before any of them fails still count
+    admitted = [login_throttle.check('203.0.113.1', 'victim') for _ in range(LOGIN_USER_LIMIT + 3)]
+    assert admitted[:LOGIN_USER_LIMIT] == [0.0] * LOGIN_USER_LIMIT
+    assert all(retry_after > 0 for retry_after in admitted[LOGIN_USER_LIMIT:])
+
+
+def test_successful_login_refunds_the_username():
+    for _ in range(LOGIN_USER_LIMIT):
+        login_throttle.check('203.0.113.2', 'refunded')
+    assert login_throttle.check('203.0.113.2', 'refunded') > 0
+
+    login_throttle.record_success('203.0.113.2', 'refunded')
+    assert [login_throttle.check('203.0.113.2', 'refunded') for _ in range(LOGIN_USER_LIMIT)] == [0.0] * LOGIN_USER_LIMIT
+
+
+def test_login_answers_429_once_the_username_is_spent(client):
+    username = 'user-under-attack'
+    client.post('/auth/', json={'username': username, 'password': 'right-password'})
+    statuses = [
+        client.post('/auth/token', data={'username': username, 'password': 'wrong'}).status_code
+        for _ in range(LOGIN_USER_LIMIT + 1)
+    ]
+    assert statuses == [401] * LOGIN_USER_LIMIT + [429]
+
+
+
+def attack(username: str, addresses: int) -> None:
+    """Spend the username's attempts at each of addresses IPs on wrong passwords, as the login endpoint would."""
+    for address in range(addresses):
+        for _ in range(LOGIN_USER_LIMIT):
+            assert login_throttle.check(f'198.51.100.{address}', username) == 0.0
+            login_throttle.record_failure(username)
+        assert login_throttle.check(f'198.51.100.{address}', username) > 0
+
+
+def test_failures_from_other_ips_do_not_lock_the_user_out(client):
+    username = 'user-attacked-from-many-ips'
+    client.post('/auth/', json={'username': username, 'password': PASSWORD})
+    attack(username, 10)
+
+    response = client.post('/auth/token', data={'username': username, 'password': PASSWORD})
+    assert response.status_code == 200
+
+
+def test_username_is_throttled_across_ips_after_many_failures():
+    attack('user-guessed-everywhere', LOGIN_USER_GLOBAL_LIMIT // LOGIN_USER_LIMIT)
+    assert login_throttle.check('192.0.2.1', 'user-guessed-everywhere') > 0
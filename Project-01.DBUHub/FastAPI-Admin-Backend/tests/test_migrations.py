@@ -0,0 +1,70 @@
+import os
+import tempfile
+from datetime import datetime
+import pytest
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from database import search
+from database.migrations import migrate
+from database.models import ArchivedPost
+
+
+@pytest.fixture
+def first_release_engine():
+    """An engine on a database whose post table is the one first released: no AUTOINCREMENT, no derived columns."""
+    engine = create_engine('sqlite:///' + os.path.join(tempfile.mkdtemp(), 'old.db'))
+    with engine.begin() as connection:
+        connection.execute(text(
+            'CREATE TABLE post (id INTEGER NOT NULL PRIMARY KEY, title VARCHAR(255) NOT NULL, '
+            'content VARCHAR NOT NULL, creator_id INTEGER NOT NULL, timestamp DATETIME)'
+        ))
+        connection.execute(text('CREATE INDEX ix_post_timestamp ON post (timestamp)'))
+        connection.execute(text("INSERT INTO post VALUES (1, 'Kept', 'Some words', 1, '2020-01-01 00:00:00')"))
+    yield engine
+    engine.dispose()
+
+
+def test_upgrade_from_the_first_post_table(first_release_engine):
+    migrate(first_release_engine)
+
+    with first_release_engine.begin() as connection:
+        row = connection.execute(text('SELECT excerpt, content_length, updated_at FROM post')).one()
+    # The backfills do not count as an edit of the post
+    assert tuple(row) == ('Some words', 10, '2020-01-01 00:00:00')
+
+
+def test_upgrade_adds_autoincrement_to_post(first_release_engine):
+    migrate(first_release_engine)
+    with first_release_engine.begin() as connection:
+        # An archived post above every ID left in the post table
+        connection.execute(insert(ArchivedPost).values(
+            id=7, title='Old', content='Old', creator_id=1, timestamp=datetime(2019, 1, 1), archived_at=datetime(2020, 1, 1)
+        ))
+    migrate(first_release_engine)
+
+    with first_release_engine.begin() as connection:
+        created_with = connection.execute(text("SELECT sql FROM sqlite_master WHERE name = 'post'")).scalar()
+        assert 'AUTOINCREMENT' in created_with
+        assert connection.execute(text('SELECT id, title FROM post')).all() == [(1, 'Kept')]
+        new_id = connection.execute(text(
+            "INSERT INTO post (title, content, creator_id, timestamp) VALUES ('New', 'More words', 1, '2021-01-01') RETURNING id"
+        )).scalar()
+        assert new_id == 8
+    # The full-text triggers and index survive the rebuild
+    with Session(first_release_engine) as db:
+        assert sorted(post_id for post_id, _, _ in search.find_matches(db, 'words', 10, 0)) == [1, 8]
+
+
+def test_upgrade_fills_and_requires_post_timestamp(first_release_engine):
+    with first_release_engine.begin() as connection:
+        connection.execute(text("INSERT INTO post VALUES (2, 'Undated', 'Words', 1, NULL)"))
+    migrate(first_release_engine)
+
+    with first_release_engine.begin() as connection:
+        assert connection.execute(text('SELECT COUNT(*) FROM post WHERE timestamp IS NULL')).scalar() == 0
+        assert connection.execute(text('SELECT timestamp FROM post WHERE id = 1')).scalar() == '2020-01-01 00:00:00'
+        indexes = {row.name for row in connection.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'"))}
+        assert 'ix_post_timestamp' not in indexes and 'ix_post_timestamp_id' in indexes
+        with pytest.raises(IntegrityError):
+            connection.execute(text("INSERT INTO post (title, content, creator_id) VALUES ('New', 'Words', 1)"))
@@ -0,0 +1,81 @@
+import asyncio
+from contextlib import contextmanager
+from datetime import datetime
+import pytest
+from database import archive
+from database.archive import archive_batch
+from database.database import SessionLocal
+
+
+@pytest.fixture
+def archived(client, make_user):
+    """An archived post, its owner's headers and another user's headers."""
+    _, owner = make_user()
+    _, other = make_user()
+    post_id = client.post('/post', data={'title': 'Old', 'content': 'Old'}, headers=owner).json()['id']
+    with SessionLocal() as db:
+        while archive_batch(db, datetime.utcnow()):
+            pass
+    assert post_id not in [post['id'] for post in client.get('/post/mine', headers=owner).json()]
+    return post_id, owner, other
+
+
+def feed_version(client) -> str:
+    return client.get('/post/all', params={'limit': 1}).headers['ETag']
+
+
+def test_owner_updates_an_archived_post(client, archived):
+    post_id, owner, _ = archived
+    before = feed_version(client)
+    response = client.put(f'/post/{post_id}', data={'title': 'New', 'content': 'New'}, headers=owner)
+    assert response.status_code == 200
+    assert client.get(f'/post/{post_id}').json()['title'] == 'New'
+    assert feed_version(client) != before
+
+
+def test_owner_deletes_an_archived_post(client, archived):
+    post_id, owner, _ = archived
+    before = feed_version(client)
+    assert client.delete(f'/post/{post_id}', headers=owner).status_code == 200
+    assert client.get(f'/post/{post_id}').status_code == 404
+    assert feed_version(client) != before
+
+
+@pytest.mark.parametrize('method', ['put', 'delete'])
+def test_archived_post_of_someone_else_is_forbidden(client, archived, method):
+    post_id, _, other = archived
+    kwargs = {'data': {'title': 'New', 'content': 'New'}} if method == 'put' else {}
+    assert getattr(client, method)(f'/post/{post_id}', headers=other, **kwargs).status_code == 403
+
+
+def test_bulk_writes_reach_archived_posts(client, archived):
+    post_id, owner, other = archived
+    response = client.put('/post/bulk', json=[{'id': post_id, 'title': 'Bulk', 'content': 'Bulk'}], headers=other)
+    assert [item['status'] for item in response.json()['results']] == [403]
+    response = client.put('/post/bulk', json=[{'id': post_id, 'title': 'Bulk', 'content': 'Bulk'}], headers=owner)
+    assert [item['status'] for item in response.json()['results']] == [200]
+    assert client.get(f'/post/{post_id}').json()['title'] == 'Bulk'
+
+    response = client.request('DELETE', '/post/bulk', json=[post_id], headers=owner)
+    assert [item['status'] for item in response.json()['results']] == [200]
+    assert client.get(f'/post/{post_id}').status_code == 404
+
+
+def test_archiver_is_off_in_other_processes(monkeypatch):
+    monkeypatch.setattr(archive, 'POST_ARCHIVE_AFTER_DAYS', 1)
+    monkeypatch.setattr(archive, 'POST_ARCHIVE_WORKER', False)
+    asyncio.run(archive.start())
+    assert archive._task is None
+
+
+def test_run_is_skipped_while_another_process_archives(client, make_user, monkeypatch):
+    _, owner = make_user()
+    post_id = client.post('/post', data={'title': 'Old', 'content': 'Old'}, headers=owner).json()['id']
+
+    @contextmanager
+    def held_elsewhere():
+        yield False
+
+    monkeypatch.setattr(archive, 'archive_lock', held_elsewhere)
+    assert archive.archive_old_posts(max_age_days=-1) == 0
+    assert post_id in [post['id'] for post in client.get('/post/mine', headers=owner).json()]
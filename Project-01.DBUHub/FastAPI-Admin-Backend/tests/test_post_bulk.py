@@ -0,0 +1,7 @@
+def test_bulk_delete_rejects_booleans_as_ids(client, make_user):
+    _, headers = make_user()
+    post_id = client.post('/post', data={'title': 'Kept', 'content': 'Kept'}, headers=headers).json()['id']
+
+    response = client.request('DELETE', '/post/bulk', json=[True, {'id': True}, post_id], headers=headers)
+    assert response.status_code == 200
+    assert [item['status'] for item in response.json()['results']] == [422, 422, 200]
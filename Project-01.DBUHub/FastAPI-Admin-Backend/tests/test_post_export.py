@@ -0,0 +1,52 @@
+import json
+from datetime import datetime
+import brotli
+import pytest
+from database.archive import archive_batch
+from database.database import SessionLocal, engine
+from database.db_post import export_query
+from routers.post import export_ndjson
+
+
+@pytest.mark.parametrize('since', [None, datetime(2020, 1, 1)])
+def test_export_merges_both_tables_in_index_order(client, since):
+    statement = export_query(since).compile(engine, compile_kwargs={'literal_binds': True})
+    with engine.connect() as connection:
+        plan = [row[-1] for row in connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}')]
+    assert 'MERGE (UNION ALL)' in plan
+    assert not any('TEMP B-TREE' in step for step in plan), plan
+
+
+def test_export_lists_archived_posts_in_change_order(client, make_user):
+    _, headers = make_user()
+    first = client.post('/post', data={'title': 'First', 'content': 'Text'}, headers=headers).json()['id']
+    with SessionLocal() as db:
+        while archive_batch(db, datetime.utcnow()):
+            pass
+    second = client.post('/post', data={'title': 'Second', 'content': 'Text'}, headers=headers).json()['id']
+    client.put(f'/post/{first}', data={'title': 'First, edited', 'content': 'Text'}, headers=headers)
+
+    lines = client.get('/post/export', params={'format': 'csv'}, headers=headers).text.splitlines()
+    ids = [int(line.split(',')[0]) for line in lines[1:]]
+    assert ids[-2:] == [second, first]
+
+
+def test_ndjson_export_is_batched_and_compressed(client, make_user):
+    _, headers = make_user()
+    for index in range(3):
+        client.post('/post', data={'title': f'Export {index}', 'content': 'Text'}, headers=headers)
+    plain = client.get('/post/export', headers={**headers, 'Accept-Encoding': 'identity'})
+    rows = [json.loads(line) for line in plain.text.splitlines()]
+    assert [row['title'] for row in rows[-3:]] == ['Export 0', 'Export 1', 'Export 2']
+
+    with client.stream('GET', '/post/export', headers={**headers, 'Accept-Encoding': 'br'}) as response:
+        assert response.headers['Content-Encoding'] == 'br'
+        body = b''.join(response.iter_raw())
+    assert [json.loads(line) for line in brotli.decompress(body).decode().splitlines()] == rows
+
+
+def test_ndjson_export_yields_one_chunk_per_batch():
+    rows = [(index, 'Title', 'Text', 1, datetime(2020, 1, 1), datetime(2020, 1, 1)) for index in range(5)]
+    chunks = list(export_ndjson(rows, batch_size=2))
+    assert len(chunks) == 3
+    assert [json.loads(line)['id'] for line in b''.join(chunks).decode().splitlines()] == list(range(5))
@@ -0,0 +1,17 @@
+from datetime import datetime
+from database.archive import archive_batch
+from database.database import SessionLocal
+
+
+def test_archived_ids_are_not_handed_out_again(client, make_user):
+    _, headers = make_user()
+    ids = [client.post('/post', data={'title': f'Post {index}', 'content': 'Text'}, headers=headers).json()['id'] for index in range(3)]
+    client.delete(f'/post/{ids[2]}', headers=headers)
+    with SessionLocal() as db:
+        while archive_batch(db, datetime.utcnow()):
+            pass
+
+    new_id = client.post('/post', data={'title': 'New', 'content': 'Text'}, headers=headers).json()['id']
+    assert new_id > ids[2]
+    assert client.get(f'/post/{ids[1]}').json()['title'] == 'Post 1'
+
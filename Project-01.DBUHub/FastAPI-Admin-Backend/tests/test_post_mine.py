@@ -0,0 +1,13 @@
+from conftest import recorded_checkouts
+
+
+def test_my_posts_hold_one_connection(client, make_user):
+    _, headers = make_user()
+    client.post('/post', data={'title': 'Mine', 'content': 'Mine'}, headers=headers)
+
+    with recorded_checkouts() as checkouts:
+        response = client.get('/post/mine', headers=headers)
+    assert response.status_code == 200
+    assert [post['title'] for post in response.json()] == ['Mine']
+    # The user is resolved on the read session, not on the async engine
+    assert len(checkouts) == 1
@@ -0,0 +1,10 @@
+def test_snippet_escapes_post_content(client, make_user):
+    _, headers = make_user()
+    content = 'zebra <img src=x onerror=alert(1)> & "quoted" zebra'
+    client.post('/post', data={'title': 'Markup', 'content': content}, headers=headers)
+
+    response = client.get('/post/search', params={'q': 'zebra'})
+    assert response.status_code == 200
+    assert [result['snippet'] for result in response.json()] == [
+        '<mark>zebra</mark> &lt;img src=x onerror=alert(1)&gt; &amp; &quot;quoted&quot; <mark>zebra</mark>'
+    ]
@@ -0,0 +1,63 @@
+import pytest
+from conftest import recorded_statements
+
+
+@pytest.fixture
+def post(client, make_user):
+    """A post, its owner's headers and another user's headers; both users are in the user cache."""
+    _, owner = make_user()
+    _, other = make_user()
+    post_id = client.post('/post', data={'title': 'Title', 'content': 'Content'}, headers=owner).json()['id']
+    client.get('/post/mine', headers=other)
+    return post_id, owner, other
+
+
+def summary(statements: list) -> list:
+    """Reduce statements to their verb and table, e.g. 'UPDATE post'."""
+    summarized = []
+    for statement in statements:
+        words = statement.split()
+        table = words[words.index('FROM') + 1] if words[0] in ('SELECT', 'DELETE') else words[1]
+        summarized.append(f'{words[0]} {table}')
+    return summarized
+
+
+def test_update_is_one_statement_plus_feed_bump(client, post):
+    post_id, owner, _ = post
+    with recorded_statements() as statements:
+        response = client.put(f'/post/{post_id}', data={'title': 'New', 'content': 'New'}, headers=owner)
+    assert response.status_code == 200
+    assert summary(statements) == ['UPDATE post', 'UPDATE post_feed_state']
+    assert 'RETURNING' in statements[0]
+
+
+def test_delete_is_one_statement_plus_feed_bump(client, post):
+    post_id, owner, _ = post
+    with recorded_statements() as statements:
+        response = client.delete(f'/post/{post_id}', headers=owner)
+    assert response.status_code == 200
+    assert summary(statements) == ['DELETE post', 'UPDATE post_feed_state']
+    assert 'RETURNING' in statements[0]
+
+
+@pytest.mark.parametrize('method', ['put', 'delete'])
+def test_write_to_someone_elses_post_is_forbidden(client, post, method):
+    post_id, _, other = post
+    kwargs = {'data': {'title': 'New', 'content': 'New'}} if method == 'put' else {}
+    with recorded_statements() as statements:
+        response = getattr(client, method)(f'/post/{post_id}', headers=other, **kwargs)
+    assert response.status_code == 403
+    # The conditional writes match nothing in either table; one read tells 403 from 404
+    verb = 'UPDATE' if method == 'put' else 'DELETE'
+    assert summary(statements) == [f'{verb} post', f'{verb} post_archive', 'SELECT post']
+
+
+@pytest.mark.parametrize('method', ['put', 'delete'])
+def test_write_to_missing_post_is_not_found(client, post, method):
+    _, owner, _ = post
+    kwargs = {'data': {'title': 'New', 'content': 'New'}} if method == 'put' else {}
+    with recorded_statements() as statements:
+        response = getattr(client, method)('/post/999999', headers=owner, **kwargs)
+    assert response.status_code == 404
+    verb = 'UPDATE' if method == 'put' else 'DELETE'
+    assert summary(statements) == [f'{verb} post', f'{verb} post_archive', 'SELECT post']
@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+from sqlalchemy import update
+from conftest import login
+from database.database import SessionLocal
+from database.db_token import hash_token
+from database.models import RefreshToken, User
+
+
+def refresh(client, token: str):
+    return client.post('/auth/refresh', json={'refresh_token': token})
+
+
+def test_refresh_token_works_once(client, make_user):
+    _, headers = make_user()
+    token = login(client, headers)['refresh_token']
+
+    response = refresh(client, token)
+    assert response.status_code == 200
+    assert response.json()['refresh_token'] != token
+    assert refresh(client, token).status_code == 401
+
+
+def test_reused_token_revokes_the_family(client, make_user):
+    _, headers = make_user()
+    stolen = login(client, headers)['refresh_token']
+    newest = refresh(client, stolen).json()['refresh_token']
+
+    # The copied token comes back after it was rotated
+    assert refresh(client, stolen).status_code == 401
+    assert refresh(client, newest).status_code == 401
+
+
+def test_other_logins_survive_a_revoked_family(client, make_user):
+    _, headers = make_user()
+    stolen = login(client, headers)['refresh_token']
+    other = login(client, headers)['refresh_token']
+    refresh(client, stolen)
+    refresh(client, stolen)
+    assert refresh(client, other).status_code == 200
+
+
+def test_expired_token_is_rejected(client, make_user):
+    _, headers = make_user()
+    token = login(client, headers)['refresh_token']
+    with SessionLocal() as db:
+        db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.token_hash == hash_token(token))
+            .values(expires_at=datetime.utcnow() - timedelta(seconds=1))
+        )
+        db.commit()
+    assert refresh(client, token).status_code == 401
+
+
+def test_logout_revokes_the_family(client, make_user):
+    _, headers = make_user()
+    first = login(client, headers)['refresh_token']
+    newest = refresh(client, first).json()['refresh_token']
+
+    assert client.post('/auth/logout', json={'refresh_token': first}).status_code == 204
+    assert refresh(client, newest).status_code == 401
+
+
+def test_refresh_for_a_deleted_user_is_rejected_without_spending_the_token(client, make_user):
+    user_id, headers = make_user()
+    token = login(client, headers)['refresh_token']
+    with SessionLocal() as db:
+        db.delete(db.get(User, user_id))
+        db.commit()
+
+    assert refresh(client, token).status_code == 401
+    with SessionLocal() as db:
+        row = db.query(RefreshToken).filter(RefreshToken.token_hash == hash_token(token)).one()
+        assert row.revoked_at is None
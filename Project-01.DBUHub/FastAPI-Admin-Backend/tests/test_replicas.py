@@ -0,0 +1,67 @@
+import os
+import sqlite3
+from time import monotonic
+import pytest
+from database import replicas
+from database.database import engine
+
+REPLICA_TITLE = 'On the replica'
+
+
+@pytest.fixture
+def replica(client, make_user, tmp_path, monkeypatch):
+    """
+    A second SQLite file copied from the primary and installed as the only
+    replica, with every post title changed so reads show where they went.
+    Returns (post id, owner id, owner's headers) of a post on both.
+    """
+    owner_id, headers = make_user()
+    post_id = client.post('/post', data={'title': 'On the primary', 'content': 'Content'}, headers=headers).json()['id']
+
+    path = str(tmp_path / 'replica.db')
+    primary = sqlite3.connect(engine.url.database)
+    copy = sqlite3.connect(path)
+    primary.backup(copy)
+    copy.execute('UPDATE post SET title = ?', (REPLICA_TITLE,))
+    copy.commit()
+    copy.close()
+    primary.close()
+
+    installed = replicas.Replica(f'sqlite:///{path}')
+    monkeypatch.setattr(replicas, 'replicas', [installed])
+    monkeypatch.setattr(replicas, 'recent_writers', {})
+    yield post_id, owner_id, headers
+    installed.engine.dispose()
+
+
+def test_anonymous_reads_use_the_replica(client, replica):
+    post_id, owner_id, _ = replica
+    assert client.get(f'/post/{post_id}').json()['title'] == REPLICA_TITLE
+    assert {post['title'] for post in client.get('/post/all').json()} == {REPLICA_TITLE}
+    assert client.get(f'/users/{owner_id}/posts').json()[0]['title'] == REPLICA_TITLE
+
+
+def test_writer_reads_the_primary_after_a_write(client, replica):
+    post_id, owner_id, headers = replica
+    assert client.get('/post/mine', headers=headers).json()[0]['title'] == REPLICA_TITLE
+
+    response = client.put(f'/post/{post_id}', data={'title': 'Edited', 'content': 'Content'}, headers=headers)
+    assert response.status_code == 200
+    assert client.get(f'/post/{post_id}', headers=headers).json()['title'] == 'Edited'
+    assert client.get('/post/mine', headers=headers).json()[0]['title'] == 'Edited'
+    # Everyone else keeps reading the replica
+    assert client.get(f'/post/{post_id}').json()['title'] == REPLICA_TITLE
+
+    # Once READ_YOUR_WRITES_SECONDS have passed the writer is back on the replica
+    replicas.recent_writers[owner_id] = monotonic() - 1
+    assert client.get(f'/post/{post_id}', headers=headers).json()['title'] == REPLICA_TITLE
+
+
+def test_unreachable_replica_falls_back_to_the_primary(client, replica, tmp_path, monkeypatch):
+    post_id, _, _ = replica
+    unreachable = replicas.Replica(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    monkeypatch.setattr(replicas, 'replicas', [unreachable])
+
+    assert client.get(f'/post/{post_id}').json()['title'] == 'On the primary'
+    assert unreachable.down_until > monotonic()
+    assert not os.path.exists(tmp_path / 'missing')
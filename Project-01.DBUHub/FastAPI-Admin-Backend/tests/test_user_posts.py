@@ -0,0 +1,30 @@
+from conftest import recorded_statements
+
+MISSING_USER_ID = 10 ** 9
+
+
+def test_user_without_posts_gets_an_empty_page(client, make_user):
+    user_id, _ = make_user()
+    response = client.get(f'/users/{user_id}/posts')
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+def test_unknown_user_is_404_on_every_page(client, make_user):
+    user_id, headers = make_user()
+    client.post('/post', data={'title': 'Title', 'content': 'Content'}, headers=headers)
+    client.post('/post', data={'title': 'Title', 'content': 'Content'}, headers=headers)
+    cursor = client.get(f'/users/{user_id}/posts', params={'limit': 1}).headers['X-Next-Cursor']
+
+    for params in ({}, {'cursor': cursor}, {'fields': 'id'}, {'view': 'excerpt'}):
+        response = client.get(f'/users/{MISSING_USER_ID}/posts', params=params)
+        assert response.status_code == 404, params
+        assert response.json() == {'detail': f'User with ID {MISSING_USER_ID} not found'}
+
+
+def test_existence_is_only_checked_for_empty_pages(client, make_user):
+    user_id, headers = make_user()
+    client.post('/post', data={'title': 'Title', 'content': 'Content'}, headers=headers)
+    with recorded_statements() as statements:
+        assert client.get(f'/users/{user_id}/posts').status_code == 200
+    assert not any('FROM users' in statement for statement in statements)